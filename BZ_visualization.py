@@ -1,24 +1,33 @@
 #!/usr/bin/env python3
 """Belousov-Zhabotinsky reaction cellular automaton visualizer."""
 
-from collections import deque
+import argparse
+import os
+import time
+from collections import OrderedDict, deque
 
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
-from matplotlib import animation, colors
-from matplotlib.widgets import Slider, Button, RadioButtons
-from scipy.signal import convolve2d
+
+from bz_palettes import PALETTES, PaletteRenderer, soft_rgb
+from checkpoint import load_checkpoint, save_checkpoint
+from cycle_detect import CycleDetector, quantize
+from input_pipeline import PointerInput, StrokeBuffer
+from profiling import Overlay, Profiler, instrument_draw, startup_probe
+from sim_worker import SimWorker
+from stencil import fill_halo, neighborhood_size, neighborhood_sum, optional_convolve2d, pad
 
 # 3x3 kernel to average a cell with its eight neighbors.
 NEIGHBOR_KERNEL = np.ones((3, 3), dtype=float)
 
 
-def random_substrates(size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-    rng = np.random.default_rng()
-    a = rng.random((size, size))
-    b = rng.random((size, size))
-    c = rng.random((size, size))
+def random_substrates(
+    size: int, dtype=np.float64, seed: int | np.random.Generator | None = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # A Generator passed as the seed is drawn from (and advanced) as it is.
+    rng = np.random.default_rng(seed)
+    a = rng.random((size, size), dtype=dtype)
+    b = rng.random((size, size), dtype=dtype)
+    c = rng.random((size, size), dtype=dtype)
     return a, b, c
 
 
@@ -31,27 +40,43 @@ def step(
     gamma: float,
     boundary_mode: str,
     domain_mask: np.ndarray | None,
+    radius: int = 1,
+    neighborhood: str = "moore",
 ):
+    # A stacked (B, H, W) batch advances every board in one vectorized pass.
+    if a.ndim == 3:
+        return _step_batch(a, b, c, alpha, beta, gamma, boundary_mode, domain_mask, radius, neighborhood)
+
+    # Everything runs in the substrates' dtype (float64 or float32); cast the inputs once.
+    dtype = a.dtype
+    kernel = NEIGHBOR_KERNEL.astype(dtype, copy=False)
+    alpha, beta, gamma = dtype.type(alpha), dtype.type(beta), dtype.type(gamma)
+    # Open and masked modes normalize by the number of valid neighbors to avoid edge dilution.
+    # Looked up once for all three fields, with the caller's mask so repeated steps hit the cache.
+    norm = count_normalization(a.shape, boundary_mode, domain_mask, dtype, radius, neighborhood)
+    if domain_mask is not None and domain_mask.dtype != np.bool_:
+        domain_mask = domain_mask.astype(dtype, copy=False)
+
+    # scipy.signal is slow to import; load it on first use so headless startup stays cheap.
+    # Without SciPy every radius takes the NumPy neighborhood_sum path.
+    convolve2d = optional_convolve2d()
+
     def avg(field: np.ndarray) -> np.ndarray:
         boundary = "wrap" if boundary_mode == "wrap" else "fill"
         masked_field = field if domain_mask is None else field * domain_mask
 
-        summed = convolve2d(masked_field, NEIGHBOR_KERNEL, mode="same", boundary=boundary, fillvalue=0.0)
+        if radius == 1 and neighborhood == "moore" and convolve2d is not None:
+            summed = convolve2d(masked_field, kernel, mode="same", boundary=boundary, fillvalue=0.0)
+        else:
+            summed = neighborhood_sum(pad(masked_field, boundary_mode, radius), radius, neighborhood,
+                                      include_center=True).astype(dtype, copy=False)
 
-        # Open and masked modes normalize by the number of valid neighbors to avoid edge dilution.
-        needs_count_norm = boundary_mode == "open" or domain_mask is not None
-        if needs_count_norm:
-            mask_for_counts = np.ones_like(field) if domain_mask is None else domain_mask
-            counts = convolve2d(mask_for_counts, NEIGHBOR_KERNEL, mode="same", boundary=boundary, fillvalue=0.0)
-            counts = np.clip(counts, 1.0, None)
-            return summed / counts
+        return summed / norm
 
-        return summed / 9.0
+    return _react(avg(a), avg(b), avg(c), alpha, beta, gamma, domain_mask)
 
-    avg_a = avg(a)
-    avg_b = avg(b)
-    avg_c = avg(c)
 
+def _react(avg_a, avg_b, avg_c, alpha, beta, gamma, domain_mask):
     a_next = np.clip(avg_a + avg_a * (alpha * avg_b - gamma * avg_c), 0.0, 1.0)
     b_next = np.clip(avg_b + avg_b * (beta * avg_c - alpha * avg_a), 0.0, 1.0)
     c_next = np.clip(avg_c + avg_c * (gamma * avg_a - beta * avg_b), 0.0, 1.0)
@@ -62,77 +87,232 @@ def step(
     return a_next, b_next, c_next
 
 
-def soft_rgb(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
-    red = 0.25 + 0.75 * a
-    green = 0.25 + 0.75 * c
-    blue = 0.25 + 0.75 * b
-    return np.stack([red, green, blue], axis=-1)
+def _batch_masks(domain_mask, shape: tuple[int, int, int], dtype) -> tuple[np.ndarray | None, np.ndarray]:
+    """Per-board masks as one (B, H, W) array (or None) plus which boards actually have a mask."""
+    batch = shape[0]
+    if domain_mask is None:
+        return None, np.zeros(batch, dtype=bool)
+    if isinstance(domain_mask, np.ndarray):
+        return np.broadcast_to(domain_mask.astype(dtype, copy=False), shape), np.ones(batch, dtype=bool)
+    has_mask = np.array([m is not None for m in domain_mask])
+    if not has_mask.any():
+        return None, has_mask
+    ones = np.ones(shape[1:], dtype)
+    return np.stack([ones if m is None else m.astype(dtype) for m in domain_mask]), has_mask
+
+
+def _step_batch(a, b, c, alpha, beta, gamma, boundary_mode, domain_mask, radius=1, neighborhood="moore"):
+    dtype = a.dtype
+    batch = a.shape[0]
+    alpha, beta, gamma = dtype.type(alpha), dtype.type(beta), dtype.type(gamma)
+    modes = [boundary_mode] * batch if isinstance(boundary_mode, str) else list(boundary_mode)
+    mask, has_mask = _batch_masks(domain_mask, a.shape, dtype)
+
+    fields = np.stack([a, b, c], axis=1)
+    if mask is not None:
+        fields *= mask[:, None]
+    summed = neighborhood_sum(pad(fields, modes, radius), radius, neighborhood, include_center=True)
+
+    # Same normalization rule as count_normalization, decided per board.
+    needs_norm = np.array([mode == "open" for mode in modes]) | has_mask
+    norm = np.full((batch, 1, 1), neighborhood_size(radius, neighborhood, True), dtype)
+    if needs_norm.any():
+        valid = np.ones(a.shape, dtype) if mask is None else mask
+        counts = np.clip(neighborhood_sum(pad(valid, modes, radius), radius, neighborhood, include_center=True),
+                         1.0, None)
+        norm = np.where(needs_norm[:, None, None], counts, norm)
+    avg = (summed / norm[:, None]).astype(dtype, copy=False)
+    return _react(avg[:, 0], avg[:, 1], avg[:, 2], alpha, beta, gamma, mask)
+
+
+def substrate_levels(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Mean a, b, c levels as ``record_levels`` tracks them; shape (3,) or (B, 3) for a batch."""
+    return np.stack([a.mean(axis=(-2, -1)), b.mean(axis=(-2, -1)), c.mean(axis=(-2, -1))], axis=-1)
+
+
+# Count-normalization fields of the last few (shape, boundary_mode, mask, ...) combinations. Masks are
+# keyed by identity and treated as read-only; each entry keeps its mask alive so the id cannot be reused.
+_NORM_CACHE_SIZE = 8
+_norm_cache: OrderedDict[tuple, tuple[np.ndarray | None, np.ndarray]] = OrderedDict()
+
+
+def count_normalization(
+    shape: tuple[int, int], boundary_mode: str, domain_mask: np.ndarray | None, dtype=np.float64,
+    radius: int = 1, neighborhood: str = "moore",
+) -> np.ndarray | float:
+    """Divisor applied to the neighborhood sums in ``step``: the neighborhood size (9 for
+    the 3x3 square), or the clipped count of valid neighbors."""
+    dtype = np.dtype(dtype)
+    if boundary_mode != "open" and domain_mask is None:
+        return dtype.type(neighborhood_size(radius, neighborhood, include_center=True))
+    key = (shape, boundary_mode, None if domain_mask is None else id(domain_mask), dtype.str, radius, neighborhood)
+    entry = _norm_cache.get(key)
+    if entry is not None and entry[0] is domain_mask:
+        _norm_cache.move_to_end(key)
+        return entry[1]
+    # Counts are small integers, so the stencil sum is exact whatever the summation order.
+    mask_for_counts = np.ones(shape) if domain_mask is None else domain_mask.astype(float)
+    counts = neighborhood_sum(pad(mask_for_counts, boundary_mode, radius), radius, neighborhood,
+                              include_center=True)
+    counts = np.clip(counts, 1.0, None).astype(dtype)
+    _norm_cache[key] = (domain_mask, counts)
+    if len(_norm_cache) > _NORM_CACHE_SIZE:
+        _norm_cache.popitem(last=False)
+    return counts
+
+
+class BZStepper:
+    """Allocation-free equivalent of ``step`` for repeated stepping of one board.
+
+    The three substrates live in a stacked (3, H, W) double buffer; each step
+    fills one padded copy, computes all three neighborhood averages in a single
+    pass and writes the reaction into the other buffer. The count-normalization
+    field is looked up once per (boundary_mode, domain_mask, neighborhood)
+    change instead of per step. The 3x3 neighborhood sums with shifted slices;
+    wider ones go through ``neighborhood_sum``.
+    """
+
+    def __init__(self, a: np.ndarray, b: np.ndarray, c: np.ndarray,
+                 boundary_mode: str = "wrap", domain_mask: np.ndarray | None = None,
+                 radius: int = 1, neighborhood: str = "moore"):
+        height, width = a.shape
+        self.dtype = a.dtype
+        self._buffers = (np.empty((3, height, width), self.dtype), np.empty((3, height, width), self.dtype))
+        self._current = 0
+        self._padded = np.zeros((3, height + 2, width + 2), self.dtype)
+        self._rows = np.empty((3, height, width + 2), self.dtype)
+        self._avg = np.empty((3, height, width), self.dtype)
+        self._tmp = np.empty((2, height, width), self.dtype)
+        self.boundary_mode = None
+        self.domain_mask = None
+        self.radius = 1
+        self.neighborhood = "moore"
+        self._mask = None
+        self._norm = self.dtype.type(9.0)
+        self.configure(boundary_mode, domain_mask, radius, neighborhood)
+        self.load(a, b, c)
+
+    def configure(self, boundary_mode: str, domain_mask: np.ndarray | None, radius: int | None = None,
+                  neighborhood: str | None = None):
+        radius = self.radius if radius is None else radius
+        neighborhood = self.neighborhood if neighborhood is None else neighborhood
+        if (boundary_mode == self.boundary_mode and domain_mask is self.domain_mask and radius == self.radius
+                and neighborhood == self.neighborhood):
+            return
+        if radius != self.radius:
+            height, width = self._avg.shape[1:]
+            self._padded = np.zeros((3, height + 2 * radius, width + 2 * radius), self.dtype)
+        self.boundary_mode = boundary_mode
+        self.domain_mask = domain_mask
+        self.radius = radius
+        self.neighborhood = neighborhood
+        self._mask = None if domain_mask is None else domain_mask.astype(self.dtype)
+        self._norm = count_normalization(self._avg.shape[1:], boundary_mode, domain_mask, self.dtype, radius,
+                                         neighborhood)
+
+    def load(self, a: np.ndarray, b: np.ndarray, c: np.ndarray):
+        """Copy new substrates into the stepper; returns views of its buffers."""
+        state = self._buffers[self._current]
+        state[0], state[1], state[2] = a, b, c
+        return self.fields
+
+    @property
+    def fields(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        state = self._buffers[self._current]
+        return state[0], state[1], state[2]
+
+    def step(self, alpha: float, beta: float, gamma: float,
+             boundary_mode: str | None = None, domain_mask: np.ndarray | None = None,
+             radius: int | None = None, neighborhood: str | None = None):
+        if boundary_mode is not None:
+            self.configure(boundary_mode, domain_mask, radius, neighborhood)
+        alpha, beta, gamma = self.dtype.type(alpha), self.dtype.type(beta), self.dtype.type(gamma)
+        state = self._buffers[self._current]
+        out = self._buffers[1 - self._current]
+        padded, rows, avg = self._padded, self._rows, self._avg
+        t0, t1 = self._tmp
+
+        r = self.radius
+        interior = padded[:, r:-r, r:-r]
+        if self._mask is None:
+            interior[...] = state
+        else:
+            np.multiply(state, self._mask, out=interior)
+        fill_halo(padded, self.boundary_mode, r)
+        if r == 1 and self.neighborhood == "moore":
+            np.add(padded[:, :-2], padded[:, 1:-1], out=rows)
+            rows += padded[:, 2:]
+            np.add(rows[..., :-2], rows[..., 1:-1], out=avg)
+            avg += rows[..., 2:]
+        else:
+            neighborhood_sum(padded, r, self.neighborhood, include_center=True, out=avg)
+        avg /= self._norm
+        avg_a, avg_b, avg_c = avg
+
+        for dst, own, plus, plus_rate, minus, minus_rate in (
+            (out[0], avg_a, avg_b, alpha, avg_c, gamma),
+            (out[1], avg_b, avg_c, beta, avg_a, alpha),
+            (out[2], avg_c, avg_a, gamma, avg_b, beta),
+        ):
+            np.multiply(plus, plus_rate, out=t0)
+            np.multiply(minus, minus_rate, out=t1)
+            t0 -= t1
+            t0 *= own
+            t0 += own
+            np.clip(t0, 0.0, 1.0, out=dst)
+        if self._mask is not None:
+            out *= self._mask
+        self._current = 1 - self._current
+        return self.fields
+
+
+def round_mask_for(size: int) -> np.ndarray:
+    """Circular domain used by the "Round mask" option."""
+    yy, xx = np.ogrid[:size, :size]
+    center = (size - 1) / 2.0
+    round_radius = size * 0.48
+    return ((xx - center) ** 2 + (yy - center) ** 2) <= round_radius ** 2
+
 
+def main(dtype=np.float64, threaded: bool = False, sim_rate: float | None = None, profile: bool = False,
+         profile_out: str | None = None, checkpoint: str = "bz.ckpt", resume: bool = False, probe: bool = False):
+    started = time.perf_counter()
+    # Matplotlib is only needed for the interactive viewer, not for headless runs.
+    import matplotlib.pyplot as plt
+    from matplotlib import animation
+    from matplotlib.widgets import Slider, Button, RadioButtons, TextBox
 
-def main():
     size = 300
     alpha_init, beta_init, gamma_init = 1.0, 1.0, 1.0
-    a, b, c = random_substrates(size)
+    a, b, c = random_substrates(size, dtype)
+    stepper = BZStepper(a, b, c)
+    a, b, c = stepper.fields
     running = True
     history_length = 400
     step_index = 0
+    recorder = None  # "e" starts/stops streaming a/b/c to a recording file
+    record_every = 1
     rng = np.random.default_rng()
     disturb_radius = 8
     disturb_strength = 0.55
-    mouse_down = False
     boundary_mode = "wrap"
     mask_mode = "full"
-    yy, xx = np.ogrid[:size, :size]
-    center = (size - 1) / 2.0
-    round_radius = size * 0.48
-    round_mask = ((xx - center) ** 2 + (yy - center) ** 2) <= round_radius ** 2
-
-    # Color mappers for selectable looks.
-    cmap_plasma = cm.get_cmap("plasma")
-    cmap_turbo = cm.get_cmap("turbo")
-    norm_relief = colors.PowerNorm(gamma=0.7)
-    triad_palette = np.array([[29, 210, 168], [255, 120, 104], [250, 207, 90]], dtype=float) / 255.0
-
-    def color_relief(a_sub, b_sub, c_sub):
-        field = 0.55 * a_sub + 0.35 * b_sub + 0.10 * c_sub
-        grad_y, grad_x = np.gradient(field)
-        edge = np.sqrt(grad_x ** 2 + grad_y ** 2)
-        height = np.clip(field + 0.45 * edge, 0.0, 1.0)
-        return cmap_plasma(norm_relief(height))[..., :3]
-
-    def color_hue(a_sub, b_sub, c_sub):
-        total = a_sub + b_sub + c_sub + 1e-6
-        hue = (np.arctan2(c_sub - b_sub, a_sub - 0.5 * (b_sub + c_sub)) / (2 * np.pi)) % 1.0
-        sat = np.clip(np.std(np.stack([a_sub, b_sub, c_sub], axis=-1), axis=-1) * 1.6, 0.0, 1.0)
-        val = np.clip(
-            0.65 * total / 3.0 + 0.35 * np.max(np.stack([a_sub, b_sub, c_sub], axis=-1), axis=-1),
-            0.0,
-            1.0,
-        )
-        return colors.hsv_to_rgb(np.stack([hue, sat, val], axis=-1))
-
-    def color_turbo(a_sub, b_sub, c_sub):
-        level = np.clip(
-            0.6 * (a_sub + b_sub + c_sub) / 3.0
-            + 0.4 * np.std(np.stack([a_sub, b_sub, c_sub], axis=-1), axis=-1),
-            0.0,
-            1.0,
-        )
-        return cmap_turbo(level)[..., :3]
-
-    def color_triad(a_sub, b_sub, c_sub):
-        weights = np.stack([a_sub, b_sub, c_sub], axis=-1)
-        weights /= weights.sum(axis=-1, keepdims=True) + 1e-6
-        return np.einsum("...k,kc->...c", weights, triad_palette)
-
-    color_options = [
-        ("Relief (plasma)", color_relief),
-        ("Hue wheel", color_hue),
-        ("Turbo depth", color_turbo),
-        ("Soft RGB", soft_rgb),
-        ("Triad blend", color_triad),
-    ]
-    name_to_index = {name: idx for idx, (name, _) in enumerate(color_options)}
+    round_mask = round_mask_for(size)
+    neighborhood = "moore"  # "n" switches to the von Neumann diamond; the radius slider sets its size
+    # What the next step uses. The widgets change it through run_on_sim so that a running
+    # worker picks up new rates, boundary, mask and neighborhood between two generations.
+    sim_params = (alpha_init, beta_init, gamma_init, boundary_mode, None, 1, neighborhood)
+    worker = None  # "b" moves stepping onto a background thread (sim_worker.SimWorker)
+    sim_frame = None  # latest frame taken from the worker
+    steps_per_frame = 1  # "+"/"-" or the steps/frame slider
+    max_steps_per_frame = 64
+    fast_forward_timer = None  # drives a "Go to step" run while the animation is suspended
+    profiler = Profiler(profile, target_fps=1000 / 25, export=profile_out)  # "i" toggles its overlay
+
+    # Palettes render through precomputed lookup tables into one reused uint8 image.
+    palettes = PaletteRenderer((size, size))
+    color_options = list(PALETTES.items())
+    name_to_index = {label: idx for idx, (_, label) in enumerate(color_options)}
     active_color_index = 0
     boundary_options = [
         ("Wrap (toroidal)", "wrap"),
@@ -144,8 +324,37 @@ def main():
     mask_options = [("Full grid", "full"), ("Round mask", "round")]
     mask_name_to_index = {name: idx for idx, (name, _) in enumerate(mask_options)}
 
+    def displayed_fields():
+        if worker is not None and sim_frame is not None:
+            return sim_frame["a"], sim_frame["b"], sim_frame["c"]
+        return a, b, c
+
     def current_to_rgb():
-        return color_options[active_color_index][1](a, b, c)
+        return palettes.render(color_options[active_color_index][0], *displayed_fields())
+
+    def run_on_sim(command):
+        # While the worker runs it owns a, b, c and sim_params; changes queue up for it.
+        if worker is not None:
+            worker.submit(command)
+        else:
+            command()
+
+    def push_params():
+        params = (
+            s_alpha.val,
+            s_beta.val,
+            s_gamma.val,
+            boundary_mode,
+            round_mask if mask_mode == "round" else None,
+            int(s_radius.val),
+            neighborhood,
+        )
+
+        def apply():
+            nonlocal sim_params
+            sim_params = params
+
+        run_on_sim(apply)
 
     time_values: deque[int] = deque(maxlen=history_length)
     a_levels: deque[float] = deque(maxlen=history_length)
@@ -160,6 +369,8 @@ def main():
     )
     fig.subplots_adjust(bottom=0.2, top=0.9, wspace=0.25)
     fig.patch.set_facecolor("#101820")
+    # --startup-probe: print the time to the first frame and close (benchmarks/startup.py)
+    finish_probe = startup_probe(fig, started) if probe else None
 
     fig.suptitle(
         "Belousov-Zhabotinsky Cellular Automaton",
@@ -195,7 +406,7 @@ def main():
     ax_palette = ax_options.inset_axes([0.08, 0.55, 0.84, 0.35], facecolor="#0f1b26")
     palette_selector = RadioButtons(
         ax_palette,
-        [name for name, _ in color_options],
+        [label for _, label in color_options],
         active=active_color_index,
     )
     for lbl in palette_selector.labels:
@@ -233,6 +444,7 @@ def main():
             boundary_selector.set_active(boundary_mode_to_index[boundary_mode])
             return
         boundary_mode = mode
+        push_params()
         img.set_data(current_to_rgb())
         fig.canvas.draw_idle()
 
@@ -250,7 +462,7 @@ def main():
         lbl.set_fontsize(9)
 
     def on_mask(label: str):
-        nonlocal mask_mode, a, b, c, boundary_mode
+        nonlocal mask_mode, boundary_mode
         mask_mode = dict(mask_options)[label]
         current_mask = round_mask if mask_mode == "round" else None
         if mask_mode == "round" and boundary_mode == "wrap":
@@ -258,21 +470,47 @@ def main():
             boundary_selector.set_active(boundary_name_to_index["Open (absorbing)"])
         update_boundary_labels(disable_wrap=mask_mode == "round")
         if current_mask is not None:
-            a *= current_mask
-            b *= current_mask
-            c *= current_mask
+            def apply_mask():
+                a[...] *= current_mask
+                b[...] *= current_mask
+                c[...] *= current_mask
+
+            run_on_sim(apply_mask)
+        push_params()
         img.set_data(current_to_rgb())
         fig.canvas.draw_idle()
 
     mask_selector.on_clicked(on_mask)
 
-    def record_levels():
-        nonlocal step_index
-        time_values.append(step_index)
-        a_levels.append(float(a.mean()))
-        b_levels.append(float(b.mean()))
-        c_levels.append(float(c.mean()))
-        step_index += 1
+    # Averaging radius; the cost per step is the same for every radius above 1.
+    ax_radius = ax_options.inset_axes([0.42, -0.06, 0.46, 0.04], facecolor="lightgoldenrodyellow")
+    s_radius = Slider(ax_radius, "Radius (M)", 1, 10, valinit=1, valstep=1, valfmt="%d")
+    s_radius.label.set_color("#d2e7ff")
+    s_radius.label.set_fontsize(9)
+    s_radius.valtext.set_color("#d2e7ff")
+    s_radius.on_changed(lambda _: push_params())
+
+    def toggle_neighborhood():
+        nonlocal neighborhood
+        neighborhood = "von_neumann" if neighborhood == "moore" else "moore"
+        s_radius.label.set_text("Radius (M)" if neighborhood == "moore" else "Radius (vN)")
+        push_params()
+        fig.canvas.draw_idle()
+
+    def record_levels(generation: int, fields):
+        # The worker only hands over the frames that get drawn, so the history is sampled
+        # per displayed frame; a generation going backwards means the board was reseeded.
+        if time_values and generation <= time_values[-1]:
+            if generation == time_values[-1]:
+                return
+            time_values.clear()
+            a_levels.clear()
+            b_levels.clear()
+            c_levels.clear()
+        time_values.append(generation)
+        a_levels.append(float(fields[0].mean()))
+        b_levels.append(float(fields[1].mean()))
+        c_levels.append(float(fields[2].mean()))
 
     def update_traces():
         if not time_values:
@@ -288,7 +526,7 @@ def main():
         ax_levels.set_xlim(x_min, x_max)
         ax_levels.figure.canvas.draw_idle()
 
-    record_levels()
+    record_levels(step_index, (a, b, c))
     update_traces()
 
     # Slider layout
@@ -306,110 +544,439 @@ def main():
         facecolor="lightgoldenrodyellow",
     )
 
-    s_alpha = Slider(ax_alpha, "α (A←B)", 0.4, 1.6, valinit=alpha_init)
-    s_beta = Slider(ax_beta, "β (B←C)", 0.4, 1.6, valinit=beta_init)
-    s_gamma = Slider(ax_gamma, "γ (C←A)", 0.4, 1.6, valinit=gamma_init)
+    s_alpha = Slider(ax_alpha, "α (A←B)", 0.4, 1.6, valinit=alpha_init, valfmt="%.2f")
+    s_beta = Slider(ax_beta, "β (B←C)", 0.4, 1.6, valinit=beta_init, valfmt="%.2f")
+    s_gamma = Slider(ax_gamma, "γ (C←A)", 0.4, 1.6, valinit=gamma_init, valfmt="%.2f")
+    for slider in (s_alpha, s_beta, s_gamma):
+        slider.on_changed(lambda _: push_params())
+
+    ax_steps = plt.axes(
+        [slider_left, 0.12 - 3 * slider_spacing, slider_width, slider_height],
+        facecolor="lightgoldenrodyellow",
+    )
+    s_steps = Slider(ax_steps, "Steps/frame", 1, max_steps_per_frame, valinit=steps_per_frame, valstep=1, valfmt="%d")
+
+    def on_steps(val):
+        nonlocal steps_per_frame
+        steps_per_frame = int(val)
+
+    s_steps.on_changed(on_steps)
 
     # Reset seeds button
     ax_reset = plt.axes([0.86, 0.9, 0.1, 0.05])
     b_reset = Button(ax_reset, "Reseed", color="lightgray", hovercolor="white")
 
     def on_reset(event):
-        nonlocal a, b, c, step_index
-        a, b, c = random_substrates(size)
+        fresh = random_substrates(size, dtype)
         if mask_mode == "round":
-            a *= round_mask
-            b *= round_mask
-            c *= round_mask
-        step_index = 0
+            for field in fresh:
+                field *= round_mask
+
+        def reseed():
+            nonlocal a, b, c, step_index
+            a, b, c = stepper.load(*fresh)
+            step_index = 0
+
+        run_on_sim(reseed)
+        restart_traces()
+
+    def restart_traces():
         time_values.clear()
         a_levels.clear()
         b_levels.clear()
         c_levels.clear()
         img.set_data(current_to_rgb())
-        record_levels()
+        if worker is None:
+            record_levels(step_index, (a, b, c))
         update_traces()
 
     b_reset.on_clicked(on_reset)
 
-    def apply_disturbance(event):
-        nonlocal a, b, c
-        if event.inaxes != ax_pattern or event.xdata is None or event.ydata is None:
-            return
-        cx = int(round(event.ydata))
-        cy = int(round(event.xdata))
-        rel = np.arange(-disturb_radius, disturb_radius + 1)
-        mask = (rel[:, None] ** 2 + rel[None, :] ** 2) <= disturb_radius ** 2
-        noise = rng.uniform(-disturb_strength, disturb_strength, size=mask.shape) * mask
-        if boundary_mode == "wrap":
-            idx = np.ix_((cx + rel) % size, (cy + rel) % size)
-            a[idx] = np.clip(a[idx] + 0.65 * noise, 0.0, 1.0)
-            b[idx] = np.clip(b[idx] + 0.65 * noise, 0.0, 1.0)
-            c[idx] = np.clip(c[idx] + 0.65 * noise, 0.0, 1.0)
-        else:
-            xs = cx + rel
-            ys = cy + rel
-            valid_x = (xs >= 0) & (xs < size)
-            valid_y = (ys >= 0) & (ys < size)
-            if not valid_x.any() or not valid_y.any():
-                return
-            idx = np.ix_(xs[valid_x], ys[valid_y])
-            trimmed_noise = noise[np.ix_(valid_x, valid_y)]
-            if mask_mode == "round":
-                mask_region = round_mask[idx]
-                trimmed_noise = trimmed_noise * mask_region
-                if not mask_region.any():
-                    return
-            a[idx] = np.clip(a[idx] + 0.65 * trimmed_noise, 0.0, 1.0)
-            b[idx] = np.clip(b[idx] + 0.65 * trimmed_noise, 0.0, 1.0)
-            c[idx] = np.clip(c[idx] + 0.65 * trimmed_noise, 0.0, 1.0)
+    # Fast-forward: type a step number and press Enter.
+    ax_goto = plt.axes([0.86, 0.84, 0.1, 0.04])
+    goto_box = TextBox(ax_goto, "Go to step ", initial="")
+    goto_box.label.set_color("#d2e7ff")
+
+    def pointer_cell(event):
+        # Pixel centers sit on integer coordinates, so cell i spans [i - 0.5, i + 0.5)
+        return event.ydata + 0.5, event.xdata + 0.5
+
+    def apply_disturbance(rows, cols):
+        # One frame of brush strokes: every touched cell gets one noise sample
+        if mask_mode == "round":
+            inside = round_mask[rows, cols]
+            rows, cols = rows[inside], cols[inside]
+        noise = 0.65 * rng.uniform(-disturb_strength, disturb_strength, size=rows.size)
+
+        def disturb():
+            for field in (a, b, c):
+                field[rows, cols] = np.clip(field[rows, cols] + noise, 0.0, 1.0)
+
+        run_on_sim(disturb)
+
+    def redraw_disturbance():
         img.set_data(current_to_rgb())
         fig.canvas.draw_idle()
 
-    def on_press(event):
-        nonlocal mouse_down
-        mouse_down = True
-        apply_disturbance(event)
+    def animating() -> bool:
+        return worker is not None or (running and fast_forward_timer is None)
 
-    def on_release(event):
-        nonlocal mouse_down
-        mouse_down = False
+    painter = PointerInput(fig, ax_pattern, StrokeBuffer((size, size), disturb_radius), pointer_cell,
+                           apply_disturbance, redraw_disturbance, wrap=lambda: boundary_mode == "wrap",
+                           animating=animating)
 
-    def on_move(event):
-        if mouse_down:
-            apply_disturbance(event)
+    def advance():
+        # One generation; runs on the animation timer or on the worker thread.
+        nonlocal a, b, c, step_index
+        alpha, beta, gamma, mode, domain_mask, radius, shape = sim_params
+        a, b, c = stepper.step(alpha, beta, gamma, mode, domain_mask, radius, shape)
+        step_index += 1
+        if recorder is not None:
+            recorder.record(step_index, a=a, b=b, c=c)
+
+    def timed_advance():
+        # The worker's steps show up as their own "sim" stage.
+        with profiler.stage("sim"):
+            advance()
+
+    def snapshot():
+        return {"a": a, "b": b, "c": c, "generation": step_index}
+
+    status_text = ax_options.text(0.5, 0.97, "", transform=ax_options.transAxes, ha="center",
+                                  color="#d2e7ff", fontsize=8)
 
     def animate(_):
-        nonlocal a, b, c
-        if not running:
-            return img, line_a, line_b, line_c
-        domain_mask = round_mask if mask_mode == "round" else None
-        a, b, c = step(a, b, c, s_alpha.val, s_beta.val, s_gamma.val, boundary_mode, domain_mask)
-        img.set_data(current_to_rgb())
-        record_levels()
-        update_traces()
+        nonlocal sim_frame
+        painter.drain()
+        if worker is not None:
+            frame = worker.latest()
+            if frame is None:
+                return img, line_a, line_b, line_c
+            sim_frame = frame
+            generation = frame["generation"]
+            status_text.set_text(f"{worker.rate:.0f} steps/s, {worker.dropped} dropped")
+        else:
+            if not running:
+                return img, line_a, line_b, line_c
+            with profiler.stage("step"):
+                for _ in range(steps_per_frame):
+                    advance()
+            generation = step_index
+        with profiler.stage("palette"):
+            img.set_data(current_to_rgb())
+        with profiler.stage("traces"):
+            record_levels(generation, displayed_fields())
+            update_traces()
+        overlay.update()
+        profiler.frame()
         return img, line_a, line_b, line_c
 
+    # Stage timings (step, palette, traces, matplotlib's draw) in the top-left corner.
+    overlay = Overlay(profiler, fig)
+    instrument_draw(profiler, fig)
     ani = animation.FuncAnimation(fig, animate, interval=25, blit=False)
 
     def on_key(event):
         nonlocal running, ani
+        if goto_box.capturekeystrokes:
+            return  # typing into the "Go to step" box
         if event.key == " ":
             running = not running
-            if running:
+            if worker is not None:
+                # Keep polling the paused worker so disturbances and reseeds still show.
+                worker.set_running(running)
+            elif fast_forward_timer is not None:
+                pass  # the animation restarts (or not) once the fast-forward finishes
+            elif running:
                 ani.event_source.start()
             else:
                 ani.event_source.stop()
         elif event.key == "r":
             on_reset(event)
+        elif event.key == "e":
+            run_on_sim(toggle_recording)
+        elif event.key == "b":
+            toggle_worker()
+        elif event.key == "i":
+            overlay.toggle()
+            fig.canvas.draw_idle()
+        elif event.key == "n":
+            toggle_neighborhood()
+        elif event.key == "w":
+            save_state()
+        elif event.key == "y":
+            restore_state()
+        elif event.key in ("+", "="):
+            s_steps.set_val(min(steps_per_frame * 2, max_steps_per_frame))
+        elif event.key == "-":
+            s_steps.set_val(max(steps_per_frame // 2, 1))
+
+    def fast_forward(text: str):
+        # Step to the typed step number with drawing suspended. The animation timer stops and a
+        # separate timer advances in ~50 ms chunks; the level history is sampled so the skipped
+        # range still spans at most history_length points.
+        nonlocal fast_forward_timer
+        try:
+            target = int(text)
+        except ValueError:
+            return
+        if worker is not None:
+            sim = worker
 
+            def run_to_target():
+                while step_index < target and not sim.stopping:
+                    advance()
+
+            sim.submit(run_to_target)
+            return
+        if target <= step_index or fast_forward_timer is not None:
+            return
+        ani.event_source.stop()
+        stride = max(1, (target - step_index) // history_length)
+
+        def run_chunk():
+            nonlocal fast_forward_timer
+            deadline = time.perf_counter() + 0.05
+            while step_index < target and time.perf_counter() < deadline:
+                advance()
+                if step_index % stride == 0:
+                    record_levels(step_index, (a, b, c))
+            if step_index >= target:
+                fast_forward_timer.stop()
+                fast_forward_timer = None
+                record_levels(step_index, (a, b, c))
+                img.set_data(current_to_rgb())
+                update_traces()
+                if running:
+                    ani.event_source.start()
+
+        fast_forward_timer = fig.canvas.new_timer(interval=1)
+        fast_forward_timer.add_callback(run_chunk)
+        fast_forward_timer.start()
+
+    goto_box.on_submit(fast_forward)
+
+    def toggle_worker():
+        # Step on a background thread as fast as possible (or at sim_rate steps/s); animate
+        # then only draws the newest finished frame and drops the ones it could not keep up with.
+        nonlocal worker, sim_frame
+        if worker is None:
+            worker = SimWorker(timed_advance, snapshot, sim_rate, running=running)
+            if not running:
+                ani.event_source.start()
+        else:
+            worker.stop()
+            worker, sim_frame = None, None
+            status_text.set_text("")
+            if not running:
+                ani.event_source.stop()
+            img.set_data(current_to_rgb())
+            fig.canvas.draw_idle()
+
+    # "w" saves the substrates and every setting to the checkpoint file, "y" restores them. Both
+    # run on the simulation side between two steps, like any other change to the model.
+    def save_state():
+        def apply():
+            alpha, beta, gamma, mode, _, radius, shape = sim_params
+            save_checkpoint(checkpoint, {"a": a, "b": b, "c": c}, {
+                "kind": "bz", "step": step_index, "alpha": alpha, "beta": beta, "gamma": gamma,
+                "boundary_mode": mode, "mask_mode": mask_mode, "radius": radius, "neighborhood": shape,
+                "steps_per_frame": steps_per_frame, "palette": color_options[active_color_index][0],
+                "rng": rng.bit_generator.state,
+            })
+            print(f"Saved step {step_index} to {checkpoint}")
+
+        run_on_sim(apply)
+
+    def restore_state():
+        nonlocal neighborhood
+        if not os.path.exists(checkpoint):
+            print(f"No checkpoint at {checkpoint}; press w to save one")
+            return
+        arrays, meta = load_checkpoint(checkpoint)
+        if meta.get("kind") != "bz" or arrays["a"].shape != (size, size):
+            print(f"{checkpoint} is not a {size}x{size} BZ checkpoint")
+            return
+        # Widgets first: each pushes its own setting to the simulation before the fields load
+        mask_selector.set_active([mode for _, mode in mask_options].index(meta["mask_mode"]))
+        boundary_selector.set_active(boundary_mode_to_index[meta["boundary_mode"]])
+        palette_selector.set_active([key for key, _ in color_options].index(meta["palette"]))
+        s_alpha.set_val(meta["alpha"])
+        s_beta.set_val(meta["beta"])
+        s_gamma.set_val(meta["gamma"])
+        s_steps.set_val(meta["steps_per_frame"])
+        if meta["neighborhood"] != neighborhood:
+            toggle_neighborhood()
+        s_radius.set_val(meta["radius"])
+
+        def apply():
+            nonlocal a, b, c, step_index
+            a, b, c = stepper.load(arrays["a"], arrays["b"], arrays["c"])
+            step_index = meta["step"]
+            rng.bit_generator.state = meta["rng"]
+
+        run_on_sim(apply)
+        restart_traces()
+        print(f"Restored step {meta['step']} from {checkpoint}")
+
+    def toggle_recording():
+        # Frames go to bz-<timestamp>.rec; replay them with recorder.RecordingReader.
+        nonlocal recorder
+        if recorder is None:
+            from recorder import Recorder
+            recorder = Recorder(time.strftime("bz-%Y%m%d-%H%M%S.rec"), {"a": "u8", "b": "u8", "c": "u8"},
+                                every=record_every)
+            print(f"Recording to {recorder.path}")
+        else:
+            recorder.close()
+            print(f"Saved {recorder.frames_written} frames to {recorder.path}")
+            recorder = None
+
+    def on_close(event):
+        nonlocal worker
+        if worker is not None:
+            worker.stop()
+            worker = None
+        if recorder is not None:
+            toggle_recording()
+        for key, ms in palettes.ms_per_frame().items():
+            print(f"{PALETTES[key]}: {ms:.2f} ms/frame")
+        profiler.close()
+
+    fig.canvas.mpl_connect("close_event", on_close)
     fig.canvas.mpl_connect("key_press_event", on_key)
-    fig.canvas.mpl_connect("button_press_event", on_press)
-    fig.canvas.mpl_connect("button_release_event", on_release)
-    fig.canvas.mpl_connect("motion_notify_event", on_move)
+    if resume:
+        restore_state()
+    if threaded:
+        toggle_worker()
 
     plt.show()
+    if finish_probe is not None:
+        finish_probe()
+
+
+def run_headless(args: argparse.Namespace):
+    """Step the model in a tight loop without matplotlib and report steps per second."""
+    dtype = np.dtype(args.dtype)
+    rng = np.random.default_rng(args.seed)
+    a, b, c = random_substrates(args.size, dtype, rng)
+    first_step = 0
+    if args.resume:
+        # The checkpoint's fields and model settings replace the command-line ones
+        arrays, meta = load_checkpoint(args.resume)
+        a, b, c = (arrays[name].astype(dtype, copy=False) for name in "abc")
+        args.size = a.shape[0]
+        args.alpha, args.beta, args.gamma = meta["alpha"], meta["beta"], meta["gamma"]
+        args.boundary, args.mask = meta["boundary_mode"], meta["mask_mode"]
+        args.radius, args.neighborhood = meta["radius"], meta["neighborhood"]
+        first_step = meta["step"]
+        rng.bit_generator.state = meta["rng"]
+    if args.boundary == "wrap" and args.mask != "round" and args.radius >= args.size:
+        # A wrapped neighborhood wider than the board would reach the same cells more than once
+        raise SystemExit(f"--radius {args.radius} needs a board larger than {args.size} with --boundary wrap")
+    domain_mask = round_mask_for(args.size) if args.mask == "round" else None
+    boundary_mode = args.boundary
+    if domain_mask is not None:
+        if boundary_mode == "wrap":
+            # The viewer never combines wrap with the round mask either.
+            boundary_mode = "open"
+        a, b, c = a * domain_mask, b * domain_mask, c * domain_mask
+    stepper = BZStepper(a, b, c, boundary_mode, domain_mask, args.radius, args.neighborhood)
+    recorder = None
+    if args.record:
+        from recorder import Recorder
+        recorder = Recorder(args.record, {"a": "u8", "b": "u8", "c": "u8"}, every=args.record_every)
+        recorder.record(0, a=a, b=b, c=c)
+
+    # The substrates are continuous, so a cycle here means the 8-bit quantized fields repeat
+    cycles = CycleDetector() if args.stop_on_cycle else None
+    if cycles is not None:
+        cycles.update(quantize(a, b, c), 0)
+    profiler = Profiler(args.profile or args.profile_out is not None, export=args.profile_out)
+
+    start = time.perf_counter()
+    steps = args.steps
+    for i in range(1, args.steps + 1):
+        with profiler.stage("step"):
+            fields = stepper.step(args.alpha, args.beta, args.gamma)
+        if recorder is not None:
+            with profiler.stage("record"):
+                recorder.record(i, a=fields[0], b=fields[1], c=fields[2])
+        if cycles is not None:
+            with profiler.stage("cycle"):
+                period = cycles.update(quantize(*fields), i)
+            if period:
+                steps = i
+                break
+        profiler.frame()
+    if recorder is not None:
+        recorder.close()
+    elapsed = time.perf_counter() - start
+    profiler.close()
+    a, b, c = stepper.fields
+    if args.save_checkpoint:
+        save_checkpoint(args.save_checkpoint, {"a": a, "b": b, "c": c}, {
+            "kind": "bz", "step": first_step + steps, "alpha": args.alpha, "beta": args.beta, "gamma": args.gamma,
+            "boundary_mode": boundary_mode, "mask_mode": args.mask, "radius": args.radius,
+            "neighborhood": args.neighborhood, "steps_per_frame": 1, "palette": next(iter(PALETTES)),
+            "rng": rng.bit_generator.state,
+        })
+
+    rate = steps / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"{steps} steps of {args.size}x{args.size} ({boundary_mode}, {args.mask}, {dtype}, "
+        f"r={args.radius} {args.neighborhood}) "
+        f"in {elapsed:.3f}s: {rate:.1f} steps/s, "
+        f"mean a={a.mean():.4f} b={b.mean():.4f} c={c.mean():.4f}"
+    )
+    if cycles is not None and cycles.period is not None:
+        print(f"Cycle: period {cycles.period} after a transient of {cycles.transient} steps; stopped at step {steps}")
+    if profiler.enabled:
+        print(profiler.text())
+
+    if args.render:
+        from matplotlib.image import imsave
+
+        imsave(args.render, np.clip(soft_rgb(a, b, c), 0.0, 1.0).astype(np.float32))
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Belousov-Zhabotinsky cellular automaton")
+    parser.add_argument("--headless", action="store_true", help="run without a window and print steps/s")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--alpha", type=float, default=1.0)
+    parser.add_argument("--beta", type=float, default=1.0)
+    parser.add_argument("--gamma", type=float, default=1.0)
+    parser.add_argument("--boundary", choices=["wrap", "open", "fill"], default="wrap")
+    parser.add_argument("--mask", choices=["full", "round"], default="full")
+    parser.add_argument("--dtype", choices=["float64", "float32"], default="float64")
+    parser.add_argument("--radius", type=int, default=1, help="averaging radius (1 = the 3x3 square)")
+    parser.add_argument("--neighborhood", choices=["moore", "von_neumann"], default="moore")
+    parser.add_argument("--render", metavar="PNG", help="save the final state as an image")
+    parser.add_argument("--resume", metavar="CKPT", help="continue from a checkpoint, with its settings")
+    parser.add_argument("--save-checkpoint", metavar="CKPT", help="save the final state as a checkpoint")
+    parser.add_argument("--checkpoint", metavar="CKPT", default="bz.ckpt",
+                        help="file the viewer saves to with w and restores from with y")
+    parser.add_argument("--record", metavar="PATH", help="stream a/b/c frames to a recording (see recorder.py)")
+    parser.add_argument("--record-every", type=int, default=1, help="record every Nth step")
+    parser.add_argument(
+        "--stop-on-cycle", action="store_true", help="stop once the 8-bit quantized fields repeat an earlier step"
+    )
+    parser.add_argument("--profile", action="store_true", help="time each stage; the viewer shows it (key i)")
+    parser.add_argument("--profile-out", metavar="PATH", help="write stage timings every second (.csv or JSON lines)")
+    parser.add_argument("--threaded", action="store_true", help="step on a background thread in the viewer")
+    parser.add_argument("--sim-rate", type=float, default=None, help="cap the background thread at N steps/s")
+    parser.add_argument("--startup-probe", action="store_true",
+                        help="print the time to the first frame, then close (see benchmarks/startup.py)")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.headless:
+        run_headless(args)
+    else:
+        main(np.dtype(args.dtype), args.threaded, args.sim_rate, args.profile, args.profile_out,
+             args.resume or args.checkpoint, args.resume is not None, args.startup_probe)
@@ -1,11 +1,23 @@
 #!/usr/bin/env python3
+import argparse
+import os
+import time
+
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.widgets as widgets
-import matplotlib.animation as animation
-from matplotlib.patches import Rectangle
-from matplotlib.widgets import Slider, Button, CheckButtons, RadioButtons
-from scipy.signal import convolve2d
+
+from checkpoint import load_checkpoint, random_state, save_checkpoint, set_random_state
+from cycle_detect import CycleDetector
+from input_pipeline import PointerInput, StrokeBuffer
+from life_render import LifeRenderer, fade_step
+from life_rules import CONWAY, PRESETS, parse_rule, step_rule
+from life_tiles import TiledLife
+from patterns import read_pattern, to_grid, write_pattern
+from profiling import Overlay, Profiler, instrument_draw, startup_probe
+from sim_worker import SimWorker
+from stencil import moore_sum, optional_convolve2d, pad
+
+# HashLife, the bitpack/parallel/sparse engines and the recorder are imported where they are
+# used: the viewer only needs them behind a key or in headless runs, not for its first frame
 
 
 
@@ -14,35 +26,108 @@ from scipy.signal import convolve2d
 def _init_grid(n, ratio):
     # Initialize n x n matrix to simulate Conway's Game of Life
     ones = int(n ** 2 * ratio)
-    vector = np.array([1] * ones + [0] * (n ** 2 - ones))
+    vector = np.zeros(n ** 2, dtype=int)
+    vector[:ones] = 1
     np.random.shuffle(vector)
     return vector.reshape((n, n))
 
+# Initialize a (batch, n, n) stack of independent soups, one seeding ratio per board
+def _init_batch(batch, n, ratios):
+    ratios = np.broadcast_to(np.asarray(ratios, dtype=float), (batch,))
+    ones = (n ** 2 * ratios).astype(int)
+    # A board's live cells are the ones whose random rank falls below its live-cell count
+    ranks = np.argsort(np.argsort(np.random.random((batch, n ** 2)), axis=1), axis=1)
+    return (ranks < ones[:, None]).astype(int).reshape((batch, n, n))
+
+# Percentage of living cells; a scalar for one board, one value per board for a batch
+def live_percentage(grid):
+    return 100.0 * np.count_nonzero(grid == 1, axis=(-2, -1)) / (grid.shape[-2] * grid.shape[-1])
+
 # Updated next_gen function -- using kernel convolution to make it faster
-def next_gen(grid, boundary_mode):
+# backend="bitpack" runs the same rule on a 64-cells-per-word packed board (see life_bitpack.py)
+# A stacked (B, H, W) grid advances every board at once; boundary_mode may then be one mode per board
+# rule="B36/S23" (or a life_rules.LifeRule) runs any Life-like or Generations rule as one gather from
+# its compiled (state, neighbor count) table; see life_rules.py
+def next_gen(grid, boundary_mode, backend="convolve", rule=None):
+    if rule is not None and backend != "bitpack":
+        return step_rule(grid, rule, boundary_mode)
+    if rule is not None and not parse_rule(str(rule)).is_conway:
+        raise ValueError("the bitpack backend only runs B3/S23")
+    if np.ndim(grid) == 3:
+        return _next_gen_batch(grid, boundary_mode)
+    if backend == "bitpack":
+        from life_bitpack import next_gen_packed
+        return next_gen_packed(grid, boundary_mode)
+    if backend != "convolve":
+        raise ValueError(f"Unknown backend: {backend!r}")
+    # scipy.signal is slow to import, so load it on first use rather than at startup
+    convolve2d = optional_convolve2d()
     # Map UI boundary modes to scipy's boundary argument. "open" behaves like fill/absorbing.
     conv_boundary = "wrap" if boundary_mode == "wrap" else "fill"
-    # Use convolution to apply the Game of Life rules
-    kernel = np.array([[1, 1, 1],
-                       [1, 0, 1],
-                       [1, 1, 1]])
-    neighbor_count = convolve2d(grid, kernel, mode="same", boundary=conv_boundary, fillvalue=0.0)
+    if convolve2d is None:
+        # Without SciPy the same counts come from the shifted-slice stencil
+        neighbor_count = moore_sum(pad(np.asarray(grid, dtype=float), conv_boundary))
+    else:
+        # Use convolution to apply the Game of Life rules
+        kernel = np.array([[1, 1, 1],
+                           [1, 0, 1],
+                           [1, 1, 1]])
+        neighbor_count = convolve2d(grid, kernel, mode="same", boundary=conv_boundary, fillvalue=0.0)
     birth = (neighbor_count == 3) & (grid == 0)
     survival = ((neighbor_count == 2) | (neighbor_count == 3)) & (grid == 1)
     grid_next = np.where(birth | survival, 1, 0)
     return grid_next.astype(float)
 
 
-def main():
+def _next_gen_batch(grid, boundary_mode):
+    alive = grid == 1
+    neighbor_count = moore_sum(pad(alive.astype(np.uint8), boundary_mode))
+    grid_next = (neighbor_count == 3) | ((neighbor_count == 2) & alive)
+    return grid_next.astype(float)
+
+
+def main(threaded=False, sim_rate=None, profile=False, profile_out=None, pattern=None, checkpoint='life.ckpt',
+         resume=False, probe=False):
+    started = time.perf_counter()
+    # Matplotlib is only needed for the interactive viewer, not for headless runs
+    import matplotlib.pyplot as plt
+    import matplotlib.widgets as widgets
+    import matplotlib.animation as animation
+    from matplotlib.patches import Rectangle
+    from matplotlib.widgets import Slider, Button, CheckButtons, RadioButtons, TextBox
+
     N = 150
-    global current_grid, fade_grid, img, color, is_dragging, tail_color, is_running, ani, tail_fade_rate, selected_color, perc_text, boundary_mode
+    global current_grid, fade_grid, img, color, tail_color, is_running, ani, tail_fade_rate, selected_color, perc_text, boundary_mode, tiled_life, generation, recorder, worker, sim_frame, tile_status, gens_per_frame, fast_forward_timer, rule, cycle_status, base_rule, neighborhood
     current_grid = _init_grid(N, 0.1).astype(float)
     fade_grid = np.zeros_like(current_grid)
 
-    is_dragging = False
     is_running = True
     tail_fade_rate = 0.33  # Default fading rate
     boundary_mode = "wrap"
+    hashlife_jump = 6  # 'j' jumps 2**hashlife_jump generations with the HashLife engine
+    tiled_life = None  # 't' toggles active-tile stepping (life_tiles.TiledLife)
+    generation = 0
+    recorder = None  # 'e' starts/stops streaming frames to a recording file
+    record_every = 1
+    worker = None  # 'b' moves stepping onto a background thread (sim_worker.SimWorker)
+    sim_frame = None  # latest frame taken from the worker
+    tile_status = ''
+    step_alive = np.zeros((N, N), dtype=bool)  # fade_step scratch, kept apart from the renderer's
+    gens_per_frame = 1  # generations stepped per displayed frame ('+'/'-' or the Gens/Frame slider)
+    max_gens_per_frame = 64
+    fast_forward_timer = None  # drives a 'Go to gen' run while the animation is suspended
+    rule = CONWAY  # picked in the Rule selector; see life_rules.PRESETS
+    base_rule = CONWAY  # the selected preset; rule is this preset scaled to the Radius slider
+    neighborhood = 'moore'  # 'n' switches to the von Neumann diamond
+    if pattern:
+        # Start from a pattern file, centered; its rule (if any) replaces the default
+        rows, cols, text = read_pattern(pattern)
+        current_grid = to_grid(rows, cols, (N, N))
+        rule = base_rule = _pattern_rule(text) or CONWAY
+        neighborhood = rule.neighborhood
+    cycles = CycleDetector()  # rolling board hashes; spots still lifes and oscillators
+    profiler = Profiler(profile, target_fps=1000 / 25, export=profile_out)  # 'i' toggles its overlay
+    cycle_status = ''
 
 
     color = np.array([46, 204, 113]) / 255.0
@@ -56,7 +141,12 @@ def main():
     plt.title('Conway\'s Game of Life', fontsize=24, color='mediumseagreen', fontweight='heavy', style='italic',
               family='fantasy', pad=20)
     fig.patch.set_facecolor(bg_color)
-    img = ax.imshow(current_grid, interpolation='nearest')
+    # --startup-probe: print the time to the first frame and close (benchmarks/startup.py)
+    finish_probe = startup_probe(fig, started) if probe else None
+    # Persistent uint8 RGBA buffer, redrawn only where a cell's state or fade level changed
+    renderer = LifeRenderer(current_grid.shape)
+    renderer.set_colors(color, tail_color)
+    img = ax.imshow(renderer.render(current_grid, fade_grid), interpolation='nearest')
 
     # the percentage of cells living on the grid space
     perc_text = ax.text(0.5, 0.95, '', transform=ax.transAxes, fontsize=22, color='white', ha='center', va='center',
@@ -70,7 +160,7 @@ def main():
     # Create a subplot for the slider
     axcolor = 'lightgoldenrodyellow'
     ax_fade_rate = plt.axes([0.25, 0.01, 0.65, 0.03], facecolor=axcolor)  # Adjust these values to position your slider
-    s_fade_rate = widgets.Slider(ax_fade_rate, 'Fade Rate', 0.0, 1.0, valinit=tail_fade_rate)
+    s_fade_rate = widgets.Slider(ax_fade_rate, 'Fade Rate', 0.0, 1.0, valinit=tail_fade_rate, valfmt='%.2f')
 
     # Define the top-right corner for the slider placement
     top_right_x = 0.95  # x position for the rightmost edge of the sliders
@@ -185,106 +275,415 @@ def main():
     check.on_clicked(toggle_middle_lines)
 
     def set_boundary_mode(label):
-        global boundary_mode
-        boundary_mode = boundary_label_to_mode[label]
+        def apply():
+            global boundary_mode
+            boundary_mode = boundary_label_to_mode[label]
+        run_on_sim(apply)
 
     boundary_radio.on_clicked(set_boundary_mode)
 
+    # Fast-forward: type a generation number and press Enter
+    ax_goto = plt.axes([0.1, 0.62, 0.1, 0.04])
+    goto_box = TextBox(ax_goto, 'Go to gen ', initial='')
+
+    # Rule selector; Generations rules (e.g. Brian's Brain) add dying states that show as the tail
+    ax_rule = plt.axes([0.03, 0.38, 0.17, 0.20], facecolor=axcolor)
+    preset_rules = [str(parse_rule(text)) for text in PRESETS.values()]
+    rule_radio = RadioButtons(ax_rule, list(PRESETS),
+                              active=preset_rules.index(str(base_rule)) if str(base_rule) in preset_rules else 0)
+    for lbl in rule_radio.labels:
+        lbl.set_fontsize(9)
+
+    def set_rule(label):
+        global base_rule, neighborhood
+        base_rule = parse_rule(PRESETS[label])
+        # Larger than Life presets bring their own radius and neighborhood
+        neighborhood = base_rule.neighborhood
+        s_radius.set_val(base_rule.radius)
+        apply_neighborhood()
+
+    rule_radio.on_clicked(set_rule)
+
+    # Neighborhood radius; Life-like rules are rescaled to the same fraction of live neighbors
+    ax_radius = plt.axes([0.08, 0.32, 0.12, 0.03], facecolor=axcolor)
+    s_radius = Slider(ax_radius, 'Radius (M)' if neighborhood == 'moore' else 'Radius (vN)', 1, 10,
+                      valinit=rule.radius, valstep=1, valfmt='%d')
+
+    def apply_neighborhood(*args):
+        new_rule = base_rule.with_neighborhood(int(s_radius.val), neighborhood)
+        s_radius.label.set_text('Radius (M)' if neighborhood == 'moore' else 'Radius (vN)')
+        def apply():
+            global rule
+            rule = new_rule
+            # States the new rule does not have become dead cells
+            current_grid[current_grid >= rule.states] = 0
+            sync_recording()
+        run_on_sim(apply)
+        update_plot()
+
+    s_radius.on_changed(apply_neighborhood)
+
+    def toggle_neighborhood():
+        global neighborhood
+        neighborhood = 'von_neumann' if neighborhood == 'moore' else 'moore'
+        apply_neighborhood()
+
     # Update function for the slider
     def update_fade_rate(val):
-        global tail_fade_rate
-        tail_fade_rate = s_fade_rate.val
+        def apply():
+            global tail_fade_rate
+            tail_fade_rate = val
+        run_on_sim(apply)
         update_plot()
 
     s_fade_rate.on_changed(update_fade_rate)
 
-    # Function to update the alpha values for fading effect
-    def update_alpha(grid, fade_grid, rate):
-        fade_grid[grid == 1] = 1
-        fade_grid[grid == 0] -= rate
-        fade_grid[fade_grid < 0] = 0
-        return fade_grid
-
-    def update_rgba(current_grid, fade_grid, RGB_color, RGB_tail_color):
-        rgba_array = np.zeros((current_grid.shape[0], current_grid.shape[1], 4))
-        rgba_array[..., :3] = RGB_color
-        rgba_array[current_grid == 1, :3] = RGB_color
-        rgba_array[current_grid == 0, :3] = RGB_tail_color
-        rgba_array[..., 3] = fade_grid
-        return rgba_array
-
-    def get_grid_coord(x, y, ax, grid_size):
+    # (row, col) of the pointer in cell units, cell i spanning [i, i + 1)
+    def get_grid_coord(event):
         xlim = ax.get_xlim()
         ylim = ax.get_ylim()
-        x_grid = int(grid_size * (x - xlim[0]) / (xlim[1] - xlim[0]))
-        y_grid = grid_size - 1 - int(grid_size * (y - ylim[0]) / (ylim[1] - ylim[0]))
-        return x_grid, y_grid
-
-    def on_click(event):
-        if event.inaxes == ax and event.button == 1:
-            global is_dragging
-            is_dragging = True
-            seed_grid(event)
-
-    def on_motion(event):
-        if is_dragging and event.inaxes == ax:
-            seed_grid(event)
-
-    def on_release(event):
-        if event.button == 1:
-            global is_dragging
-            is_dragging = False
+        col = N * (event.xdata - xlim[0]) / (xlim[1] - xlim[0])
+        row = N - N * (event.ydata - ylim[0]) / (ylim[1] - ylim[0])
+        return row, col
 
     # Function to handle key press events
     def on_key_press(event):
         global is_running, ani
+        if goto_box.capturekeystrokes:
+            return  # typing into the 'Go to gen' box
         if event.key == ' ':
             # Toggle running state
             is_running = not is_running
-            if is_running:
+            if worker is not None:
+                # The timer keeps polling the paused worker so seeds and resets still show
+                worker.set_running(is_running)
+            elif fast_forward_timer is not None:
+                pass  # the animation restarts (or not) once the fast-forward finishes
+            elif is_running:
                 ani.event_source.start()
             else:
                 ani.event_source.stop()
-
-    # Function to update the grid with a new seed based on the event coordinates
-    def seed_grid(event):
-        global current_grid, fade_grid, img
-        x, y = event.xdata, event.ydata
-        i, j = get_grid_coord(x, y, ax, N)
-        if i >= 0 and i < N and j >= 0 and j < N:
-            current_grid[j, i] = 1
-            fade_grid[j, i] = 1
+        elif event.key == 'j':
+            jump_ahead()
+        elif event.key == 't':
+            toggle_tiled()
+        elif event.key == 'e':
+            run_on_sim(toggle_recording)
+        elif event.key == 'b':
+            toggle_worker()
+        elif event.key == 'i':
+            overlay.toggle()
+            fig.canvas.draw_idle()
+        elif event.key == 'n':
+            toggle_neighborhood()
+        elif event.key == 'w':
+            save_state()
+        elif event.key == 'y':
+            restore_state()
+        elif event.key == 'u':
+            export_pattern()
+        elif event.key in ('+', '='):
+            s_gens.set_val(min(gens_per_frame * 2, max_gens_per_frame))
+        elif event.key == '-':
+            s_gens.set_val(max(gens_per_frame // 2, 1))
+
+    def set_gens_per_frame(val):
+        global gens_per_frame
+        gens_per_frame = int(val)
+
+    # Step to the typed generation without drawing anything on the way: the animation timer is
+    # stopped and a separate timer advances in ~50 ms chunks so the window stays responsive
+    def fast_forward(text):
+        global fast_forward_timer
+        try:
+            target = int(text)
+        except ValueError:
+            return
+        if worker is not None:
+            sim = worker
+            def apply():
+                while generation < target and not sim.stopping:
+                    skip_cycles(target)
+                    advance()
+            sim.submit(apply)
+            return
+        if target <= generation or fast_forward_timer is not None:
+            return
+        ani.event_source.stop()
+
+        def run_chunk():
+            global fast_forward_timer
+            deadline = time.perf_counter() + 0.05
+            while generation < target and time.perf_counter() < deadline:
+                skip_cycles(target)
+                advance()
+            if generation >= target:
+                fast_forward_timer.stop()
+                fast_forward_timer = None
+                update_stats(current_grid, tile_status + cycle_status)
+                update_plot()
+                if is_running:
+                    ani.event_source.start()
+
+        fast_forward_timer = fig.canvas.new_timer(interval=1)
+        fast_forward_timer.add_callback(run_chunk)
+        fast_forward_timer.start()
+
+    goto_box.on_submit(fast_forward)
+
+    # Once the board repeats, whole periods up to the target need no stepping: only the
+    # generation counter moves (the fade trail keeps its last state)
+    def skip_cycles(target):
+        global generation
+        generation += cycles.skip(target - 1)
+
+    # While the worker runs it owns the model state: anything that changes the grid, the fade
+    # trail or the stepping settings is queued to it and runs between two generations
+    def run_on_sim(command):
+        if worker is not None:
+            worker.submit(command)
+        else:
+            command()
+
+    # Step on a background thread as fast as possible (or sim_rate gen/s); update() then only
+    # draws the newest finished frame and skips the ones it could not keep up with
+    def toggle_worker():
+        global worker, sim_frame
+        if worker is None:
+            worker = SimWorker(timed_advance, snapshot, sim_rate, running=is_running)
+            if not is_running:
+                ani.event_source.start()
+        else:
+            worker.stop()
+            worker = None
+            sim_frame = None
+            if not is_running:
+                ani.event_source.stop()
             update_plot()
 
+    # The worker's generations show up as their own 'sim' stage
+    def timed_advance():
+        with profiler.stage('sim'):
+            advance()
+
+    def snapshot():
+        return {'grid': current_grid, 'fade': fade_grid, 'generation': generation,
+                'tile_status': tile_status, 'cycle_status': cycle_status}
+
+    # Stream current_grid and fade_grid to life-<timestamp>.rec; see recorder.RecordingReader for replay
+    def toggle_recording():
+        global recorder
+        if recorder is None:
+            from recorder import Recorder
+            stem = time.strftime('life-%Y%m%d-%H%M%S')
+            path, count = f'{stem}.rec', 1
+            while os.path.exists(path):  # a recording restarted within the same second
+                path, count = f'{stem}-{count}.rec', count + 1
+            recorder = Recorder(path, {'grid': _grid_encoding(rule), 'fade': 'u8'}, every=record_every)
+            print(f'Recording to {recorder.path}')
+        else:
+            recorder.close()
+            print(f'Saved {recorder.frames_written} frames to {recorder.path}')
+            recorder = None
+
+    # A rule with more states than the running recording can store continues in a new file
+    def sync_recording():
+        if recorder is not None and recorder.fields['grid'] != _grid_encoding(rule):
+            toggle_recording()
+            toggle_recording()
+
+    # 'w' saves the whole viewer state to the checkpoint file, 'y' restores it. Both run on the
+    # simulation side, between two generations, like any other change to the model.
+    def save_state():
+        def apply():
+            save_checkpoint(checkpoint, {'grid': current_grid, 'fade': fade_grid}, {
+                'kind': 'life', 'generation': generation, 'rule': str(rule), 'base_rule': str(base_rule),
+                'radius': rule.radius, 'neighborhood': neighborhood, 'boundary_mode': boundary_mode,
+                'tail_fade_rate': tail_fade_rate, 'gens_per_frame': gens_per_frame, 'random_state': random_state(),
+            })
+            print(f'Saved generation {generation} to {checkpoint}')
+        run_on_sim(apply)
+
+    def restore_state():
+        global base_rule, neighborhood
+        if not os.path.exists(checkpoint):
+            print(f'No checkpoint at {checkpoint}; press w to save one')
+            return
+        arrays, meta = load_checkpoint(checkpoint)
+        if meta.get('kind') != 'life' or arrays['grid'].shape != (N, N):
+            print(f'{checkpoint} is not a {N}x{N} Game of Life checkpoint')
+            return
+        # Widgets first: each queues its own setting; the exact saved rule is applied last
+        boundary_radio.set_active([mode for _, mode in boundary_options].index(meta['boundary_mode']))
+        # Checkpoints from older headless runs lack the widget settings; fall back to the defaults
+        saved_base_rule = meta.get('base_rule', meta['rule'])
+        s_fade_rate.set_val(meta.get('tail_fade_rate', 0.33))
+        s_gens.set_val(meta.get('gens_per_frame', 1))
+        if saved_base_rule in preset_rules:
+            rule_radio.set_active(preset_rules.index(saved_base_rule))
+        base_rule = parse_rule(saved_base_rule)
+        neighborhood = meta.get('neighborhood', base_rule.neighborhood)
+        s_radius.set_val(meta.get('radius', base_rule.radius))
+        apply_neighborhood()
+        def apply():
+            global current_grid, fade_grid, generation, rule
+            current_grid = arrays['grid']
+            fade_grid = arrays['fade']
+            generation = meta['generation']
+            rule = parse_rule(meta['rule'])
+            sync_recording()
+            cycles.reset()
+            set_random_state(meta['random_state'])
+        run_on_sim(apply)
+        update_plot()
+        print(f'Restored generation {meta["generation"]} from {checkpoint}')
+
+    # 'u' writes the live cells as an RLE pattern (life-<timestamp>.rle)
+    def export_pattern():
+        def apply():
+            path = time.strftime('life-%Y%m%d-%H%M%S.rle')
+            rows, cols = np.nonzero(current_grid == 1)
+            write_pattern(path, rows, cols, str(rule))
+            print(f'Wrote {rows.size} cells to {path}')
+        run_on_sim(apply)
+
+    # Finish an open recording when the window closes so its index gets written
+    def on_close(event):
+        global worker
+        if worker is not None:
+            worker.stop()
+            worker = None
+        if recorder is not None:
+            toggle_recording()
+        profiler.close()
+
+    # Switch between dense next_gen and active-tile stepping; the tiled stepper works in place
+    # on its own buffer, so current_grid becomes a view of it while the mode is on.
+    def toggle_tiled():
+        def apply():
+            global current_grid, tiled_life
+            if tiled_life is None:
+                tiled_life = TiledLife(current_grid, boundary_mode)
+                current_grid = tiled_life.grid
+            else:
+                tiled_life = None
+                current_grid = current_grid.astype(float)
+        run_on_sim(apply)
+
+    # Advance 2**hashlife_jump generations in one HashLife call. The HashLife universe is
+    # unbounded, so the board is treated as open and cells that leave it are cropped.
+    def jump_ahead():
+        if not rule.is_conway:
+            print(f'HashLife jumps only run B3/S23, not {rule}')
+            return
+        def apply():
+            global current_grid, fade_grid, generation, cycle_status
+            from hashlife import HashLife
+            life = HashLife()
+            life.load_grid(current_grid)
+            life.step_pow2(hashlife_jump)
+            current_grid = life.window()
+            fade_grid = current_grid.copy()
+            generation += 1 << hashlife_jump
+            # The skipped generations were never hashed, so cycle detection starts over from here
+            cycles.reset()
+            cycles.update(current_grid, generation)
+            cycle_status = cycles.status()
+            if recorder is not None:
+                recorder.record(generation, grid=current_grid, fade=fade_grid)
+        run_on_sim(apply)
+        update_plot()
+
+    # Seed the cells a frame's worth of dragging went over (see input_pipeline.py)
+    def seed_cells(rows, cols):
+        def apply():
+            current_grid[rows, cols] = 1
+            fade_grid[rows, cols] = 1
+            if tiled_life is not None and tiled_life.grid is current_grid:
+                tiled_life.mark(rows, cols)
+        run_on_sim(apply)
+
+    # The animation draws painted cells with its next frame; only a stopped one needs the paint timer
+    def animating():
+        return worker is not None or (is_running and fast_forward_timer is None)
+
+    # The grids on screen: the model itself, or the worker's latest frame while it runs
+    def displayed_grids():
+        if worker is not None and sim_frame is not None:
+            return sim_frame['grid'], sim_frame['fade']
+        return current_grid, fade_grid
+
     # Function to update the plot
     def update_plot():
-        global current_grid, fade_grid, img, color, tail_color
-        rgba_array = update_rgba(current_grid, fade_grid, color, tail_color)
-        img.set_data(rgba_array)
+        global img, color, tail_color
+        img.set_data(renderer.render(*displayed_grids()))
         fig.canvas.draw_idle()
 
+    # Advance the model by one generation, on the animation timer or on the worker thread
+    def advance():
+        global current_grid, fade_grid, tiled_life, generation, tile_status, cycle_status
+        tile_status = ''
+        # Active-tile stepping only knows B3/S23; other rules step densely until Conway is back
+        if tiled_life is not None and rule.is_conway:
+            # Reset, Clear and jumps replace current_grid; restart the tiled stepper on the new grid.
+            if tiled_life.grid is not current_grid:
+                tiled_life = TiledLife(current_grid, boundary_mode)
+                current_grid = tiled_life.grid
+            elif tiled_life.boundary_mode != boundary_mode:
+                tiled_life.set_boundary_mode(boundary_mode)
+            active = tiled_life.step()
+            tile_status = f'  Tiles: {active}/{tiled_life.tile_count}'
+        else:
+            current_grid = next_gen(current_grid, boundary_mode, rule=rule)
+        fade_grid = fade_step(current_grid, fade_grid, tail_fade_rate, step_alive)
+        generation += 1
+        cycles.update(current_grid, generation)
+        cycle_status = cycles.status()
+        if recorder is not None:
+            recorder.record(generation, grid=current_grid, fade=fade_grid)
+
     # Use this function in your animation update step
     def update(*args):
-        global current_grid, fade_grid, img, color, is_running, perc_text, boundary_mode
-        if not is_running:
-            return img,
-        current_grid = next_gen(current_grid, boundary_mode)
-        fade_grid = update_alpha(current_grid, fade_grid, tail_fade_rate)
-        rgba_array = update_rgba(current_grid, fade_grid, color, tail_color)
-        img.set_data(rgba_array)
+        global img, is_running, perc_text, sim_frame
+        painter.drain()
+        if worker is not None:
+            frame = worker.latest()
+            if frame is None:
+                return img, perc_text
+            sim_frame = frame
+            grid, fade = frame['grid'], frame['fade']
+            status = f"{frame['tile_status']}{frame['cycle_status']}  Sim: {worker.rate:.0f} gen/s, {worker.dropped} dropped"
+        else:
+            if not is_running:
+                return img,
+            with profiler.stage('step'):
+                for _ in range(gens_per_frame):
+                    advance()
+            grid, fade, status = current_grid, fade_grid, tile_status + cycle_status
+        with profiler.stage('render'):
+            img.set_data(renderer.render(grid, fade))
+        with profiler.stage('stats'):
+            update_stats(grid, status)
+        overlay.update()
+        profiler.frame()
+
+        return img, perc_text
 
+    def update_stats(grid, status):
         # Calculate the percentage of living cells
-        living_cells = np.sum(current_grid == 1)
-        total_cells = current_grid.size
+        living_cells = np.sum(grid == 1)
+        total_cells = grid.size
         percentage = (living_cells / total_cells) * 100
 
         # Update the percentage text
-        perc_text.set_text(f'Living Cells: {percentage:.2f}%')
-
-        return img, perc_text
+        perc_text.set_text(f'Living Cells: {percentage:.2f}%{status}')
 
     ax_ratio = plt.axes([0.25, 0.04, 0.65, 0.03], facecolor=axcolor)
-    s_ratio = Slider(ax_ratio, 'Seeding Ratio', 0.0, 1.0, valinit=0.1)
+    s_ratio = Slider(ax_ratio, 'Seeding Ratio', 0.0, 1.0, valinit=0.1, valfmt='%.2f')
+
+    ax_gens = plt.axes([0.25, 0.07, 0.45, 0.03], facecolor=axcolor)
+    s_gens = Slider(ax_gens, 'Gens/Frame', 1, max_gens_per_frame, valinit=gens_per_frame, valstep=1, valfmt='%d')
+    s_gens.on_changed(set_gens_per_frame)
 
     ax_reset = plt.axes([0.82, 0.08, 0.1, 0.04])
     b_reset = Button(ax_reset, 'Reset', color=axcolor, hovercolor='0.975')
@@ -295,27 +694,35 @@ def main():
 
     # Callback function for the seeding ratio slider
     def update_seeding_ratio(val):
-        global current_grid, fade_grid
-        current_grid = _init_grid(N, s_ratio.val).astype(float)
-        fade_grid = np.zeros_like(current_grid)
+        grid = _init_grid(N, val).astype(float)
+        def apply():
+            global current_grid, fade_grid
+            current_grid = grid
+            fade_grid = np.zeros_like(current_grid)
+        run_on_sim(apply)
         update_plot()
 
     s_ratio.on_changed(update_seeding_ratio)
 
     # Callback function for the reset button
     def reset(event):
-        global current_grid, fade_grid
-        current_grid = _init_grid(N, s_ratio.val).astype(float)
-        fade_grid = np.zeros_like(current_grid)
+        grid = _init_grid(N, s_ratio.val).astype(float)
+        def apply():
+            global current_grid, fade_grid
+            current_grid = grid
+            fade_grid = np.zeros_like(current_grid)
+        run_on_sim(apply)
         update_plot()
 
     b_reset.on_clicked(reset)
 
     # Callback function for the clear button
     def clear_grid(event):
-        global current_grid, fade_grid
-        current_grid = np.zeros((N, N), dtype=float)
-        fade_grid = np.zeros_like(current_grid)
+        def apply():
+            global current_grid, fade_grid
+            current_grid = np.zeros((N, N), dtype=float)
+            fade_grid = np.zeros_like(current_grid)
+        run_on_sim(apply)
         update_plot()
 
     b_clear.on_clicked(clear_grid)
@@ -326,6 +733,7 @@ def main():
         color[0] = s_color_r.val
         color[1] = s_color_g.val
         color[2] = s_color_b.val
+        renderer.set_colors(color, tail_color)
         update_plot()
 
     # Register the update function with each slider
@@ -339,6 +747,7 @@ def main():
         tail_color[0] = s_color_r_tail.val
         tail_color[1] = s_color_g_tail.val
         tail_color[2] = s_color_b_tail.val
+        renderer.set_colors(color, tail_color)
         update_plot()
 
     # Register the update function with each slider
@@ -347,19 +756,219 @@ def main():
     s_color_b_tail.on_changed(update_tail_color)
 
     # Connect the event handlers to the figure
-    fig.canvas.mpl_connect('button_press_event', on_click)
-    fig.canvas.mpl_connect('motion_notify_event', on_motion)
-    fig.canvas.mpl_connect('button_release_event', on_release)
+    # Dragging paints 8-connected strokes, applied once per frame
+    painter = PointerInput(fig, ax, StrokeBuffer((N, N)), get_grid_coord, seed_cells, update_plot,
+                           animating=animating)
     fig.canvas.mpl_connect('key_press_event', on_key_press)
+    fig.canvas.mpl_connect('close_event', on_close)
+
+    # Stage timings (step, render, stats, matplotlib's draw) in the top-left corner
+    overlay = Overlay(profiler, fig)
+    instrument_draw(profiler, fig)
 
     # Set up the animation
     ani = animation.FuncAnimation(fig, update, interval=25, save_count=50)
+    if resume:
+        restore_state()
+    if threaded:
+        toggle_worker()
 
 
     # Display the animation
     plt.show()
+    if finish_probe is not None:
+        finish_probe()
+
+
+# Rule named by a pattern file; Golly's bounded-grid suffix (B3/S23:T100,100) is dropped
+def _pattern_rule(text):
+    if not text:
+        return None
+    try:
+        return parse_rule(text.split(':')[0])
+    except ValueError:
+        print(f'Ignoring the unsupported rule {text!r} of the pattern')
+        return None
+
+
+# Recording encoding of a board under `rule`: bit-packed for two states, whole bytes for Generations
+def _grid_encoding(rule):
+    return 'bits' if rule.states == 2 else 'states'
+
+
+# Headless batch mode: step the board in a tight loop and report generations per second
+def run_headless(args):
+    if args.seed is not None:
+        np.random.seed(args.seed)
+    grid = _init_grid(args.size, args.ratio).astype(float)
+    file_rule = None
+    first_generation = 0
+    if args.pattern:
+        rows, cols, text = read_pattern(args.pattern)
+        grid = to_grid(rows, cols, (args.size, args.size))
+        file_rule = _pattern_rule(text)
+    if args.resume:
+        # Continue a saved run: board, rule, generation count and the np.random state
+        arrays, meta = load_checkpoint(args.resume)
+        grid = arrays['grid'].astype(float)
+        args.size = grid.shape[0]
+        args.boundary = args.boundary or meta['boundary_mode']
+        file_rule = parse_rule(meta['rule'])
+        first_generation = meta['generation']
+        set_random_state(meta['random_state'])
+    args.boundary = args.boundary or 'wrap'
+    rule = parse_rule(args.rule) if args.rule else file_rule
+    if args.radius is not None or args.neighborhood is not None:
+        rule = (rule or CONWAY).with_neighborhood(args.radius or 1, args.neighborhood or 'moore')
+    if rule is not None and not rule.is_conway and args.engine not in ("convolve", "sparse"):
+        raise SystemExit(f'--engine {args.engine} only runs B3/S23; use --engine convolve for {rule}')
+    if rule is not None and args.engine != 'sparse' and args.boundary == 'wrap' and rule.radius >= args.size:
+        # A wrapped neighborhood wider than the board would reach the same cells more than once
+        raise SystemExit(f'--radius {rule.radius} needs a board larger than {args.size} with --boundary wrap')
+    if args.stop_on_cycle and args.engine == 'sparse':
+        # The detector only sees the board's window, while cells outside it keep evolving
+        raise SystemExit('--stop-on-cycle needs a bounded board; use another --engine')
+    boundary = args.boundary
+
+    if args.engine == "bitpack":
+        from life_bitpack import BitPackedLife
+        engine = BitPackedLife(grid, args.boundary)
+        advance, result = engine.step, engine.to_dense
+    elif args.engine == "tiled":
+        engine = TiledLife(grid, args.boundary)
+        advance, result = (lambda n: [engine.step() for _ in range(n)]), (lambda: engine.grid)
+    elif args.engine == "parallel":
+        from parallel_step import ParallelLife
+        engine = ParallelLife(grid, args.boundary, args.workers)
+        advance, result = engine.step, (lambda: engine.grid)
+    elif args.engine == "sparse":
+        # Unbounded universe: cells leaving the board keep evolving, the result is the board's window
+        from life_sparse import SparseLife
+        engine = SparseLife(rule or CONWAY)
+        engine.load_grid(grid)
+        advance, result = engine.step, (lambda: engine.window(0, 0, args.size, args.size))
+        boundary = 'unbounded'
+    else:
+        if rule is None:
+            optional_convolve2d()  # keep the one-off scipy import out of the timing
+        def advance(n):
+            nonlocal grid
+            for _ in range(n):
+                grid = next_gen(grid, args.boundary, rule=rule)
+        result = lambda: grid
+
+    recorder = None
+    if args.record:
+        from recorder import Recorder
+        recorder = Recorder(args.record, {'grid': _grid_encoding(rule or CONWAY)}, every=args.record_every)
+    cycles = CycleDetector() if args.stop_on_cycle else None
+    profiler = Profiler(args.profile or args.profile_out is not None, export=args.profile_out)
+    start = time.perf_counter()
+    stepped = args.generations
+    if recorder is None and cycles is None and not profiler.enabled:
+        advance(args.generations)
+    else:
+        # Step in record-sized strides so every Nth generation is handed to the recorder thread,
+        # or one generation at a time while watching for a cycle or timing each generation
+        stride = 1 if cycles is not None or profiler.enabled else recorder.every
+        if recorder is not None:
+            recorder.record(0, grid=result())
+        if cycles is not None:
+            cycles.update(result(), 0)
+        done = 0
+        while done < args.generations:
+            n = min(stride, args.generations - done)
+            with profiler.stage('step'):
+                advance(n)
+            done += n
+            if recorder is not None:
+                with profiler.stage('record'):
+                    recorder.record(done, grid=result())
+            if cycles is not None:
+                with profiler.stage('cycle'):
+                    period = cycles.update(result(), done)
+                if period:
+                    # Whole periods leave the board unchanged; only the remainder needs stepping
+                    skipped = cycles.skip(args.generations)
+                    stepped = args.generations - skipped
+                    advance(args.generations - done - skipped)
+                    break
+            profiler.frame()
+        if recorder is not None:
+            recorder.close()
+    elapsed = time.perf_counter() - start
+    profiler.close()
+    final = result()
+    if args.save_checkpoint:
+        save_checkpoint(args.save_checkpoint, {'grid': final, 'fade': np.zeros_like(final)}, {
+            'kind': 'life', 'generation': first_generation + args.generations, 'rule': str(rule or CONWAY),
+            'base_rule': str(rule or CONWAY), 'radius': (rule or CONWAY).radius,
+            'neighborhood': (rule or CONWAY).neighborhood, 'boundary_mode': args.boundary,
+            'tail_fade_rate': 0.33, 'gens_per_frame': 1, 'random_state': random_state(),
+        })
+    if args.save_pattern:
+        rows, cols = np.nonzero(final == 1)
+        write_pattern(args.save_pattern, rows, cols, str(rule or CONWAY))
+
+    rate = stepped / elapsed if elapsed > 0 else float('inf')
+    percentage = live_percentage(final)
+    print(f'{args.generations} generations of {args.size}x{args.size} ({args.engine}, {boundary}, {rule or CONWAY}) '
+          f'in {elapsed:.3f}s: {rate:.1f} gen/s, living cells {percentage:.2f}%')
+    if cycles is not None:
+        if cycles.period is None:
+            print(f'No cycle within the last {cycles.history} generations')
+        else:
+            print(f'Cycle: period {cycles.period} after a transient of {cycles.transient} generations '
+                  f'(stepped {stepped}, skipped {args.generations - stepped})')
+    if profiler.enabled:
+        print(profiler.text())
+
+    if args.render:
+        from matplotlib.image import imsave
+        imsave(args.render, final, cmap='Greens', vmin=0, vmax=1)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Conway's Game of Life")
+    parser.add_argument('--headless', action='store_true', help='run without a window and print gen/s')
+    parser.add_argument('--size', type=int, default=150)
+    parser.add_argument('--ratio', type=float, default=0.1, help='initial seeding ratio')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--generations', type=int, default=1000)
+    parser.add_argument('--boundary', choices=['wrap', 'open', 'fill'], default=None,
+                        help="edge handling (default wrap, or the checkpoint's with --resume)")
+    parser.add_argument('--engine', choices=['convolve', 'bitpack', 'tiled', 'parallel', 'sparse'], default='convolve')
+    parser.add_argument('--rule', default=None, help='B/S or Generations B/S/C rule, e.g. B36/S23 or B2/S/C3')
+    parser.add_argument('--radius', type=int, default=None,
+                        help='count neighbors within this radius, rescaling the rule (Larger than Life)')
+    parser.add_argument('--neighborhood', choices=['moore', 'von_neumann'], default=None)
+    parser.add_argument('--workers', type=int, default=None, help='worker threads for --engine parallel')
+    parser.add_argument('--render', metavar='PNG', help='save the final board as an image')
+    parser.add_argument('--pattern', metavar='FILE',
+                        help='start from an RLE, plaintext (.cells) or macrocell (.mc) pattern, centered')
+    parser.add_argument('--save-pattern', metavar='FILE', help='save the final board as .rle, .cells or .mc')
+    parser.add_argument('--resume', metavar='CKPT', help='continue from a checkpoint (saved with w in the viewer)')
+    parser.add_argument('--save-checkpoint', metavar='CKPT', help='save the final state as a checkpoint')
+    parser.add_argument('--checkpoint', metavar='CKPT', default='life.ckpt',
+                        help='file the viewer saves to with w and restores from with y')
+    parser.add_argument('--record', metavar='PATH', help='stream frames to a recording (see recorder.py)')
+    parser.add_argument('--record-every', type=int, default=1, help='record every Nth generation')
+    parser.add_argument('--stop-on-cycle', action='store_true',
+                        help='hash every generation and skip the rest of the run once the board repeats')
+    parser.add_argument('--profile', action='store_true', help='time each stage; the viewer shows it (key i)')
+    parser.add_argument('--profile-out', metavar='PATH', help='write stage timings every second (.csv or JSON lines)')
+    parser.add_argument('--threaded', action='store_true', help='step on a background thread in the viewer')
+    parser.add_argument('--sim-rate', type=float, default=None, help='cap the background thread at N gen/s')
+    parser.add_argument('--startup-probe', action='store_true',
+                        help='print the time to the first frame, then close (see benchmarks/startup.py)')
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.headless:
+        run_headless(args)
+    else:
+        main(args.threaded, args.sim_rate, args.profile, args.profile_out, args.pattern, args.resume or args.checkpoint,
+             args.resume is not None, args.startup_probe)
 
@@ -8,9 +8,29 @@ a = Analysis(
     datas=[],
     hiddenimports=[],
     hookspath=[],
-    hooksconfig={},
+    # Collect only the Tk backend (and Agg, which it draws with) instead of every importable one
+    hooksconfig={'matplotlib': {'backends': ['TkAgg']}},
     runtime_hooks=[],
-    excludes=[],
+    # Packages the viewer never imports but that analysis pulls in when they are installed. SciPy is
+    # optional (stencil.optional_convolve2d falls back to NumPy), and with the Tk backend matplotlib needs
+    # none of the other GUI toolkits.
+    excludes=[
+        'scipy',
+        'IPython',
+        'jupyter',
+        'notebook',
+        'pandas',
+        'PyQt5',
+        'PyQt6',
+        'PySide2',
+        'PySide6',
+        'wx',
+        'gi',
+        'tornado',
+        'pytest',
+        'sphinx',
+        'docutils',
+    ],
     noarchive=False,
 )
 pyz = PYZ(a.pure)
@@ -24,7 +44,8 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    # UPX-packed libraries are unpacked on every launch, which slows startup more than it saves disk
+    upx=False,
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -37,7 +58,8 @@ coll = COLLECT(
     a.binaries,
     a.datas,
     strip=False,
-    upx=True,
+    # UPX-packed libraries are unpacked on every launch, which slows startup more than it saves disk
+    upx=False,
     upx_exclude=[],
     name='Game_of_Life',
 )
@@ -0,0 +1,282 @@
+"""Benchmarks for stepping, rendering and whole-frame cost of both viewers.
+
+Every case is timed per generation (median and best of repeated calls) and
+then run once more under ``tracemalloc`` for its memory: ``state_mb`` is what
+the case holds between steps, ``peak_mb`` the high-water mark during a step and
+``alloc_kb`` the transient allocation one step needs on top of its state (a
+constant ~100 KB of interpreter overhead for the allocation-free paths).
+
+Cases are named ``<model>/<stage>/<variant>/<size>``:
+
+``life/step``    ``next_gen`` through scipy convolution and through the rule table
+``life/render``  ``fade_step`` + ``LifeRenderer.render``
+``life/frame``   step + render + drawing the image on an Agg canvas
+``bz/step``      ``BZStepper.step`` for every boundary mode, and open/fill with the round mask
+``bz/render``    ``PaletteRenderer.render`` for every palette
+``bz/frame``     step + palette + drawing on an Agg canvas
+
+Results go to JSON; ``--compare`` checks them against a stored baseline and
+exits with status 1 if any case got slower (or needs more memory) by more than
+``--threshold``. The comparison uses the best time, which is far less noisy
+than the median on a busy machine, and ignores differences under
+``--noise-ms``. Timings only compare on the machine that wrote the baseline, so
+regenerate it there with ``--save-baseline``::
+
+    python -m benchmarks.run --quick --compare benchmarks/baseline.json
+    python -m benchmarks.run --sizes 64,256,1024,4096,8192 --out results.json
+    python -m benchmarks.run --quick --save-baseline
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import numpy as np
+
+from BZ_visualization import BZStepper, random_substrates, round_mask_for
+from Game_of_Life import _init_grid, next_gen
+from bz_palettes import PALETTES, PaletteRenderer
+from life_render import LifeRenderer, fade_step
+from life_rules import CONWAY
+
+BASELINE = Path(__file__).with_name("baseline.json")
+SIZES = [64, 256, 1024, 2048, 4096, 8192]
+QUICK_SIZES = [64, 256]
+BOUNDARY_MODES = ["wrap", "open", "fill"]
+
+# A case builds its state once and returns the function that runs one generation (or frame)
+Case = Callable[[], Callable[[], object]]
+
+
+def _figure(shape: tuple[int, int], rgb: bool):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(6, 6), dpi=100)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.axis("off")
+    img = ax.imshow(np.zeros(shape + ((4,) if rgb else ()), dtype=np.uint8), interpolation="nearest")
+    return fig, img
+
+
+def life_step(size: int, mode: str, engine: str) -> Case:
+    def setup():
+        state = {"grid": _init_grid(size, 0.25).astype(float)}
+        rule = CONWAY if engine == "table" else None
+
+        def run():
+            state["grid"] = next_gen(state["grid"], mode, rule=rule)
+
+        return run
+
+    return setup
+
+
+def life_render(size: int) -> Case:
+    def setup():
+        grid = _init_grid(size, 0.25).astype(float)
+        fade = np.zeros_like(grid)
+        alive = np.zeros(grid.shape, dtype=bool)
+        renderer = LifeRenderer(grid.shape)
+        renderer.set_colors((0.18, 0.8, 0.44), (0.67, 0.92, 0.78))
+        grids = [grid, next_gen(grid, "wrap", rule=CONWAY)]
+        state = {"i": 0}
+
+        def run():
+            # Alternate two generations so the renderer sees a realistic amount of change
+            state["i"] ^= 1
+            current = grids[state["i"]]
+            fade_step(current, fade, 0.33, alive)
+            return renderer.render(current, fade)
+
+        return run
+
+    return setup
+
+
+def life_frame(size: int, mode: str) -> Case:
+    def setup():
+        state = {"grid": _init_grid(size, 0.25).astype(float)}
+        fade = np.zeros_like(state["grid"])
+        alive = np.zeros(fade.shape, dtype=bool)
+        renderer = LifeRenderer(fade.shape)
+        renderer.set_colors((0.18, 0.8, 0.44), (0.67, 0.92, 0.78))
+        fig, img = _figure(fade.shape, rgb=True)
+
+        def run():
+            state["grid"] = next_gen(state["grid"], mode, rule=CONWAY)
+            fade_step(state["grid"], fade, 0.33, alive)
+            img.set_data(renderer.render(state["grid"], fade))
+            fig.canvas.draw()
+
+        return run
+
+    return setup
+
+
+def bz_step(size: int, mode: str, masked: bool) -> Case:
+    def setup():
+        a, b, c = random_substrates(size, seed=0)
+        mask = round_mask_for(size) if masked else None
+        stepper = BZStepper(a, b, c, mode, mask)
+        return lambda: stepper.step(1.0, 1.0, 1.0)
+
+    return setup
+
+
+def bz_render(size: int, palette: str) -> Case:
+    def setup():
+        stepper = BZStepper(*random_substrates(size, seed=0))
+        for _ in range(5):
+            fields = stepper.step(1.0, 1.0, 1.0)
+        renderer = PaletteRenderer((size, size))
+        return lambda: renderer.render(palette, *fields)
+
+    return setup
+
+
+def bz_frame(size: int, palette: str) -> Case:
+    def setup():
+        stepper = BZStepper(*random_substrates(size, seed=0))
+        renderer = PaletteRenderer((size, size))
+        fig, img = _figure((size, size), rgb=True)
+
+        def run():
+            img.set_data(renderer.render(palette, *stepper.step(1.0, 1.0, 1.0)))
+            fig.canvas.draw()
+
+        return run
+
+    return setup
+
+
+def cases(sizes: list[int], frame_max: int) -> Iterator[tuple[str, Case]]:
+    for size in sizes:
+        for engine in ("convolve", "table"):
+            for mode in BOUNDARY_MODES:
+                yield f"life/step/{engine}-{mode}/{size}", life_step(size, mode, engine)
+        yield f"life/render/fade/{size}", life_render(size)
+        for mode in BOUNDARY_MODES:
+            yield f"bz/step/{mode}/{size}", bz_step(size, mode, masked=False)
+        for mode in ("open", "fill"):
+            # The viewer never combines wrap with the round mask
+            yield f"bz/step/{mode}-round/{size}", bz_step(size, mode, masked=True)
+        for palette in PALETTES:
+            yield f"bz/render/{palette}/{size}", bz_render(size, palette)
+        if size <= frame_max:
+            yield f"life/frame/wrap/{size}", life_frame(size, "wrap")
+            yield f"bz/frame/relief/{size}", bz_frame(size, "relief")
+
+
+def measure(setup: Case, min_time: float, max_repeat: int) -> dict:
+    np.random.seed(0)
+    run = setup()
+    run()  # warm-up: lookup tables, first-call imports, caches
+    times = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < 3 or (len(times) < max_repeat and time.perf_counter() < deadline):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    del run
+
+    np.random.seed(0)
+    tracemalloc.start()
+    run = setup()
+    run()
+    state, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ms": 1e3 * statistics.median(times),
+        "best_ms": 1e3 * min(times),
+        "repeats": len(times),
+        "state_mb": state / 2 ** 20,
+        "peak_mb": peak / 2 ** 20,
+        "alloc_kb": max(peak - state, 0) / 2 ** 10,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float, noise_ms: float = 0.05) -> list[str]:
+    """Names of the cases that regressed in time or peak memory beyond ``threshold``."""
+    regressions = []
+    print(f"\n{'case':<34}{'base best':>10}{'best ms':>10}{'ratio':>8}{'base MB':>9}{'MB':>9}")
+    for name, result in results["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        ratio = result["best_ms"] / base["best_ms"] if base["best_ms"] > 0 else 1.0
+        slower = ratio > 1.0 + threshold and result["best_ms"] - base["best_ms"] > noise_ms
+        # Small absolute differences in memory are allocator noise, not regressions
+        bigger = result["peak_mb"] > base["peak_mb"] * (1.0 + threshold) and result["peak_mb"] - base["peak_mb"] > 1.0
+        flag = "  REGRESSION" if slower or bigger else ""
+        print(f"{name:<34}{base['best_ms']:10.3f}{result['best_ms']:10.3f}{ratio:8.2f}"
+              f"{base['peak_mb']:9.1f}{result['peak_mb']:9.1f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark stepping, rendering and frame cost")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated board sizes")
+    parser.add_argument("--quick", action="store_true", help=f"only sizes {QUICK_SIZES}")
+    parser.add_argument("--only", default="", help="run cases whose name contains this text")
+    parser.add_argument("--frame-max", type=int, default=2048, help="largest size for the frame cases")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend timing each case")
+    parser.add_argument("--max-repeat", type=int, default=200)
+    parser.add_argument("--out", default="benchmark-results.json", help="where to write the results")
+    parser.add_argument("--compare", metavar="JSON", help="baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--noise-ms", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the results to {BASELINE}")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else [int(s) for s in args.sizes.split(",")]
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sizes": sizes,
+        },
+        "cases": {},
+    }
+    print(f"{'case':<34}{'ms':>10}{'best ms':>10}{'state MB':>10}{'peak MB':>9}{'alloc KB':>10}")
+    for name, setup in cases(sizes, args.frame_max):
+        if args.only not in name:
+            continue
+        result = results["cases"][name] = measure(setup, args.min_time, args.max_repeat)
+        print(f"{name:<34}{result['ms']:10.3f}{result['best_ms']:10.3f}{result['state_mb']:10.1f}"
+              f"{result['peak_mb']:9.1f}{result['alloc_kb']:10.0f}", flush=True)
+
+    Path(args.out).write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Wrote {args.out}")
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Wrote {BASELINE}")
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.threshold, args.noise_ms)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
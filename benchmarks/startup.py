@@ -0,0 +1,98 @@
+"""Startup time of the two viewers, from the script and from a frozen build.
+
+Each run launches a fresh process. ``import`` is the median wall time of
+``python -c "import Game_of_Life"`` (or ``BZ_visualization``) minus that of
+``python -c pass``: only the module-level imports, without the interpreter
+itself. ``first frame`` is the wall time from launching ``python
+Game_of_Life.py --startup-probe`` until the viewer prints its first-frame line,
+which includes interpreter start, the imports, building the figure and the
+first draw. ``--frozen`` times the PyInstaller executable built from
+``Game_of_Life.spec`` the same way::
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --frozen dist/Game_of_Life/Game_of_Life --runs 10
+
+Without a display the viewers draw on Agg (``MPLBACKEND=Agg``), which skips
+opening a window but still builds and renders the whole figure.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+VIEWERS = {"life": "Game_of_Life", "bz": "BZ_visualization"}
+TIMEOUT = 120
+
+
+def _environment(backend: str | None) -> dict:
+    env = dict(os.environ)
+    if backend:
+        env["MPLBACKEND"] = backend
+    elif "MPLBACKEND" not in env and sys.platform.startswith("linux") and not (
+            env.get("DISPLAY") or env.get("WAYLAND_DISPLAY")):
+        env["MPLBACKEND"] = "Agg"
+    return env
+
+
+def _wall(command: list[str], env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run(command, cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                   timeout=TIMEOUT)
+    return time.perf_counter() - start
+
+
+def _first_frame(command: list[str], env: dict) -> float:
+    """Seconds from launching ``command`` until it prints its first-frame line."""
+    start = time.perf_counter()
+    with subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                          text=True) as process:
+        try:
+            for line in process.stdout:
+                if line.startswith("first frame:"):
+                    return time.perf_counter() - start
+        finally:
+            process.stdout.close()
+            process.wait(timeout=TIMEOUT)
+    raise RuntimeError(f"{' '.join(command)} exited without drawing a frame")
+
+
+def measure(runs: int, frozen: str | None, backend: str | None) -> dict:
+    env = _environment(backend)
+    python = [sys.executable]
+    baseline = statistics.median(_wall(python + ["-c", "pass"], env) for _ in range(runs))
+    results = {}
+    for key, module in VIEWERS.items():
+        imports = [_wall(python + ["-c", f"import {module}"], env) - baseline for _ in range(runs)]
+        frames = [_first_frame(python + [f"{module}.py", "--startup-probe"], env) for _ in range(runs)]
+        results[f"{key}/import"] = imports
+        results[f"{key}/first_frame"] = frames
+    if frozen:
+        results["life/frozen/first_frame"] = [_first_frame([frozen, "--startup-probe"], env) for _ in range(runs)]
+    return {name: {"median_ms": statistics.median(times) * 1e3, "best_ms": min(times) * 1e3}
+            for name, times in results.items()}
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="launches per measurement")
+    parser.add_argument("--frozen", metavar="EXE", help="also time this PyInstaller build of Game_of_Life")
+    parser.add_argument("--backend", help="matplotlib backend (default: the usual one, Agg without a display)")
+    parser.add_argument("--out", metavar="JSON", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = measure(args.runs, args.frozen, args.backend)
+    print(f"{'case':<26}{'median':>10}{'best':>10} ms")
+    for name, stats in results.items():
+        print(f"{name:<26}{stats['median_ms']:10.1f}{stats['best_ms']:10.1f}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""Lookup-table palettes for the BZ viewer.
+
+The reference palettes below are the per-frame formulas the viewer used to
+evaluate on every frame (gradients, ``arctan2``, ``np.std`` over stacked
+copies, ``hsv_to_rgb``, colormap calls). ``PaletteRenderer`` instead quantizes
+the (a, b, c) inputs and gathers uint8 RGB from precomputed tables into one
+reused buffer:
+
+``hue``/``turbo``/``triad``  a 3D table over ``levels**3`` quantized (a, b, c),
+``soft``                     one 256-entry table per channel,
+``relief``                   a 1D table over the relief height; only the cheap
+                             gradient stays per-frame, computed in reused buffers.
+
+Tables are built lazily from the reference functions, so each LUT palette
+matches its reference up to quantization; ``palette_error`` measures that and
+``TOLERANCE`` bounds it. Running the module prints ms/frame per palette::
+
+    python bz_palettes.py --size 300 --frames 50
+"""
+
+import argparse
+import time
+from collections import deque
+
+import numpy as np
+
+PALETTES = {
+    "relief": "Relief (plasma)",
+    "hue": "Hue wheel",
+    "turbo": "Turbo depth",
+    "soft": "Soft RGB",
+    "triad": "Triad blend",
+}
+# Allowed difference from the reference palette in 8-bit color units.
+TOLERANCE = {"mean": 1.5, "p99": 8.0}
+
+TRIAD_PALETTE = np.array([[29, 210, 168], [255, 120, 104], [250, 207, 90]], dtype=float) / 255.0
+
+
+def _colormap(name: str):
+    import matplotlib
+
+    return matplotlib.colormaps[name]
+
+
+def _relief_norm(vmin: float | None = None, vmax: float | None = None):
+    from matplotlib import colors
+
+    return colors.PowerNorm(gamma=0.7, vmin=vmin, vmax=vmax)
+
+
+# --- reference palettes ------------------------------------------------------
+
+
+def relief_height(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    field = 0.55 * a + 0.35 * b + 0.10 * c
+    grad_y, grad_x = np.gradient(field)
+    edge = np.sqrt(grad_x ** 2 + grad_y ** 2)
+    return np.clip(field + 0.45 * edge, 0.0, 1.0)
+
+
+def color_relief(a: np.ndarray, b: np.ndarray, c: np.ndarray, norm=None) -> np.ndarray:
+    # The viewer shares one PowerNorm across frames, so it autoscales on the first frame only.
+    norm = _relief_norm() if norm is None else norm
+    return _colormap("plasma")(norm(relief_height(a, b, c)))[..., :3]
+
+
+def color_hue(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    from matplotlib import colors
+
+    total = a + b + c + 1e-6
+    hue = (np.arctan2(c - b, a - 0.5 * (b + c)) / (2 * np.pi)) % 1.0
+    sat = np.clip(np.std(np.stack([a, b, c], axis=-1), axis=-1) * 1.6, 0.0, 1.0)
+    val = np.clip(0.65 * total / 3.0 + 0.35 * np.max(np.stack([a, b, c], axis=-1), axis=-1), 0.0, 1.0)
+    return colors.hsv_to_rgb(np.stack([hue, sat, val], axis=-1))
+
+
+def color_turbo(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    level = np.clip(
+        0.6 * (a + b + c) / 3.0 + 0.4 * np.std(np.stack([a, b, c], axis=-1), axis=-1),
+        0.0,
+        1.0,
+    )
+    return _colormap("turbo")(level)[..., :3]
+
+
+def soft_rgb(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    red = 0.25 + 0.75 * a
+    green = 0.25 + 0.75 * c
+    blue = 0.25 + 0.75 * b
+    return np.stack([red, green, blue], axis=-1)
+
+
+def color_triad(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    weights = np.stack([a, b, c], axis=-1)
+    weights /= weights.sum(axis=-1, keepdims=True) + 1e-6
+    return np.einsum("...k,kc->...c", weights, TRIAD_PALETTE)
+
+
+REFERENCE = {
+    "relief": color_relief,
+    "hue": color_hue,
+    "turbo": color_turbo,
+    "soft": soft_rgb,
+    "triad": color_triad,
+}
+
+
+def _to_u8(rgb: np.ndarray) -> np.ndarray:
+    return np.round(np.clip(rgb, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+# --- lookup-table renderer ---------------------------------------------------
+
+
+class PaletteRenderer:
+    """Render (a, b, c) fields to a persistent ``(H, W, 3)`` uint8 buffer.
+
+    ``levels`` is the per-substrate resolution of the 3D tables and
+    ``relief_levels`` the resolution of the relief height table. The relief
+    normalization is fixed from the first relief frame, like the viewer's
+    shared ``PowerNorm``; ``reset_relief`` rescales on the next frame.
+    """
+
+    def __init__(self, shape: tuple[int, int], levels: int = 64, relief_levels: int = 4096):
+        self.levels = levels
+        self.relief_levels = relief_levels
+        self.rgb = np.zeros(shape + (3,), dtype=np.uint8)
+        self._flat = self.rgb.reshape(-1, 3)
+        self._scaled = np.empty(shape)
+        self._index = np.empty(shape, dtype=np.intp)
+        self._q = np.empty(shape, dtype=np.intp)
+        self._q8 = np.empty(shape, dtype=np.uint8)
+        self._channel = np.empty(shape, dtype=np.uint8)
+        self._field = np.empty(shape)
+        self._grad_y = np.empty(shape)
+        self._grad_x = np.empty(shape)
+        self._luts: dict[str, np.ndarray] = {}
+        self.relief_range: tuple[float, float] | None = None
+        self.timings = {name: deque(maxlen=200) for name in PALETTES}
+
+    def reset_relief(self):
+        self.relief_range = None
+        self._luts.pop("relief", None)
+
+    def ms_per_frame(self) -> dict[str, float]:
+        """Mean render time in ms for every palette drawn so far."""
+        return {name: 1e3 * float(np.mean(t)) for name, t in self.timings.items() if t}
+
+    def render(self, palette: str, a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+        start = time.perf_counter()
+        if palette == "relief":
+            self._render_relief(a, b, c)
+        elif palette == "soft":
+            self._render_soft(a, b, c)
+        else:
+            self._render_cube(palette, a, b, c)
+        self.timings[palette].append(time.perf_counter() - start)
+        return self.rgb
+
+    def _quantize(self, x: np.ndarray, levels: int, out: np.ndarray) -> np.ndarray:
+        # Substrates and the relief height stay within [0, 1], so adding 0.5 and
+        # truncating rounds to the nearest level without a clip.
+        np.multiply(x, levels - 1, out=self._scaled)
+        self._scaled += 0.5
+        np.copyto(out, self._scaled, casting="unsafe")
+        return out
+
+    def _cube_lut(self, palette: str) -> np.ndarray:
+        lut = self._luts.get(palette)
+        if lut is None:
+            axis = np.linspace(0.0, 1.0, self.levels)
+            a, b, c = np.meshgrid(axis, axis, axis, indexing="ij")
+            lut = _to_u8(REFERENCE[palette](a, b, c)).reshape(-1, 3)
+            self._luts[palette] = lut
+        return lut
+
+    def _render_cube(self, palette: str, a, b, c):
+        lut = self._cube_lut(palette)
+        index, q, n = self._index, self._q, self.levels
+        self._quantize(a, n, index)
+        index *= n
+        index += self._quantize(b, n, q)
+        index *= n
+        index += self._quantize(c, n, q)
+        np.take(lut, index.ravel(), axis=0, out=self._flat)
+
+    def _render_soft(self, a, b, c):
+        lut = self._luts.get("soft")
+        if lut is None:
+            lut = self._luts["soft"] = _to_u8(0.25 + 0.75 * np.linspace(0.0, 1.0, 256))
+        for channel, field in enumerate((a, c, b)):
+            np.take(lut, self._quantize(field, 256, self._q8), out=self._channel)
+            self.rgb[..., channel] = self._channel
+
+    def _render_relief(self, a, b, c):
+        field, gy, gx = self._field, self._grad_y, self._grad_x
+        np.multiply(a, 0.55, out=field)
+        field += 0.35 * b
+        field += 0.10 * c
+        # np.gradient: central differences inside, one-sided at the edges.
+        np.subtract(field[2:], field[:-2], out=gy[1:-1])
+        gy[1:-1] *= 0.5
+        np.subtract(field[1], field[0], out=gy[0])
+        np.subtract(field[-1], field[-2], out=gy[-1])
+        np.subtract(field[:, 2:], field[:, :-2], out=gx[:, 1:-1])
+        gx[:, 1:-1] *= 0.5
+        np.subtract(field[:, 1], field[:, 0], out=gx[:, 0])
+        np.subtract(field[:, -1], field[:, -2], out=gx[:, -1])
+        np.square(gx, out=gx)
+        np.square(gy, out=gy)
+        gx += gy
+        np.sqrt(gx, out=gx)
+        gx *= 0.45
+        field += gx
+        np.clip(field, 0.0, 1.0, out=field)
+
+        lut = self._luts.get("relief")
+        if lut is None:
+            if self.relief_range is None:
+                self.relief_range = (float(field.min()), float(field.max()))
+            norm = _relief_norm(*self.relief_range)
+            heights = np.linspace(0.0, 1.0, self.relief_levels)
+            lut = self._luts["relief"] = _to_u8(_colormap("plasma")(norm(heights))[:, :3])
+        np.take(lut, self._quantize(field, self.relief_levels, self._index).ravel(), axis=0, out=self._flat)
+
+
+def palette_error(renderer: PaletteRenderer, palette: str, a, b, c) -> dict[str, float]:
+    """Mean/p99/max difference in 8-bit units between the LUT and reference palette."""
+    if palette == "relief":
+        lut_rgb = renderer.render(palette, a, b, c).astype(float)
+        reference = color_relief(a, b, c, norm=_relief_norm(*renderer.relief_range))
+    else:
+        lut_rgb = renderer.render(palette, a, b, c).astype(float)
+        reference = REFERENCE[palette](a, b, c)
+    diff = np.abs(lut_rgb - np.clip(reference, 0.0, 1.0) * 255)
+    return {"mean": float(diff.mean()), "p99": float(np.percentile(diff, 99)), "max": float(diff.max())}
+
+
+def within_tolerance(error: dict[str, float]) -> bool:
+    return all(error[key] <= limit for key, limit in TOLERANCE.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare LUT palettes with the reference formulas")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=50, help="BZ steps before measuring")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from BZ_visualization import BZStepper, random_substrates
+
+    stepper = BZStepper(*random_substrates(args.size, seed=args.seed))
+    a, b, c = stepper.fields
+    for _ in range(args.steps):
+        a, b, c = stepper.step(1.2, 1.0, 1.0)
+
+    renderer = PaletteRenderer((args.size, args.size))
+    print(f"{'palette':<18}{'LUT ms':>9}{'ref ms':>9}{'speedup':>9}{'mean':>7}{'p99':>7}{'max':>7}  ok")
+    for palette, label in PALETTES.items():
+        error = palette_error(renderer, palette, a, b, c)
+        renderer.timings[palette].clear()
+        for _ in range(args.frames):
+            renderer.render(palette, a, b, c)
+        norm = _relief_norm(*renderer.relief_range) if palette == "relief" else None
+        # Both sides are timed up to uint8 RGB, the form the image ends up in either way.
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            if norm is not None:
+                _to_u8(color_relief(a, b, c, norm))
+            else:
+                _to_u8(REFERENCE[palette](a, b, c))
+        ref_ms = 1e3 * (time.perf_counter() - start) / args.frames
+        lut_ms = renderer.ms_per_frame()[palette]
+        print(
+            f"{label:<18}{lut_ms:9.2f}{ref_ms:9.2f}{ref_ms / lut_ms:8.1f}x"
+            f"{error['mean']:7.2f}{error['p99']:7.1f}{error['max']:7.1f}  {within_tolerance(error)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
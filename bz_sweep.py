@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Parallel parameter sweep over the BZ (alpha, beta, gamma) cube.
+
+Every combination of alpha, beta, gamma, boundary mode and mask is stepped on
+a process pool. Each finished run appends one JSON line to the results file
+with the mean substrate levels (as ``record_levels`` tracks them in the
+viewer), the oscillation period of the mean ``a`` level and a hash of the
+final state. Re-running with the same results file skips runs already in it,
+so an interrupted sweep resumes where it stopped::
+
+    python bz_sweep.py --alpha 0.4:1.6:7 --beta 0.4:1.6:7 --gamma 1.0 \\
+        --boundary wrap,open --mask full,round --steps 2000 --out sweep.jsonl
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from BZ_visualization import BZStepper, random_substrates, round_mask_for
+
+PARAM_KEYS = ("alpha", "beta", "gamma", "boundary", "mask", "size", "steps", "seed")
+
+
+def parse_values(spec: str) -> list[float]:
+    """Parse ``start:stop:num`` (inclusive linspace) or a comma-separated list."""
+    if ":" in spec:
+        start, stop, num = spec.split(":")
+        return [round(float(v), 10) for v in np.linspace(float(start), float(stop), int(num))]
+    return [float(v) for v in spec.split(",")]
+
+
+def oscillation_period(levels: np.ndarray, min_amplitude: float = 1e-4) -> int | None:
+    """Dominant period of a level series from its autocorrelation, or None if it is flat."""
+    x = levels - levels.mean()
+    if x.size < 4 or x.std() < min_amplitude:
+        return None
+    corr = np.correlate(x, x, mode="full")[x.size - 1:]
+    corr /= corr[0]
+    # The first peak after the autocorrelation first drops below zero is the period.
+    below = np.flatnonzero(corr < 0)
+    if below.size == 0:
+        return None
+    tail = corr[below[0]:]
+    lag = below[0] + int(np.argmax(tail))
+    return int(lag) if tail.max() > 0.2 else None
+
+
+def state_hash(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> str:
+    """Hash of the final state quantized to 8 bits per substrate."""
+    quantized = np.round(np.stack([a, b, c]) * 255).astype(np.uint8)
+    return hashlib.blake2b(quantized.tobytes(), digest_size=16).hexdigest()
+
+
+def run_point(params: dict) -> dict:
+    """Step one parameter point and summarize it."""
+    size = params["size"]
+    domain_mask = round_mask_for(size) if params["mask"] == "round" else None
+    boundary_mode = params["boundary"]
+    if domain_mask is not None and boundary_mode == "wrap":
+        boundary_mode = "open"
+    a, b, c = random_substrates(size, seed=params["seed"])
+    if domain_mask is not None:
+        a, b, c = a * domain_mask, b * domain_mask, c * domain_mask
+    stepper = BZStepper(a, b, c, boundary_mode, domain_mask)
+
+    steps = params["steps"]
+    levels = np.empty((steps + 1, 3))
+    levels[0] = a.mean(), b.mean(), c.mean()
+    for i in range(1, steps + 1):
+        a, b, c = stepper.step(params["alpha"], params["beta"], params["gamma"])
+        levels[i] = a.mean(), b.mean(), c.mean()
+
+    settled = levels[steps // 2:]
+    return {
+        **params,
+        "boundary_used": boundary_mode,
+        "final_levels": [float(v) for v in levels[-1]],
+        "mean_levels": [float(v) for v in settled.mean(axis=0)],
+        "level_std": [float(v) for v in settled.std(axis=0)],
+        "period": oscillation_period(settled[:, 0]),
+        "state_hash": state_hash(a, b, c),
+    }
+
+
+def _key(params: dict) -> str:
+    return json.dumps([params[k] for k in PARAM_KEYS])
+
+
+def completed_keys(path: str) -> set[str]:
+    """Keys of the runs already recorded in a results file."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                done.add(_key(json.loads(line)))
+            except (json.JSONDecodeError, KeyError):
+                continue  # a run cut off mid-write is simply redone
+    return done
+
+
+def drop_partial_line(path: str):
+    """Cut off a last line without its newline, left by a run killed mid-write, so appends start fresh."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as handle:
+        size = end = handle.seek(0, os.SEEK_END)
+        keep = 0
+        while end > 0:
+            start = max(0, end - 4096)
+            handle.seek(start)
+            newline = handle.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                keep = start + newline + 1
+                break
+            end = start
+        if keep < size:
+            handle.truncate(keep)
+
+
+def sweep(points: list[dict], out_path: str, workers: int | None = None) -> int:
+    """Run every point not yet in ``out_path``; returns the number of new runs."""
+    done = completed_keys(out_path)
+    todo = [p for p in points if _key(p) not in done]
+    if not todo:
+        return 0
+    drop_partial_line(out_path)
+    with open(out_path, "a", encoding="utf-8") as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_point, p) for p in todo]
+        for n, future in enumerate(as_completed(futures), 1):
+            out.write(json.dumps(future.result()) + "\n")
+            out.flush()
+            print(f"\r{n}/{len(todo)} runs", end="", flush=True)
+    print()
+    return len(todo)
+
+
+def build_points(args: argparse.Namespace) -> list[dict]:
+    grid = itertools.product(
+        parse_values(args.alpha), parse_values(args.beta), parse_values(args.gamma),
+        args.boundary.split(","), args.mask.split(","),
+    )
+    return [
+        {"alpha": al, "beta": be, "gamma": ga, "boundary": bd, "mask": mk,
+         "size": args.size, "steps": args.steps, "seed": args.seed}
+        for al, be, ga, bd, mk in grid
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the BZ alpha/beta/gamma parameter space")
+    parser.add_argument("--alpha", default="0.4:1.6:5", help="start:stop:num or comma list")
+    parser.add_argument("--beta", default="0.4:1.6:5")
+    parser.add_argument("--gamma", default="0.4:1.6:5")
+    parser.add_argument("--boundary", default="wrap", help="comma list of wrap/open/fill")
+    parser.add_argument("--mask", default="full", help="comma list of full/round")
+    parser.add_argument("--size", type=int, default=128)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="bz_sweep.jsonl")
+    args = parser.parse_args()
+
+    points = build_points(args)
+    new = sweep(points, args.out, args.workers)
+    print(f"{new} new runs, {len(points) - new} already in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""NumPy port of the 20-state Wolfram/hodgepodge BZ automaton in ``docs/wolfram-bz.js``.
+
+Cells hold states 0..19. A rule number is a base-20 integer whose digits
+(least significant first) give the next state for every 9-cell total
+0..``MAX_SUM``. The totalistic digits are expanded once into a
+``(STATE_COUNT, NEIGHBOR_SUM + 1)`` table indexed by (state, sum of the eight
+neighbors), so a generation is one neighbor sum and one table gather.
+
+Boundaries match the browser: "wrap" is toroidal, "open" skips neighbors
+outside the board or the round mask, and "fill" counts each of those as a copy
+of the center cell. Cells outside the mask are always 0.
+
+Seeding uses mulberry32, the same generator the browser page uses, so a seed,
+rule, size and mask give bit-identical boards on both sides. Compare them with
+``state_hash``, which the page shows in its HUD::
+
+    python bz_wolfram.py --seed 12345 --steps 200
+"""
+
+import argparse
+import hashlib
+import time
+
+import numpy as np
+
+from BZ_visualization import round_mask_for
+from stencil import fill_halo, moore_sum, pad
+
+STATE_COUNT = 20
+MAX_SUM = 9 * (STATE_COUNT - 1)  # 171
+NEIGHBOR_SUM = 8 * (STATE_COUNT - 1)  # 152
+DEFAULT_RULE = 1350851716507335422
+
+
+def decode_rule(number: int | str) -> np.ndarray:
+    """Base-20 digits of a rule number: the next state for each 9-cell total 0..MAX_SUM."""
+    n = abs(int(str(number).strip()))
+    totals = np.empty(MAX_SUM + 1, dtype=np.uint8)
+    for i in range(MAX_SUM + 1):
+        n, totals[i] = divmod(n, STATE_COUNT)
+    return totals
+
+
+def transition_table(totals: np.ndarray) -> np.ndarray:
+    """Expand a totalistic rule into the (state, neighbor sum) table used by ``step``."""
+    index = np.arange(STATE_COUNT)[:, None] + np.arange(NEIGHBOR_SUM + 1)[None, :]
+    return totals[np.minimum(index, MAX_SUM)]
+
+
+def mulberry32(seed: int, count: int) -> np.ndarray:
+    """The first ``count`` outputs of mulberry32 in [0, 1), as drawn by the browser page."""
+    # mulberry32 is counter based: call k hashes seed + k * 0x6D2B79F5 (mod 2**32).
+    steps = np.arange(1, count + 1, dtype=np.uint64) * np.uint64(0x6D2B79F5)
+    a = ((steps + np.uint64(seed & 0xFFFFFFFF)) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    t = (a ^ (a >> np.uint32(15))) * (a | np.uint32(1))
+    t = (t + (t ^ (t >> np.uint32(7))) * (t | np.uint32(61))) ^ t
+    return (t ^ (t >> np.uint32(14))) / 4294967296.0
+
+
+def seed_cells(size: int, seed: int, rule: int | str = DEFAULT_RULE,
+               domain_mask: np.ndarray | None = None) -> np.ndarray:
+    """Random board matching the page's ``reseed``: two draws per cell, active and level."""
+    totals = decode_rule(rule)
+    max_value = max(1, int(totals.max()) or STATE_COUNT - 1)
+    rule_active_rate = min(1.0, max(np.count_nonzero(totals) / totals.size, 0.02))
+    active_rate = min(1.0, max(0.03, rule_active_rate))
+    draws = mulberry32(seed, 2 * size * size).reshape(size, size, 2)
+    cells = np.floor(np.power(draws[..., 1], 1.6) * (max_value + 1)).astype(np.uint8)
+    cells[draws[..., 0] >= active_rate] = 0
+    if domain_mask is not None:
+        cells[~domain_mask] = 0
+    return cells
+
+
+# Neighbors missing per cell (outside the board or the mask), keyed by (shape, mask digest).
+_missing_cache: dict[tuple, np.ndarray] = {}
+
+
+def missing_neighbors(shape: tuple[int, int], domain_mask: np.ndarray | None) -> np.ndarray:
+    """How many of each cell's eight neighbors the "fill" boundary replaces with the center."""
+    digest = None if domain_mask is None else hashlib.blake2b(np.ascontiguousarray(domain_mask).tobytes()).digest()
+    key = (shape, digest)
+    missing = _missing_cache.get(key)
+    if missing is None:
+        valid = np.ones(shape, np.uint8) if domain_mask is None else domain_mask.astype(np.uint8)
+        missing = (8 - moore_sum(pad(valid, "fill"))).astype(np.uint16)
+        _missing_cache[key] = missing
+    return missing
+
+
+class WolframBZ:
+    """Repeated stepping of one board with reused buffers."""
+
+    def __init__(self, cells: np.ndarray, rule: int | str = DEFAULT_RULE,
+                 boundary_mode: str = "wrap", domain_mask: np.ndarray | None = None):
+        height, width = cells.shape
+        self.cells = np.array(cells, dtype=np.uint8)
+        self._next = np.empty_like(self.cells)
+        self._padded = np.zeros((height + 2, width + 2), np.uint16)
+        self._sums = np.empty((height, width), np.uint16)
+        self._filled = np.empty((height, width), np.uint16)
+        self._index = np.empty((height, width), np.intp)
+        self.set_rule(rule)
+        self.configure(boundary_mode, domain_mask)
+
+    def set_rule(self, rule: int | str):
+        self.rule = int(str(rule).strip())
+        self.table = transition_table(decode_rule(rule))
+        self._flat_table = self.table.ravel()
+
+    def configure(self, boundary_mode: str, domain_mask: np.ndarray | None = None):
+        self.boundary_mode = boundary_mode
+        self.domain_mask = domain_mask
+        self._valid = None if domain_mask is None else domain_mask.astype(np.uint8)
+        self._missing = missing_neighbors(self.cells.shape, domain_mask) if boundary_mode == "fill" else None
+
+    def step(self, generations: int = 1) -> np.ndarray:
+        padded, sums, index = self._padded, self._sums, self._index
+        for _ in range(generations):
+            interior = padded[1:-1, 1:-1]
+            if self._valid is None:
+                interior[...] = self.cells
+            else:
+                np.multiply(self.cells, self._valid, out=interior)
+            fill_halo(padded, self.boundary_mode)
+            moore_sum(padded, out=sums)
+            if self._missing is not None:
+                np.multiply(self.cells, self._missing, out=self._filled)
+                sums += self._filled
+            np.multiply(self.cells, NEIGHBOR_SUM + 1, out=index, dtype=np.intp)
+            index += sums
+            np.take(self._flat_table, index, out=self._next)
+            if self._valid is not None:
+                self._next *= self._valid
+            self.cells, self._next = self._next, self.cells
+        return self.cells
+
+
+def step(cells: np.ndarray, rule: int | str = DEFAULT_RULE, boundary_mode: str = "wrap",
+         domain_mask: np.ndarray | None = None) -> np.ndarray:
+    """One generation of ``cells``; ``WolframBZ`` avoids re-decoding the rule for long runs."""
+    return WolframBZ(cells, rule, boundary_mode, domain_mask).step().copy()
+
+
+def state_hash(cells: np.ndarray) -> str:
+    """32-bit FNV-1a of the cells in row-major order, as shown in the page's HUD."""
+    h = 0x811C9DC5
+    for byte in np.ascontiguousarray(cells, dtype=np.uint8).tobytes():
+        h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return f"{h:08x}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch runs of the 20-state Wolfram BZ automaton")
+    parser.add_argument("--seed", type=int, required=True, help="mulberry32 seed shown by the browser page")
+    parser.add_argument("--rule", default=str(DEFAULT_RULE), help="base-20 rule number")
+    parser.add_argument("--size", type=int, default=220)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--boundary", choices=["wrap", "open", "fill"], default="wrap")
+    parser.add_argument("--mask", choices=["full", "round"], default="full")
+    parser.add_argument("--save", metavar="NPY", help="save the final cells with numpy.save")
+    args = parser.parse_args()
+
+    domain_mask = round_mask_for(args.size) if args.mask == "round" else None
+    model = WolframBZ(seed_cells(args.size, args.seed, args.rule, domain_mask), args.rule, args.boundary, domain_mask)
+    print(f"step 0 hash {state_hash(model.cells)}")
+    start = time.perf_counter()
+    cells = model.step(args.steps)
+    elapsed = time.perf_counter() - start
+    rate = args.steps / elapsed if elapsed > 0 else float("inf")
+    print(f"step {args.steps} hash {state_hash(cells)} ({rate:.1f} steps/s)")
+    if args.save:
+        np.save(args.save, cells)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Still-life and oscillator detection from rolling Zobrist hashes.
+
+Every (cell, state) pair has a fixed pseudo-random 64-bit key, and a board
+hashes to the XOR of the keys of its non-zero cells. ``CycleDetector`` keeps a
+copy of the last board it saw and only re-keys the cells that changed since
+then, so an update costs one comparison plus work proportional to the number
+of changes. The hashes of the last ``history`` generations sit in a ring
+buffer; a hash that is already in the ring means the board has returned to an
+earlier state, which gives the period (1 for a still life) and the transient,
+the number of generations before the cycle was entered.
+
+Life grids are hashed as they are. Continuous fields such as the BZ substrates
+go through ``quantize`` first, so a run that has settled to within 8 bits
+counts as cycling.
+"""
+
+import numpy as np
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _keys(index: np.ndarray, states: np.ndarray, seed: int) -> np.ndarray:
+    """splitmix64 of (cell, state); state 0 (dead/empty) has key 0."""
+    z = index.astype(np.uint64) << np.uint64(8)
+    z |= states.astype(np.uint64)
+    z += np.uint64(seed) * _GOLDEN + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * _MIX1
+    z = (z ^ (z >> np.uint64(27))) * _MIX2
+    z ^= z >> np.uint64(31)
+    z[states == 0] = 0
+    return z
+
+
+def quantize(*fields: np.ndarray, levels: int = 256) -> np.ndarray:
+    """Stack [0, 1] fields into one uint8 array suitable for ``CycleDetector.update``."""
+    return np.round(np.stack(fields) * (levels - 1)).astype(np.uint8)
+
+
+class CycleDetector:
+    """Track one board's hash per generation and report when it starts repeating.
+
+    ``update(grid, generation)`` is called once per generation with a board of
+    small non-negative integer states (< 256). Edits between generations are
+    fine: they are hashed like any other change, and a cycle that an edit
+    breaks is dropped and the transient restarts from there.
+    """
+
+    def __init__(self, history: int = 256, seed: int = 0):
+        self.history = history
+        self.seed = seed
+        self._ring = np.zeros(history, dtype=np.uint64)
+        self._generations = np.full(history, -1, dtype=np.int64)
+        self.reset()
+
+    def reset(self):
+        self._previous = None
+        self._changed = None
+        self._ring[:] = 0
+        self._generations[:] = -1
+        self._last = None
+        self._count = 0
+        self.hash = 0
+        self.start = 0
+        self.period: int | None = None
+        self.transient: int | None = None
+        self.changed_cells = 0
+
+    def update(self, grid: np.ndarray, generation: int) -> int | None:
+        """Hash ``grid`` as ``generation`` and return the detected period, if any."""
+        flat = grid.reshape(-1)
+        previous = self._previous
+        if previous is None or previous.size != flat.size or self._last is None or generation <= self._last:
+            self.reset()
+            self._previous = previous = flat.astype(np.uint8)
+            self._changed = np.empty(flat.size, dtype=bool)
+            index = np.flatnonzero(previous)
+            self.hash = int(np.bitwise_xor.reduce(_keys(index, previous[index], self.seed)))
+            self.changed_cells = index.size
+            self.start = generation
+        else:
+            np.not_equal(flat, previous, out=self._changed)
+            index = np.flatnonzero(self._changed)
+            self.changed_cells = index.size
+            if index.size:
+                new = flat[index].astype(np.uint8)
+                self.hash ^= int(np.bitwise_xor.reduce(_keys(index, previous[index], self.seed)))
+                self.hash ^= int(np.bitwise_xor.reduce(_keys(index, new, self.seed)))
+                previous[index] = new
+        self._last = generation
+
+        # Most recent earlier generation with the same hash since the last break, if still in the ring
+        matches = np.flatnonzero((self._ring == np.uint64(self.hash)) & (self._generations >= self.start))
+        earlier = int(self._generations[matches].max()) if matches.size else None
+        if self.period is not None and earlier != generation - self.period:
+            self.period = self.transient = None
+            self.start = generation
+            earlier = None
+        if self.period is None and earlier is not None:
+            self.period = generation - earlier
+            self.transient = earlier - self.start
+
+        slot = self._count % self.history
+        self._ring[slot] = self.hash
+        self._generations[slot] = generation
+        self._count += 1
+        return self.period
+
+    def skip(self, target: int) -> int:
+        """Whole periods between the last update and ``target``, which a caller may skip.
+
+        The detector's generations are moved forward by that amount, so the
+        caller jumps its own generation counter by the returned value without
+        stepping; the board itself is unchanged by a whole number of periods.
+        """
+        if self.period is None or self._last is None:
+            return 0
+        skipped = (target - self._last) // self.period * self.period
+        if skipped <= 0:
+            return 0
+        self._generations[self._generations >= 0] += skipped
+        self._last += skipped
+        return skipped
+
+    def status(self) -> str:
+        """Short HUD text: nothing until a cycle is found."""
+        if self.period is None:
+            return ''
+        kind = 'still life' if self.period == 1 else f'period {self.period}'
+        return f'  Cycle: {kind} after {self.transient} gens'
@@ -77,6 +77,7 @@
 
   let needsDraw = true;
   let painting = false;
+  let remote = null;
 
   function clamp01(x) {
     return Math.min(1, Math.max(0, x));
@@ -148,7 +149,19 @@
     }
   }
 
+  function resetHistory() {
+    history.steps = [];
+    history.a = [];
+    history.b = [];
+    history.c = [];
+  }
+
   function reseed() {
+    if (remote) {
+      remote.send({ type: "reseed" });
+      resetHistory();
+      return;
+    }
     for (let i = 0; i < state.a.length; i += 1) {
       state.a[i] = Math.random();
       state.b[i] = Math.random();
@@ -160,10 +173,7 @@
       }
     }
     state.tick = 0;
-    history.steps = [];
-    history.a = [];
-    history.b = [];
-    history.c = [];
+    resetHistory();
     recordHistory();
     scheduleDraw();
   }
@@ -174,21 +184,24 @@
     } else {
       state.running = !state.running;
     }
+    if (remote) remote.send({ type: "run", running: state.running });
     pauseButton.textContent = state.running ? "Pause" : "Resume";
   }
 
-  function recordHistory() {
+  function recordHistory(means) {
     let sumA = 0;
     let sumB = 0;
     let sumC = 0;
-    for (let i = 0; i < state.a.length; i += 1) {
-      sumA += state.a[i];
-      sumB += state.b[i];
-      sumC += state.c[i];
+    if (!means) {
+      for (let i = 0; i < state.a.length; i += 1) {
+        sumA += state.a[i];
+        sumB += state.b[i];
+        sumC += state.c[i];
+      }
     }
-    const meanA = sumA / state.a.length;
-    const meanB = sumB / state.b.length;
-    const meanC = sumC / state.c.length;
+    const meanA = means ? means[0] : sumA / state.a.length;
+    const meanB = means ? means[1] : sumB / state.b.length;
+    const meanC = means ? means[2] : sumC / state.c.length;
     history.steps.push(state.tick);
     history.a.push(meanA);
     history.b.push(meanB);
@@ -299,6 +312,26 @@
     scheduleDraw();
   }
 
+  // Server frames carry the substrates quantized to bytes and their exact means
+  function applyFrame(view, buffer) {
+    const size = view.getUint16(5, true);
+    if (size !== state.size) {
+      state.size = size;
+      allocate();
+    }
+    const cells = size * size;
+    const planes = new Uint8Array(buffer, 19, 3 * cells);
+    const { a, b, c } = state;
+    for (let i = 0; i < cells; i += 1) {
+      a[i] = planes[i] / 255;
+      b[i] = planes[cells + i] / 255;
+      c[i] = planes[2 * cells + i] / 255;
+    }
+    state.tick = view.getUint32(1, true);
+    recordHistory([view.getFloat32(7, true), view.getFloat32(11, true), view.getFloat32(15, true)]);
+    scheduleDraw();
+  }
+
   function paletteSoft(a, b, c) {
     return [0.25 + 0.75 * a, 0.25 + 0.75 * c, 0.25 + 0.75 * b];
   }
@@ -434,9 +467,10 @@
       boundaryRow.querySelector(`.chip-btn[data-boundary="${state.boundary}"]`)?.textContent?.trim() ||
       state.boundary;
     const maskLabel = maskRow.querySelector(`.chip-btn[data-mask="${state.maskMode}"]`)?.textContent?.trim() || "";
+    const source = remote ? " • Streamed from frame_server.py" : "";
     hud.textContent = `Step ${state.tick} • α=${state.alpha.toFixed(2)} β=${state.beta.toFixed(
       2,
-    )} γ=${state.gamma.toFixed(2)} • ${boundaryLabel} | ${maskLabel} | ${paletteLabel}`;
+    )} γ=${state.gamma.toFixed(2)} • ${boundaryLabel} | ${maskLabel} | ${paletteLabel}${source}`;
   }
 
   function scheduleDraw() {
@@ -448,6 +482,10 @@
     const x = Math.floor(((event.clientX - rect.left) / rect.width) * state.size);
     const y = Math.floor(((event.clientY - rect.top) / rect.height) * state.size);
     if (x < 0 || y < 0 || x >= state.size || y >= state.size) return;
+    if (remote) {
+      remote.send({ type: "disturb", row: y, col: x });
+      return;
+    }
 
     const radius = 7;
     const maskActive = state.maskMode === "round";
@@ -517,6 +555,7 @@
       return;
     }
     state.boundary = boundary;
+    if (remote) remote.send({ type: "boundary", mode: boundary });
     clearActive(boundaryRow, ".chip-btn");
     const btn = boundaryRow.querySelector(`[data-boundary="${boundary}"]`);
     if (btn) btn.classList.add("active");
@@ -531,6 +570,7 @@
 
   function setMask(maskMode) {
     state.maskMode = maskMode;
+    if (remote) remote.send({ type: "mask", mode: maskMode });
     clearActive(maskRow, ".chip-btn");
     const btn = maskRow.querySelector(`[data-mask="${maskMode}"]`);
     if (btn) btn.classList.add("active");
@@ -550,24 +590,32 @@
     }),
   );
 
+  function sendRates() {
+    if (remote) remote.send({ type: "rates", alpha: state.alpha, beta: state.beta, gamma: state.gamma });
+  }
+
   alphaInput.addEventListener("input", () => {
     state.alpha = Number(alphaInput.value);
     alphaInput.nextElementSibling.textContent = state.alpha.toFixed(2);
+    sendRates();
     scheduleDraw();
   });
   betaInput.addEventListener("input", () => {
     state.beta = Number(betaInput.value);
     betaInput.nextElementSibling.textContent = state.beta.toFixed(2);
+    sendRates();
     scheduleDraw();
   });
   gammaInput.addEventListener("input", () => {
     state.gamma = Number(gammaInput.value);
     gammaInput.nextElementSibling.textContent = state.gamma.toFixed(2);
+    sendRates();
     scheduleDraw();
   });
   speedInput.addEventListener("input", () => {
     state.speedMs = Number(speedInput.value);
     speedInput.nextElementSibling.textContent = `${state.speedMs} ms`;
+    if (remote) remote.send({ type: "speed", ms: state.speedMs });
   });
 
   paletteRow.querySelectorAll(".chip-btn").forEach((btn) => {
@@ -587,7 +635,7 @@
 
   let lastStep = 0;
   function loop(timestamp) {
-    if (state.running && (timestamp - lastStep >= state.speedMs || !lastStep)) {
+    if (state.running && !remote && (timestamp - lastStep >= state.speedMs || !lastStep)) {
       stepOnce();
       lastStep = timestamp;
     }
@@ -605,6 +653,23 @@
     state.beta = Number(betaInput.value);
     state.gamma = Number(gammaInput.value);
     state.speedMs = Number(speedInput.value);
+    remote =
+      window.FrameClient &&
+      window.FrameClient.connect("bz", {
+        onFrame: applyFrame,
+        onOpen: () => {
+          const size = Number(new URLSearchParams(window.location.search).get("size")) || state.size;
+          remote.send({ type: "size", size });
+          sendRates();
+          remote.send({ type: "speed", ms: state.speedMs });
+          remote.send({ type: "mask", mode: state.maskMode });
+          remote.send({ type: "boundary", mode: state.boundary });
+          remote.send({ type: "run", running: state.running });
+        },
+        onStatus: (text) => {
+          hud.textContent = text;
+        },
+      });
     allocate();
     setPalette(state.palette);
     setBoundary(state.boundary);
@@ -0,0 +1,36 @@
+// Optional connection to frame_server.py. A page opened with ?server streams its
+// simulation from ws://<this host>/ws/<kind>; ?server=ws://host:port picks another
+// server. Without the parameter the pages keep simulating in the browser.
+window.FrameClient = (() => {
+  function serverUrl(kind) {
+    const params = new URLSearchParams(window.location.search);
+    if (!params.has("server")) return null;
+    const base = params.get("server") || `ws://${window.location.host || "127.0.0.1:8765"}`;
+    return `${base.replace(/\/$/, "")}/ws/${kind}`;
+  }
+
+  function connect(kind, { onFrame, onOpen, onStatus }) {
+    const url = serverUrl(kind);
+    if (!url) return null;
+    const socket = new WebSocket(url);
+    socket.binaryType = "arraybuffer";
+    socket.addEventListener("open", () => onOpen && onOpen());
+    socket.addEventListener("message", (event) => {
+      if (typeof event.data === "string") {
+        const message = JSON.parse(event.data);
+        if (message.type === "error" && onStatus) onStatus(`Server: ${message.message}`);
+        return;
+      }
+      onFrame(new DataView(event.data), event.data);
+    });
+    socket.addEventListener("close", () => onStatus && onStatus(`Disconnected from ${url}`));
+    socket.addEventListener("error", () => onStatus && onStatus(`Cannot reach ${url} — is frame_server.py running?`));
+    return {
+      send(message) {
+        if (socket.readyState === WebSocket.OPEN) socket.send(JSON.stringify(message));
+      },
+    };
+  }
+
+  return { connect };
+})();
@@ -20,8 +20,16 @@
     generation: 0,
     speedMs: 90,
     density: 0.18,
+    packed: null,
+    population: null,
   };
 
+  const LIVE = 0xffb7ed7e;
+  const DEAD = 0xff20140f;
+  let image = null;
+  let pixels = null;
+  let remote = null;
+
   function allocate() {
     const cells = state.rows * state.cols;
     state.grid = new Uint8Array(cells);
@@ -31,6 +39,10 @@
   }
 
   function randomize() {
+    if (remote) {
+      remote.send({ type: "reseed", density: state.density });
+      return;
+    }
     for (let i = 0; i < state.grid.length; i += 1) {
       state.grid[i] = Math.random() < state.density ? 1 : 0;
     }
@@ -39,12 +51,21 @@
   }
 
   function clear() {
+    if (remote) {
+      remote.send({ type: "clear" });
+      return;
+    }
     state.grid.fill(0);
     state.generation = 0;
     draw();
   }
 
   function setGridSize(size) {
+    if (remote) {
+      remote.send({ type: "size", size });
+      remote.send({ type: "reseed", density: state.density });
+      return;
+    }
     state.rows = size;
     state.cols = size;
     allocate();
@@ -81,20 +102,60 @@
 
   function draw() {
     const { rows, cols, grid } = state;
-    const image = ctx.createImageData(cols, rows);
-    const data = image.data;
+    if (!image || image.width !== cols || image.height !== rows) {
+      image = ctx.createImageData(cols, rows);
+      pixels = new Uint32Array(image.data.buffer);
+    }
     let live = 0;
-    for (let i = 0, p = 0; i < grid.length; i += 1, p += 4) {
+    for (let i = 0; i < grid.length; i += 1) {
       const on = grid[i];
       live += on;
-      const color = on ? [126, 237, 183] : [15, 20, 32];
-      data[p] = color[0];
-      data[p + 1] = color[1];
-      data[p + 2] = color[2];
-      data[p + 3] = 255;
+      pixels[i] = on ? LIVE : DEAD;
     }
     ctx.putImageData(image, 0, 0);
-    hud.textContent = `Generation ${state.generation} • Live cells ${live}`;
+    const source = remote ? " • Streamed from frame_server.py" : "";
+    hud.textContent = `Generation ${state.generation} • Live cells ${live}${source}`;
+  }
+
+  function unpackByte(offset) {
+    const bits = state.packed[offset];
+    const end = Math.min(offset * 8 + 8, state.grid.length);
+    for (let i = offset * 8, shift = 7; i < end; i += 1, shift -= 1) {
+      state.grid[i] = (bits >> shift) & 1;
+    }
+  }
+
+  // Full frames carry the packed board, deltas the bytes that changed since the last frame
+  function applyFrame(view, buffer) {
+    const kind = view.getUint8(0);
+    const rows = view.getUint16(5, true);
+    const cols = view.getUint16(7, true);
+    if (rows !== state.rows || cols !== state.cols) {
+      state.rows = rows;
+      state.cols = cols;
+      allocate();
+      state.packed = null;
+    }
+    if (kind === 1) {
+      state.packed = new Uint8Array(buffer.slice(13));
+      for (let offset = 0; offset < state.packed.length; offset += 1) unpackByte(offset);
+    } else if (kind === 2 && state.packed) {
+      const maskBytes = Math.ceil(state.packed.length / 8);
+      const mask = new Uint8Array(buffer, 13, maskBytes);
+      const diff = new Uint8Array(buffer, 13 + maskBytes);
+      for (let m = 0, k = 0; m < maskBytes; m += 1) {
+        if (!mask[m]) continue;
+        for (let bit = 0; bit < 8; bit += 1) {
+          if (!((mask[m] >> (7 - bit)) & 1)) continue;
+          const offset = m * 8 + bit;
+          state.packed[offset] ^= diff[k];
+          k += 1;
+          unpackByte(offset);
+        }
+      }
+    }
+    state.generation = view.getUint32(1, true);
+    draw();
   }
 
   function toggleRunning(force) {
@@ -103,6 +164,7 @@
     } else {
       state.running = !state.running;
     }
+    if (remote) remote.send({ type: "run", running: state.running });
     runButton.textContent = state.running ? "Pause" : "Resume";
   }
 
@@ -133,12 +195,13 @@
     const y = Math.floor(((e.clientY - rect.top) / rect.height) * state.rows);
     if (x < 0 || y < 0 || x >= state.cols || y >= state.rows) return;
     state.grid[y * state.cols + x] = value;
+    if (remote) remote.send({ type: "paint", cells: [[y, x]], value });
     draw();
   }
 
   let lastStep = 0;
   function loop(timestamp) {
-    if (state.running && timestamp - lastStep >= state.speedMs) {
+    if (state.running && !remote && timestamp - lastStep >= state.speedMs) {
       stepOnce();
       lastStep = timestamp;
       draw();
@@ -151,6 +214,10 @@
   runButton.addEventListener("click", () => toggleRunning());
   stepButton.addEventListener("click", () => {
     toggleRunning(false);
+    if (remote) {
+      remote.send({ type: "step" });
+      return;
+    }
     stepOnce();
     draw();
   });
@@ -160,6 +227,7 @@
   speedInput.addEventListener("input", () => {
     state.speedMs = Number(speedInput.value);
     speedInput.nextElementSibling.textContent = `${state.speedMs} ms`;
+    if (remote) remote.send({ type: "speed", ms: state.speedMs });
   });
 
   densityInput.addEventListener("input", () => {
@@ -187,7 +255,30 @@
   // Initial setup.
   state.speedMs = Number(speedInput.value);
   state.density = Number(densityInput.value);
-  setGridSize(Number(sizeInput.value));
+  remote =
+    window.FrameClient &&
+    window.FrameClient.connect("life", {
+      onFrame: applyFrame,
+      onOpen: () => {
+        const boundary = new URLSearchParams(window.location.search).get("boundary") || "wrap";
+        remote.send({ type: "speed", ms: state.speedMs });
+        remote.send({ type: "boundary", mode: boundary });
+        remote.send({ type: "run", running: state.running });
+        setGridSize(Number(sizeInput.value));
+      },
+      onStatus: (text) => {
+        hud.textContent = text;
+      },
+    });
+  if (remote) {
+    // The server steps boards far larger than the in-page loops can
+    sizeInput.max = "2000";
+    state.rows = Number(sizeInput.value);
+    state.cols = state.rows;
+    allocate();
+  } else {
+    setGridSize(Number(sizeInput.value));
+  }
   toggleRunning(true);
   draw();
   requestAnimationFrame(loop);
@@ -103,11 +103,44 @@
     speedMs: 70,
     palette: "ember",
     tick: 0,
+    seed: 0,
   };
 
   let needsDraw = true;
   let painting = false;
 
+  // mulberry32: small seedable generator mirrored by bz_wolfram.mulberry32, so a seed gives the
+  // same board in the browser and in Python batch runs.
+  function mulberry32(seed) {
+    let a = seed | 0;
+    return () => {
+      a = (a + 0x6d2b79f5) | 0;
+      let t = Math.imul(a ^ (a >>> 15), 1 | a);
+      t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+      return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+  }
+
+  function randomSeed() {
+    return Math.floor(Math.random() * 4294967296) >>> 0;
+  }
+
+  function initialSeed() {
+    const param = new URLSearchParams(window.location.search).get("seed");
+    const seed = param === null ? NaN : Number(param);
+    return Number.isInteger(seed) && seed >= 0 ? seed >>> 0 : randomSeed();
+  }
+
+  // 32-bit FNV-1a over the cells in row-major order; bz_wolfram.state_hash computes the same.
+  function stateHash() {
+    let h = 0x811c9dc5;
+    const { cells } = state;
+    for (let i = 0; i < cells.length; i += 1) {
+      h = Math.imul(h ^ cells[i], 0x01000193);
+    }
+    return (h >>> 0).toString(16).padStart(8, "0");
+  }
+
   function clamp01(x) {
     return Math.min(1, Math.max(0, x));
   }
@@ -193,10 +226,13 @@
   function reseed() {
     const maxValue = Math.max(1, state.ruleMaxValue || STATE_COUNT - 1);
     const activeRate = clamp01(Math.max(0.03, state.ruleActiveRate || 0));
+    const random = mulberry32(state.seed);
     let seedMax = 0;
     for (let i = 0; i < state.cells.length; i += 1) {
-      const isActive = Math.random() < activeRate;
-      const value = isActive ? Math.floor(Math.pow(Math.random(), 1.6) * (maxValue + 1)) : 0;
+      // Always two draws per cell so the stream lines up with the vectorized Python seeding.
+      const isActive = random() < activeRate;
+      const level = Math.floor(Math.pow(random(), 1.6) * (maxValue + 1));
+      const value = isActive ? level : 0;
       seedMax = value > seedMax ? value : seedMax;
       state.cells[i] = value;
       state.cellsNext[i] = 0;
@@ -417,7 +453,9 @@
     const boundaryLabel =
       boundaryRow.querySelector(`.chip-btn[data-boundary="${state.boundary}"]`)?.textContent?.trim() || state.boundary;
     const maskLabel = maskRow.querySelector(`.chip-btn[data-mask="${state.maskMode}"]`)?.textContent?.trim() || "";
-    hud.textContent = `Step ${state.tick} | Rule ${state.ruleNumber} | ${boundaryLabel} | ${maskLabel} | ${paletteLabel}`;
+    hud.textContent =
+      `Step ${state.tick} | Rule ${state.ruleNumber} | Seed ${state.seed} | Hash ${stateHash()} | ` +
+      `${boundaryLabel} | ${maskLabel} | ${paletteLabel}`;
   }
 
   function renderRuleTable(table) {
@@ -585,7 +623,10 @@
   });
 
   ruleInput.addEventListener("change", setRuleFromInput);
-  reseedButton.addEventListener("click", () => reseed());
+  reseedButton.addEventListener("click", () => {
+    state.seed = randomSeed();
+    reseed();
+  });
   pauseButton.addEventListener("click", () => toggleRunning());
 
   let lastStep = 0;
@@ -605,6 +646,7 @@
 
   function bootstrap() {
     state.speedMs = Number(speedInput.value);
+    state.seed = initialSeed();
     allocate();
     const defaultTable = decodeRule(state.ruleNumber);
     if (defaultTable) {
@@ -629,5 +671,8 @@
     scheduleDraw();
   });
 
+  // Console access for comparing against `python bz_wolfram.py --seed <seed> --steps <step>`.
+  window.wolframBZ = { state, stepOnce, reseed, stateHash };
+
   bootstrap();
 })();
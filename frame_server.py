@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""Local frame server: runs the Python engines and streams frames to ``docs/``.
+
+One asyncio process serves the ``docs/`` pages over HTTP and upgrades
+``/ws/life`` and ``/ws/bz`` to WebSockets (RFC 6455, standard library only).
+Every WebSocket connection gets its own simulation, stepped on a worker thread
+with ``step_rule`` (Life) or ``BZStepper`` (BZ) and streamed as binary frames.
+The pages switch to these frames when opened with ``?server``::
+
+    python frame_server.py --port 8765
+    # then http://127.0.0.1:8765/game-of-life.html?server
+    #      http://127.0.0.1:8765/bz-visualization.html?server
+
+Frames are little-endian; the first byte is the kind:
+
+``1`` Life, full     ``u32 generation, u16 rows, u16 cols, u32 population``,
+                     then the board as ``np.packbits`` (row-major, MSB first)
+``2`` Life, delta    the same header, a bit-packed mask of the bytes of the
+                     packed board that changed, then the XOR of each changed
+                     byte with its previous value, in order
+``3`` BZ             ``u32 step, u16 size, 3 f32`` mean of a, b, c, then the
+                     a, b and c planes quantized to uint8 (``round(255 * x)``)
+
+A delta is sent whenever it is smaller than the full board; it is always taken
+against the last frame that client actually received.
+
+Controls come back as JSON text messages ``{"type": ..., ...}``: ``run``
+(``running``), ``step``, ``speed`` (``ms`` between generations), ``size``,
+``reseed`` (Life: ``density``), ``boundary`` (``mode``) and, for Life,
+``clear`` and ``paint`` (``cells`` as [row, col] pairs, ``value``); for BZ
+``rates`` (``alpha``, ``beta``, ``gamma``), ``mask`` (``mode``) and
+``disturb`` (``row``, ``col``). Like ``SimWorker`` commands, they are applied
+between generations, never while a step runs.
+
+Backpressure: a frame is only written while the connection's outgoing buffer
+holds less than ``--max-buffered`` bytes. Otherwise the simulation keeps going
+and the client gets the newest generation once its socket drains, so a slow
+client sees dropped frames instead of the server queueing them in memory.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import mimetypes
+import struct
+from collections import deque
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+import numpy as np
+
+from BZ_visualization import BZStepper, round_mask_for
+from life_rules import CONWAY, step_rule
+
+DOCS = Path(__file__).resolve().with_name("docs")
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+MAX_MESSAGE = 1 << 20  # controls are small; anything bigger closes the connection
+RETRY = 0.01  # seconds between checks of a congested socket
+
+LIFE_FULL, LIFE_DELTA, BZ_FRAME = 1, 2, 3
+_LIFE_HEADER = struct.Struct("<BIHHI")
+_BZ_HEADER = struct.Struct("<BIH3f")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+# --- simulations --------------------------------------------------------------
+
+
+class Session:
+    """One client's simulation: controls in, encoded frames out.
+
+    ``apply`` runs a control message, ``advance`` one generation and ``encode``
+    the frame for the current state. ``changed`` is set when the state differs
+    from the last encoded frame.
+    """
+
+    kind = ""
+
+    def __init__(self, size: int, max_size: int, seed: int | None = None):
+        self.max_size = max_size
+        self.size = self._clamp_size(size)
+        self.rng = np.random.default_rng(seed)
+        self.running = True
+        self.interval = 0.05
+        self.pending_steps = 0
+        self.changed = True
+        self.generation = 0
+
+    def _clamp_size(self, size) -> int:
+        return int(min(max(int(size), 8), self.max_size))
+
+    def apply(self, message: dict):
+        handler = getattr(self, f"on_{message.get('type')}", None)
+        if handler is None:
+            raise ValueError(f"unknown control {message.get('type')!r} for {self.kind}")
+        handler(message)
+
+    def on_run(self, message: dict):
+        self.running = bool(message.get("running", not self.running))
+
+    def on_step(self, message: dict):
+        self.pending_steps += 1
+
+    def on_speed(self, message: dict):
+        self.interval = min(max(float(message["ms"]), 0.0), 10000.0) / 1e3
+
+    def advance(self):
+        raise NotImplementedError
+
+    def encode(self) -> list[bytes]:
+        raise NotImplementedError
+
+
+class LifeSession(Session):
+    kind = "life"
+
+    def __init__(self, size: int = 140, max_size: int = 2048, density: float = 0.18, boundary: str = "wrap",
+                 seed: int | None = None):
+        super().__init__(size, max_size, seed)
+        self.interval = 0.09
+        self.density = density
+        self.boundary = boundary
+        self.grid = np.zeros((self.size, self.size), dtype=np.uint8)
+        self._sent: np.ndarray | None = None
+        self.on_reseed({})
+
+    def on_reseed(self, message: dict):
+        self.density = min(max(float(message.get("density", self.density)), 0.0), 1.0)
+        self.grid = (self.rng.random(self.grid.shape) < self.density).view(np.uint8)
+        self.generation = 0
+        self.changed = True
+
+    def on_clear(self, message: dict):
+        self.grid[...] = 0
+        self.generation = 0
+        self.changed = True
+
+    def on_size(self, message: dict):
+        size = self._clamp_size(message["size"])
+        if size != self.size:
+            self.size = size
+            self.grid = np.zeros((size, size), dtype=np.uint8)
+            self._sent = None
+            self.on_reseed({})
+
+    def on_boundary(self, message: dict):
+        if message["mode"] not in ("wrap", "open", "fill"):
+            raise ValueError(f"unknown boundary mode {message['mode']!r}")
+        self.boundary = message["mode"]
+
+    def on_paint(self, message: dict):
+        cells = np.asarray(message["cells"], dtype=np.int64).reshape(-1, 2)
+        rows, cols = cells[:, 0], cells[:, 1]
+        inside = (rows >= 0) & (rows < self.size) & (cols >= 0) & (cols < self.size)
+        self.grid[rows[inside], cols[inside]] = 1 if message.get("value", 1) else 0
+        self.changed = True
+
+    def advance(self):
+        self.grid = step_rule(self.grid, CONWAY, self.boundary)
+        self.generation += 1
+        self.changed = True
+
+    def encode(self) -> list[bytes]:
+        packed = np.packbits(self.grid)
+        rows, cols = self.grid.shape
+        population = int(np.count_nonzero(self.grid))
+        sent, self._sent = self._sent, packed
+        self.changed = False
+        if sent is not None and sent.size == packed.size:
+            changed = packed != sent
+            mask = np.packbits(changed)
+            diff = packed[changed] ^ sent[changed]
+            if mask.size + diff.size < packed.size:
+                return [_LIFE_HEADER.pack(LIFE_DELTA, self.generation, rows, cols, population), mask.tobytes(),
+                        diff.tobytes()]
+        return [_LIFE_HEADER.pack(LIFE_FULL, self.generation, rows, cols, population), packed.tobytes()]
+
+
+class BZSession(Session):
+    kind = "bz"
+
+    def __init__(self, size: int = 200, max_size: int = 2048, seed: int | None = None):
+        super().__init__(size, max_size, seed)
+        self.interval = 0.07
+        self.alpha = self.beta = self.gamma = 1.0
+        self.boundary = "wrap"
+        self.mask = None
+        self._allocate()
+
+    def _allocate(self):
+        shape = (self.size, self.size)
+        self.stepper = BZStepper(*(np.zeros(shape, np.float32) for _ in range(3)), self.boundary, self.mask)
+        self._scaled = np.empty(shape, np.float32)
+        self._planes = np.empty((3,) + shape, np.uint8)
+        self.on_reseed({})
+
+    def on_reseed(self, message: dict):
+        for field in self.stepper.fields:
+            self.rng.random(dtype=np.float32, out=field)
+            if self.mask is not None:
+                field *= self.mask
+        self.generation = 0
+        self.changed = True
+
+    def on_size(self, message: dict):
+        size = self._clamp_size(message["size"])
+        if size != self.size:
+            self.size = size
+            if self.mask is not None:
+                self.mask = round_mask_for(size)
+            self._allocate()
+
+    def on_rates(self, message: dict):
+        self.alpha = float(message.get("alpha", self.alpha))
+        self.beta = float(message.get("beta", self.beta))
+        self.gamma = float(message.get("gamma", self.gamma))
+
+    def on_boundary(self, message: dict):
+        if message["mode"] not in ("wrap", "open", "fill"):
+            raise ValueError(f"unknown boundary mode {message['mode']!r}")
+        # The round mask never wraps, same as the viewer
+        self.boundary = "open" if message["mode"] == "wrap" and self.mask is not None else message["mode"]
+
+    def on_mask(self, message: dict):
+        if message["mode"] == "round":
+            self.mask = round_mask_for(self.size)
+            for field in self.stepper.fields:
+                field *= self.mask
+            if self.boundary == "wrap":
+                self.boundary = "open"
+        elif message["mode"] == "full":
+            self.mask = None
+        else:
+            raise ValueError(f"unknown mask {message['mode']!r}")
+        self.changed = True
+
+    def on_disturb(self, message: dict, radius: int = 7, strength: float = 0.6):
+        # Same stroke as the web demo: noise fading linearly to zero at the brush radius
+        rel = np.arange(-radius, radius + 1)
+        fade = np.maximum(0.0, 1.0 - np.hypot(rel[:, None], rel[None, :]) / radius)
+        noise = 0.65 * strength * fade * self.rng.uniform(-1.0, 1.0, fade.shape)
+        rows, cols = int(message["row"]) + rel, int(message["col"]) + rel
+        if self.boundary == "wrap":
+            keep_rows = keep_cols = np.ones(rel.shape, dtype=bool)
+            rows, cols = rows % self.size, cols % self.size
+        else:
+            keep_rows = (rows >= 0) & (rows < self.size)
+            keep_cols = (cols >= 0) & (cols < self.size)
+        index = np.ix_(rows[keep_rows], cols[keep_cols])
+        noise = noise[np.ix_(keep_rows, keep_cols)]
+        if self.mask is not None:
+            noise = noise * self.mask[index]
+        for field in self.stepper.fields:
+            field[index] = np.clip(field[index] + noise, 0.0, 1.0)
+        self.changed = True
+
+    def advance(self):
+        self.stepper.step(self.alpha, self.beta, self.gamma, self.boundary, self.mask)
+        self.generation += 1
+        self.changed = True
+
+    def encode(self) -> list[bytes]:
+        fields = self.stepper.fields
+        for plane, field in zip(self._planes, fields):
+            # Fields stay within [0, 1], so adding 0.5 and truncating rounds
+            np.multiply(field, 255, out=self._scaled)
+            self._scaled += 0.5
+            np.copyto(plane, self._scaled, casting="unsafe")
+        self.changed = False
+        means = (float(field.mean()) for field in fields)
+        return [_BZ_HEADER.pack(BZ_FRAME, self.generation, self.size, *means), self._planes.tobytes()]
+
+
+SESSIONS = {"/ws/life": LifeSession, "/ws/bz": BZSession}
+
+
+# --- WebSocket framing --------------------------------------------------------
+
+
+def _accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1(key.encode("ascii") + WS_GUID).digest()).decode("ascii")
+
+
+def _unmask(payload: bytes, mask: bytes) -> bytes:
+    data = np.frombuffer(payload, dtype=np.uint8)
+    return (data ^ np.resize(np.frombuffer(mask, dtype=np.uint8), data.size)).tobytes()
+
+
+def send_frame(writer: asyncio.StreamWriter, opcode: int, parts: list[bytes]):
+    """Write one unfragmented server frame (servers never mask) without joining the parts."""
+    length = sum(len(part) for part in parts)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    writer.write(header)
+    for part in parts:
+        writer.write(part)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[bool, int, bytes]:
+    """(fin, opcode, payload) of the next client frame."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if length > MAX_MESSAGE:
+        raise ProtocolError(f"frame of {length} bytes")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    return bool(first & 0x80), first & 0x0F, _unmask(payload, mask) if mask else payload
+
+
+async def read_messages(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Yield complete text and binary messages, answering pings and stopping at a close."""
+    fragments: list[bytes] = []
+    while True:
+        fin, opcode, payload = await read_frame(reader)
+        if opcode == OP_CLOSE:
+            send_frame(writer, OP_CLOSE, [payload[:2]])
+            return
+        if opcode == OP_PING:
+            send_frame(writer, OP_PONG, [payload])
+            continue
+        if opcode == OP_PONG:
+            continue
+        if opcode not in (OP_CONTINUATION, OP_TEXT, OP_BINARY):
+            raise ProtocolError(f"opcode {opcode}")
+        fragments.append(payload)
+        if sum(map(len, fragments)) > MAX_MESSAGE:
+            raise ProtocolError("message too large")
+        if fin:
+            yield b"".join(fragments)
+            fragments = []
+
+
+# --- connections --------------------------------------------------------------
+
+
+async def stream(session: Session, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 max_buffered: int) -> tuple[int, int]:
+    """Step ``session`` and send its frames until the client leaves; returns (sent, dropped)."""
+    loop = asyncio.get_running_loop()
+    inbox: deque = deque()
+    wake = asyncio.Event()
+
+    async def receive():
+        try:
+            async for message in read_messages(reader, writer):
+                try:
+                    inbox.append(json.loads(message))
+                except ValueError:
+                    send_frame(writer, OP_TEXT, [b'{"type": "error", "message": "controls must be JSON"}'])
+                wake.set()
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError):
+            pass
+        finally:
+            wake.set()
+
+    receiver = asyncio.create_task(receive())
+    sent = dropped = 0
+    next_step = loop.time()
+    try:
+        while not receiver.done() and not writer.is_closing():
+            while inbox:
+                try:
+                    session.apply(inbox.popleft())
+                except (KeyError, TypeError, ValueError, AttributeError) as exc:
+                    error = json.dumps({"type": "error", "message": str(exc)}).encode("utf-8")
+                    send_frame(writer, OP_TEXT, [error])
+            now = loop.time()
+            if session.pending_steps or (session.running and now >= next_step):
+                if session.changed and sent:
+                    dropped += 1  # the previous generation never reached the client
+                await asyncio.to_thread(session.advance)
+                session.pending_steps = max(session.pending_steps - 1, 0)
+                # A step slower than the interval delays the next one instead of queueing a burst
+                next_step = max(next_step + session.interval, now)
+            if session.changed and writer.transport.get_write_buffer_size() <= max_buffered:
+                send_frame(writer, OP_BINARY, await asyncio.to_thread(session.encode))
+                sent += 1
+
+            if inbox or session.pending_steps:
+                continue
+            if session.changed:
+                timeout = RETRY
+            elif session.running:
+                timeout = max(next_step - loop.time(), 0.0)
+            else:
+                timeout = None
+            wake.clear()
+            try:
+                await asyncio.wait_for(wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        receiver.cancel()
+    return sent, dropped
+
+
+async def serve_file(writer: asyncio.StreamWriter, docs: Path, target: str, head: bool):
+    path = (docs / unquote(urlsplit(target).path).lstrip("/")).resolve()
+    if path.is_dir():
+        path = path / "index.html"
+    if not path.is_relative_to(docs) or not path.is_file():
+        body, status, content_type = b"Not found\n", "404 Not Found", "text/plain"
+    else:
+        body, status = path.read_bytes(), "200 OK"
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                 f"Cache-Control: no-cache\r\nConnection: close\r\n\r\n".encode("latin-1"))
+    if not head:
+        writer.write(body)
+    await writer.drain()
+
+
+def handler(docs: Path, max_size: int, max_buffered: int):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        try:
+            request = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+            method, target, _ = request[0].split(" ", 2)
+            headers = {}
+            for line in request[1:]:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+            session_type = SESSIONS.get(urlsplit(target).path)
+            if session_type is None or headers.get("upgrade", "").lower() != "websocket":
+                if method not in ("GET", "HEAD"):
+                    writer.write(b"HTTP/1.1 405 Method Not Allowed\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                else:
+                    await serve_file(writer, docs, target, method == "HEAD")
+                return
+            writer.write(f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                         f"Sec-WebSocket-Accept: {_accept_key(headers['sec-websocket-key'])}\r\n\r\n"
+                         .encode("latin-1"))
+            session = session_type(max_size=max_size)
+            print(f"{peer}: {session.kind} session opened")
+            sent, dropped = await stream(session, reader, writer, max_buffered)
+            print(f"{peer}: {session.kind} session closed after {session.generation} generations, "
+                  f"{sent} frames sent, {dropped} dropped")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, KeyError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(host: str, port: int, docs: Path, max_size: int, max_buffered: int):
+    server = await asyncio.start_server(handler(docs.resolve(), max_size, max_buffered), host, port)
+    print(f"Serving {docs} on http://{host}:{port}/ - open game-of-life.html?server or bz-visualization.html?server")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Stream Python Life/BZ simulations to the docs/ pages")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--docs", type=Path, default=DOCS, help="directory served over HTTP")
+    parser.add_argument("--max-size", type=int, default=2048, help="largest board side a client may ask for")
+    parser.add_argument("--max-buffered", type=int, default=256 * 1024,
+                        help="bytes a client's socket may hold before frames are dropped")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.docs, args.max_size, args.max_buffered))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
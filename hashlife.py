@@ -0,0 +1,255 @@
+"""Memoized quadtree (HashLife) engine for Conway's Game of Life.
+
+The universe is unbounded: the root node is a 2^L x 2^L square centered on the
+origin, and ``step_pow2(k)`` advances the whole pattern by 2^k generations in a
+single call by reusing cached results for repeated sub-patterns. Boundary modes
+do not apply here; use ``window`` to crop a dense view for display.
+"""
+
+import numpy as np
+
+from patterns import read_pattern
+
+# Rough per-node footprint: the node itself, its canonical-table entry and a memoized result.
+NODE_BYTES = 400
+
+
+class Node:
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+
+    def __init__(self, level, nw, ne, sw, se, population):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+ON = Node(0, None, None, None, None, 1)
+OFF = Node(0, None, None, None, None, 0)
+
+
+class HashLife:
+    """HashLife universe with a bounded canonical-node cache.
+
+    ``max_memory_mb`` caps the canonical table and the result memo. When the cap
+    is reached mid-run both are flushed (results stay correct, only sharing is
+    lost), and after every step the table is rebuilt from the live root.
+    """
+
+    def __init__(self, max_memory_mb: float = 512.0):
+        self.max_nodes = max(1024, int(max_memory_mb * 2 ** 20 / NODE_BYTES))
+        self._table: dict[tuple, Node] = {}
+        self._results: dict[tuple, Node] = {}
+        self._empty = [OFF]
+        self.evictions = 0
+        self.generation = 0
+        self.origin = (0, 0)
+        self.shape = (0, 0)
+        self.root = self._empty_node(3)
+
+    # --- node construction -------------------------------------------------
+
+    def _join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        key = (nw, ne, sw, se)
+        node = self._table.get(key)
+        if node is None:
+            if len(self._table) >= self.max_nodes:
+                self._evict()
+            node = Node(nw.level + 1, nw, ne, sw, se,
+                        nw.population + ne.population + sw.population + se.population)
+            self._table[key] = node
+        return node
+
+    def _empty_node(self, level: int) -> Node:
+        while len(self._empty) <= level:
+            e = self._empty[-1]
+            self._empty.append(Node(e.level + 1, e, e, e, e, 0))
+        return self._empty[level]
+
+    def _centre(self, m: Node) -> Node:
+        # Wrap m in a node twice its size with m in the middle.
+        z = self._empty_node(m.level - 1)
+        return self._join(
+            self._join(z, z, z, m.nw), self._join(z, z, m.ne, z),
+            self._join(z, m.sw, z, z), self._join(m.se, z, z, z),
+        )
+
+    def _inner(self, m: Node) -> Node:
+        return self._join(m.nw.se, m.ne.sw, m.sw.ne, m.se.nw)
+
+    # --- cache management --------------------------------------------------
+
+    def _evict(self):
+        self._table.clear()
+        self._results.clear()
+        self.evictions += 1
+
+    def collect(self):
+        """Drop every cached node that is not reachable from the current root."""
+        self._results.clear()
+        table: dict[tuple, Node] = {}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.level == 0 or node.population == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key in table:
+                continue
+            table[key] = node
+            stack.extend(key)
+        self._table = table
+
+    @property
+    def cache_size(self) -> int:
+        return len(self._table) + len(self._results)
+
+    # --- evolution ---------------------------------------------------------
+
+    @staticmethod
+    def _life_4x4(m: Node) -> tuple[int, int, int, int]:
+        cells = (
+            (m.nw.nw, m.nw.ne, m.ne.nw, m.ne.ne),
+            (m.nw.sw, m.nw.se, m.ne.sw, m.ne.se),
+            (m.sw.nw, m.sw.ne, m.se.nw, m.se.ne),
+            (m.sw.sw, m.sw.se, m.se.sw, m.se.se),
+        )
+        out = []
+        for r in (1, 2):
+            for c in (1, 2):
+                total = 0
+                for dr in (-1, 0, 1):
+                    for dc in (-1, 0, 1):
+                        if dr or dc:
+                            total += cells[r + dr][c + dc].population
+                alive = cells[r][c].population
+                out.append(1 if total == 3 or (alive and total == 2) else 0)
+        return tuple(out)
+
+    def _successor(self, m: Node, j: int) -> Node:
+        """Center of ``m`` (one level down) advanced by 2^j generations, j <= level - 2."""
+        if m.population == 0:
+            return self._empty_node(m.level - 1)
+        key = (m, j)
+        cached = self._results.get(key)
+        if cached is not None:
+            return cached
+
+        if m.level == 2:
+            nw, ne, sw, se = (ON if v else OFF for v in self._life_4x4(m))
+            result = self._join(nw, ne, sw, se)
+        else:
+            join = self._join
+            nw, ne, sw, se = m.nw, m.ne, m.sw, m.se
+            sub = (
+                nw, join(nw.ne, ne.nw, nw.se, ne.sw), ne,
+                join(nw.sw, nw.se, sw.nw, sw.ne), join(nw.se, ne.sw, sw.ne, se.nw),
+                join(ne.sw, ne.se, se.nw, se.ne),
+                sw, join(sw.ne, se.nw, sw.se, se.sw), se,
+            )
+            c1, c2, c3, c4, c5, c6, c7, c8, c9 = (self._successor(s, min(j, m.level - 3)) for s in sub)
+            if j < m.level - 2:
+                result = join(
+                    join(c1.se, c2.sw, c4.ne, c5.nw), join(c2.se, c3.sw, c5.ne, c6.nw),
+                    join(c4.se, c5.sw, c7.ne, c8.nw), join(c5.se, c6.sw, c8.ne, c9.nw),
+                )
+            else:
+                result = join(
+                    self._successor(join(c1, c2, c4, c5), j), self._successor(join(c2, c3, c5, c6), j),
+                    self._successor(join(c4, c5, c7, c8), j), self._successor(join(c5, c6, c8, c9), j),
+                )
+        self._results[key] = result
+        return result
+
+    def step_pow2(self, k: int) -> int:
+        """Advance the universe by 2^k generations; returns the new generation count."""
+        root = self.root
+        # Pad until the pattern sits in the central quarter and 2^k steps cannot reach the edge.
+        while root.level < k + 3 or self._inner(self._inner(root)).population != root.population:
+            root = self._centre(root)
+        self.root = self._successor(self._centre(root), k)
+        self.generation += 2 ** k
+        if self.cache_size > self.max_nodes:
+            self.collect()
+        return self.generation
+
+    def advance(self, generations: int) -> int:
+        """Advance by an arbitrary generation count using its binary expansion."""
+        k = 0
+        while generations:
+            if generations & 1:
+                self.step_pow2(k)
+            generations >>= 1
+            k += 1
+        return self.generation
+
+    # --- loading and viewing -----------------------------------------------
+
+    def _build(self, block: np.ndarray, level: int) -> Node:
+        if not block.any():
+            return self._empty_node(level)
+        if level == 0:
+            return ON
+        half = 1 << (level - 1)
+        return self._join(
+            self._build(block[:half, :half], level - 1), self._build(block[:half, half:], level - 1),
+            self._build(block[half:, :half], level - 1), self._build(block[half:, half:], level - 1),
+        )
+
+    def load_grid(self, grid: np.ndarray):
+        """Replace the universe with a dense grid centered on the origin."""
+        height, width = grid.shape
+        level = max(3, int(np.ceil(np.log2(max(height, width, 1)))) + 1)
+        size = 1 << level
+        top, left = size // 2 - height // 2, size // 2 - width // 2
+        block = np.zeros((size, size), dtype=bool)
+        block[top:top + height, left:left + width] = grid != 0
+        self._table.clear()
+        self._results.clear()
+        self.root = self._build(block, level)
+        self.generation = 0
+        self.origin = (-(height // 2), -(width // 2))
+        self.shape = (height, width)
+
+    def load_cells(self, rows: np.ndarray, cols: np.ndarray):
+        """Load live-cell coordinates; the bounding box is centered on the origin."""
+        if rows.size == 0:
+            self.load_grid(np.zeros((1, 1)))
+            return
+        rows = rows - rows.min()
+        cols = cols - cols.min()
+        grid = np.zeros((int(rows.max()) + 1, int(cols.max()) + 1), dtype=bool)
+        grid[rows, cols] = True
+        self.load_grid(grid)
+
+    def load_pattern(self, path: str):
+        rows, cols, _ = read_pattern(path)
+        self.load_cells(rows, cols)
+
+    @property
+    def population(self) -> int:
+        return self.root.population
+
+    def window(self, top: int | None = None, left: int | None = None,
+               height: int | None = None, width: int | None = None) -> np.ndarray:
+        """Dense float view of the universe; defaults to the originally loaded region."""
+        top = self.origin[0] if top is None else top
+        left = self.origin[1] if left is None else left
+        height = self.shape[0] if height is None else height
+        width = self.shape[1] if width is None else width
+        out = np.zeros((height, width), dtype=float)
+        half = 1 << (self.root.level - 1)
+        stack = [(self.root, -half, -half)]
+        while stack:
+            node, y, x = stack.pop()
+            size = 1 << node.level
+            if node.population == 0 or y >= top + height or x >= left + width or y + size <= top or x + size <= left:
+                continue
+            if node.level == 0:
+                out[y - top, x - left] = 1.0
+                continue
+            h = size >> 1
+            stack.extend(((node.nw, y, x), (node.ne, y, x + h), (node.sw, y + h, x), (node.se, y + h, x + h)))
+        return out
@@ -0,0 +1,186 @@
+"""Buffered pointer input for painting on the viewers' boards.
+
+Matplotlib delivers a ``motion_notify_event`` for every pointer move, often
+several per frame. Handling each one on its own means recomputing the brush,
+scattering into the board and asking for a redraw per event. ``StrokeBuffer``
+only records the positions instead. Once per frame, ``flush`` joins them into
+line segments, samples every segment densely enough that a fast drag leaves no
+gaps and stamps a cached brush stencil at each sample. It returns the
+deduplicated (rows, cols) of every touched cell, so a whole frame of painting
+is one scatter.
+
+``PointerInput`` feeds a ``StrokeBuffer`` from a figure's mouse events. The
+viewer calls ``drain`` at the start of each animation frame. While the
+animation is stopped, a canvas timer drains it instead and asks for one redraw
+per tick.
+"""
+
+from collections.abc import Callable
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def brush_offsets(radius: int) -> tuple[np.ndarray, np.ndarray]:
+    """(row, col) offsets of the cells within ``radius`` of the brush center."""
+    rel = np.arange(-radius, radius + 1)
+    dy, dx = np.nonzero(rel[:, None] ** 2 + rel[None, :] ** 2 <= radius ** 2)
+    return dy - radius, dx - radius
+
+
+def stroke_samples(points: np.ndarray, spacing: float) -> np.ndarray:
+    """Integer cells along the polyline through ``points``, at most ``spacing`` cells apart.
+
+    ``points`` are (row, col) positions in cell units, cell ``i`` spanning
+    ``[i, i + 1)``. Distances are Chebyshev, so a spacing of 1 gives an
+    8-connected line.
+    """
+    if len(points) > 1:
+        steps = np.diff(points, axis=0)
+        counts = np.maximum(np.ceil(np.abs(steps).max(axis=1) / spacing), 1).astype(np.intp)
+        segment = np.repeat(np.arange(len(steps)), counts)
+        t = np.arange(segment.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = t / counts[segment]
+        points = np.concatenate((points[segment] + steps[segment] * t[:, None], points[-1:]))
+    return np.floor(points).astype(np.intp)
+
+
+class StrokeBuffer:
+    """Pointer positions collected between frames, stamped with a disk brush on ``flush``."""
+
+    def __init__(self, shape: tuple[int, int], radius: int = 0, spacing: float | None = None):
+        self.shape = shape
+        self.radius = radius
+        # Disk stamps half a radius apart cover a band almost the brush's full width
+        self.spacing = spacing if spacing is not None else max(1.0, radius / 2)
+        self.dragging = False
+        self._strokes: list[tuple[list, bool]] = []
+        self._anchor: tuple[float, float] | None = None
+        self._broken = False
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._strokes)
+
+    def _add(self, point: tuple[float, float], new: bool):
+        if new or not self._strokes:
+            # A stroke continuing from the last flush starts at its already painted end
+            anchored = not new and self._anchor is not None
+            self._strokes.append(([self._anchor] if anchored else [], anchored))
+        self._strokes[-1][0].append(point)
+
+    def press(self, row: float, col: float):
+        self.dragging = True
+        self._broken = False
+        self._anchor = None
+        self._add((row, col), new=True)
+
+    def move(self, row: float, col: float):
+        if self.dragging:
+            self._add((row, col), new=self._broken)
+            self._broken = False
+
+    def lift(self):
+        """The pointer left the board: the next move starts a new segment instead of joining this one."""
+        self._broken = True
+        self._anchor = None
+
+    def release(self):
+        self.dragging = False
+        self._anchor = None
+
+    def flush(self, wrap: bool = True) -> tuple[np.ndarray, np.ndarray] | None:
+        """(rows, cols) of the cells painted since the last flush, or None if there were none."""
+        if not self._strokes:
+            return None
+        samples = []
+        for points, anchored in self._strokes:
+            cells = stroke_samples(np.array(points, dtype=float), self.spacing)
+            samples.append(cells[1:] if anchored else cells)
+        if self.dragging and not self._broken:
+            self._anchor = self._strokes[-1][0][-1]
+        self._strokes = []
+        centers = np.concatenate(samples)
+
+        height, width = self.shape
+        dy, dx = brush_offsets(self.radius)
+        rows = (centers[:, :1] + dy).ravel()
+        cols = (centers[:, 1:] + dx).ravel()
+        if wrap:
+            rows %= height
+            cols %= width
+        else:
+            inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+            rows, cols = rows[inside], cols[inside]
+        # Overlapping stamps touch a cell once; sort + diff is faster than np.unique here
+        flat = np.sort(rows * width + cols)
+        flat = flat[np.concatenate(([True], flat[1:] != flat[:-1]))] if flat.size else flat
+        return np.divmod(flat, width)
+
+
+class PointerInput:
+    """Feeds a ``StrokeBuffer`` from a figure's mouse events and drains it once per frame.
+
+    ``to_cell(event)`` maps an event inside ``ax`` to (row, col) in cell units,
+    ``apply(rows, cols)`` paints a flushed batch and ``redraw()`` is called after
+    a timer tick painted something, i.e. only while the animation is stopped.
+    ``wrap()`` tells whether brushes wrap around the board edges.
+    """
+
+    def __init__(self, fig, ax, strokes: StrokeBuffer, to_cell: Callable, apply: Callable,
+                 redraw: Callable[[], None], wrap: Callable[[], bool] = lambda: True,
+                 animating: Callable[[], bool] = lambda: False, interval: int = 16, button: int = 1):
+        self.ax = ax
+        self.strokes = strokes
+        self.to_cell = to_cell
+        self.apply = apply
+        self.redraw = redraw
+        self.wrap = wrap
+        self.animating = animating
+        self.button = button
+        self.timer = fig.canvas.new_timer(interval=interval)
+        self.timer.add_callback(self.tick)
+        self._timer_running = False
+        fig.canvas.mpl_connect("button_press_event", self.on_press)
+        fig.canvas.mpl_connect("motion_notify_event", self.on_motion)
+        fig.canvas.mpl_connect("button_release_event", self.on_release)
+
+    def on_press(self, event):
+        if event.inaxes is self.ax and event.button == self.button and event.xdata is not None:
+            self.strokes.press(*self.to_cell(event))
+            self._schedule()
+
+    def on_motion(self, event):
+        if not self.strokes.dragging:
+            return
+        if event.inaxes is self.ax and event.xdata is not None:
+            self.strokes.move(*self.to_cell(event))
+            self._schedule()
+        else:
+            self.strokes.lift()
+
+    def on_release(self, event):
+        if event.button == self.button:
+            self.strokes.release()
+
+    def _schedule(self):
+        # The animation drains the buffer itself; the timer only covers a stopped animation
+        if not self._timer_running and not self.animating():
+            self._timer_running = True
+            self.timer.start()
+
+    def drain(self) -> bool:
+        """Paint everything buffered since the last frame; True if anything was painted."""
+        cells = self.strokes.flush(self.wrap())
+        if cells is None or cells[0].size == 0:
+            return False
+        self.apply(*cells)
+        return True
+
+    def tick(self):
+        if self.drain() and not self.animating():
+            self.redraw()
+        if not self.strokes.dragging and not self.strokes.pending or self.animating():
+            self.timer.stop()
+            self._timer_running = False
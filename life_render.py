@@ -0,0 +1,76 @@
+"""Persistent RGBA compositor for the Game of Life viewer.
+
+Each cell's look depends only on whether it is alive and on its fade level, so
+the renderer keys every cell by ``alive << 8 | round(fade * 255)`` and maps keys
+to colors through a 512-entry uint8 lookup table. Only cells whose key changed
+since the previous frame are written into the persistent RGBA buffer, and the
+table is rebuilt only when the cell or tail color changes.
+"""
+
+import numpy as np
+
+FADE_LEVELS = 256
+
+
+def fade_step(grid: np.ndarray, fade: np.ndarray, rate: float, alive: np.ndarray | None = None) -> np.ndarray:
+    """In-place tail fade: live cells go to 1, dead cells lose ``rate`` down to 0."""
+    if alive is None:
+        alive = grid == 1
+    else:
+        np.equal(grid, 1, out=alive)
+    fade -= rate
+    np.maximum(fade, alive, out=fade)
+    np.maximum(fade, 0.0, out=fade)
+    return fade
+
+
+class LifeRenderer:
+    def __init__(self, shape: tuple[int, int]):
+        self.rgba = np.zeros(shape + (4,), dtype=np.uint8)
+        self.alive = np.zeros(shape, dtype=bool)
+        self._key = np.zeros(shape, dtype=np.uint16)
+        self._new_key = np.zeros(shape, dtype=np.uint16)
+        self._shifted = np.zeros(shape, dtype=np.uint16)
+        self._levels = np.zeros(shape, dtype=float)
+        self._changed = np.zeros(shape, dtype=bool)
+        self._lut = np.zeros((2 * FADE_LEVELS, 4), dtype=np.uint8)
+        self._colors = None
+        self._full_redraw = True
+        self.cells_updated = 0
+
+    def set_colors(self, cell_color, tail_color):
+        colors = (tuple(np.round(np.asarray(cell_color) * 255).astype(int)),
+                  tuple(np.round(np.asarray(tail_color) * 255).astype(int)))
+        if colors == self._colors:
+            return
+        self._colors = colors
+        alpha = np.arange(FADE_LEVELS, dtype=np.uint8)
+        self._lut[:FADE_LEVELS, :3] = colors[1]
+        self._lut[FADE_LEVELS:, :3] = colors[0]
+        self._lut[:FADE_LEVELS, 3] = alpha
+        self._lut[FADE_LEVELS:, 3] = alpha
+        self._full_redraw = True
+
+    def render(self, grid: np.ndarray, fade: np.ndarray) -> np.ndarray:
+        """Bring the RGBA buffer up to date with ``grid``/``fade`` and return it."""
+        key = self._new_key
+        np.multiply(fade, FADE_LEVELS - 1, out=self._levels)
+        np.rint(self._levels, out=self._levels)
+        np.copyto(key, self._levels, casting="unsafe")
+        np.equal(grid, 1, out=self.alive)
+        np.copyto(self._shifted, self.alive, casting="unsafe")
+        self._shifted <<= 8
+        key |= self._shifted
+
+        flat_rgba = self.rgba.reshape(-1, 4)
+        if self._full_redraw:
+            flat_rgba[...] = self._lut[key.ravel()]
+            self.cells_updated = key.size
+            self._full_redraw = False
+        else:
+            np.not_equal(key, self._key, out=self._changed)
+            idx = np.flatnonzero(self._changed)
+            flat_rgba[idx] = self._lut[key.ravel()[idx]]
+            self.cells_updated = idx.size
+        self._key, self._new_key = key, self._key
+        return self.rgba
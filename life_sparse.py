@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Sparse coordinate-set engine for large, mostly empty Life universes.
+
+Live cells are stored as one sorted int64 array of packed coordinates,
+``row << 32 | (col + 2**31)``, so memory is 8 bytes per live cell and the
+universe is unbounded (rows and columns may range over about ±2**31). Sorting
+the packed keys sorts cells row by row, which lets ``window`` find the rows of
+a viewport with two binary searches.
+
+A generation adds the neighbor offsets (eight for Life, more for Larger than
+Life rules) to every key, and ``np.unique`` over those keys yields each
+candidate cell with its live neighbor count. A binary search against the current keys tells which
+candidates are alive, and the rule table picks the survivors and births. Any
+two-state rule without B0 works; nothing is born in empty space, so the work
+is proportional to the population, not the area.
+
+Running the module opens a viewer on the universe: drag to pan, scroll to
+zoom, ``z`` to recenter on the population, space to pause::
+
+    python life_sparse.py --pattern glider-gun.rle
+    python life_sparse.py --size 400 --ratio 0.3 --seed 1
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from life_rules import CONWAY, LifeRule, parse_rule
+from patterns import read_pattern
+
+_COL_OFFSET = 1 << 31
+_COL_MASK = np.int64(0xFFFFFFFF)
+
+
+def neighbor_offsets(rule: LifeRule) -> np.ndarray:
+    """Packed-key offsets of the cells a rule counts, the center included for M1 rules."""
+    r = rule.radius
+    return np.array(
+        [dy * (1 << 32) + dx for dy in range(-r, r + 1) for dx in range(-r, r + 1)
+         if (dy or dx or rule.include_center) and (rule.neighborhood == "moore" or abs(dy) + abs(dx) <= r)],
+        dtype=np.int64,
+    )
+
+
+def pack(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Packed int64 keys of (row, col) cells; keys sort in row-major order."""
+    return (np.asarray(rows, dtype=np.int64) << np.int64(32)) + (np.asarray(cols, dtype=np.int64) + _COL_OFFSET)
+
+
+def unpack(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    return keys >> np.int64(32), (keys & _COL_MASK) - _COL_OFFSET
+
+
+class SparseLife:
+    """An unbounded universe stored as sorted packed coordinates of its live cells."""
+
+    def __init__(self, rule: LifeRule | str = CONWAY):
+        if isinstance(rule, str):
+            rule = parse_rule(rule)
+        if rule.states != 2 or 0 in rule.birth:
+            raise ValueError(f"the sparse engine runs two-state rules without B0, not {rule}")
+        self.rule = rule
+        self._born = rule.table[0] == 1
+        self._kept = rule.table[1] == 1
+        self._offsets = neighbor_offsets(rule)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.generation = 0
+
+    # --- loading -------------------------------------------------------------
+
+    def load_cells(self, rows: np.ndarray, cols: np.ndarray):
+        """Replace the universe with the given live cells (duplicates are merged)."""
+        self.keys = np.unique(pack(rows, cols))
+        self.generation = 0
+
+    def load_grid(self, grid: np.ndarray, top: int = 0, left: int = 0):
+        """Load the live cells of a dense grid, its top-left corner at (top, left)."""
+        rows, cols = np.nonzero(grid == 1)
+        self.load_cells(rows + top, cols + left)
+
+    def load_pattern(self, path: str):
+        """Load an RLE/plaintext pattern with its bounding box centered on the origin."""
+        rows, cols, _ = read_pattern(path)
+        if rows.size:
+            rows = rows - (rows.min() + rows.max()) // 2
+            cols = cols - (cols.min() + cols.max()) // 2
+        self.load_cells(rows, cols)
+
+    def set_cells(self, rows: np.ndarray, cols: np.ndarray, alive: bool = True):
+        """Switch cells on or off without touching the rest of the universe."""
+        keys = pack(np.atleast_1d(rows), np.atleast_1d(cols))
+        if alive:
+            self.keys = np.union1d(self.keys, keys)
+        else:
+            self.keys = np.setdiff1d(self.keys, keys, assume_unique=False)
+
+    # --- stepping ------------------------------------------------------------
+
+    def _contains(self, keys: np.ndarray) -> np.ndarray:
+        if self.keys.size == 0:
+            return np.zeros(keys.shape, dtype=bool)
+        pos = np.searchsorted(self.keys, keys)
+        pos[pos == self.keys.size] = 0
+        return self.keys[pos] == keys
+
+    def step(self, generations: int = 1) -> int:
+        """Advance by ``generations``; returns the new population."""
+        for i in range(generations):
+            keys = self.keys
+            if keys.size == 0:
+                # An empty universe stays empty; count the generations left without stepping them
+                self.generation += generations - i
+                break
+            neighbors = (keys[:, None] + self._offsets).ravel()
+            candidates, counts = np.unique(neighbors, return_counts=True)
+            alive = self._contains(candidates)
+            survivors = candidates[np.where(alive, self._kept[counts], self._born[counts])]
+            if self._kept[int(self.rule.include_center)]:
+                # Live cells without live neighbors are not among the candidates (with M1 they count themselves)
+                lonely = keys[~np.isin(keys, candidates, assume_unique=True)]
+                survivors = np.union1d(survivors, lonely)
+            self.keys = survivors
+            self.generation += 1
+        return self.population
+
+    # --- viewing -------------------------------------------------------------
+
+    @property
+    def population(self) -> int:
+        return int(self.keys.size)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.keys.nbytes)
+
+    def cells(self) -> tuple[np.ndarray, np.ndarray]:
+        """(rows, cols) of every live cell, in row-major order."""
+        return unpack(self.keys)
+
+    def bounding_box(self) -> tuple[int, int, int, int] | None:
+        """(top, left, height, width) of the live cells, or None for an empty universe."""
+        if self.keys.size == 0:
+            return None
+        rows, cols = unpack(self.keys)
+        top, left = int(rows[0]), int(cols.min())
+        return top, left, int(rows[-1]) - top + 1, int(cols.max()) - left + 1
+
+    def window(self, top: int, left: int, height: int, width: int, out: np.ndarray | None = None) -> np.ndarray:
+        """Dense float view of a rectangle of the universe, written into ``out`` if given."""
+        if out is None:
+            out = np.zeros((height, width), dtype=float)
+        else:
+            out[...] = 0
+        # Keys are row-major, so the viewport's rows are one contiguous run of the array
+        lo, hi = np.searchsorted(self.keys, pack([top, top + height], [-_COL_OFFSET, -_COL_OFFSET]))
+        rows, cols = unpack(self.keys[lo:hi])
+        cols = cols - left
+        inside = (cols >= 0) & (cols < width)
+        out[rows[inside] - top, cols[inside]] = 1
+        return out
+
+
+def view(life: SparseLife, height: int = 200, width: int = 200):
+    """Pannable matplotlib viewport on a ``SparseLife`` universe."""
+    import matplotlib.pyplot as plt
+    from matplotlib import animation
+
+    box = life.bounding_box()
+    top, left = (0, 0) if box is None else (box[0] + box[2] // 2 - height // 2, box[1] + box[3] // 2 - width // 2)
+    viewport = {"top": top, "left": left, "height": height, "width": width}
+    drag = None
+    running = True
+    frame = np.zeros((height, width))
+
+    fig, ax = plt.subplots()
+    fig.patch.set_facecolor((34 / 255, 47 / 255, 62 / 255))
+    ax.axis("off")
+    img = ax.imshow(frame, cmap="Greens", vmin=0, vmax=1, interpolation="nearest")
+    hud = ax.text(0.5, 1.03, "", transform=ax.transAxes, color="white", ha="center", fontsize=12)
+
+    def redraw():
+        nonlocal frame
+        if frame.shape != (viewport["height"], viewport["width"]):
+            frame = np.zeros((viewport["height"], viewport["width"]))
+            img.set_extent((-0.5, viewport["width"] - 0.5, viewport["height"] - 0.5, -0.5))
+            ax.set_xlim(-0.5, viewport["width"] - 0.5)
+            ax.set_ylim(viewport["height"] - 0.5, -0.5)
+        img.set_data(life.window(viewport["top"], viewport["left"], viewport["height"], viewport["width"], frame))
+        hud.set_text(
+            f"Gen {life.generation} | Population {life.population} ({life.nbytes / 1024:.1f} KiB) | "
+            f"View ({viewport['top']}, {viewport['left']}) {viewport['height']}x{viewport['width']}"
+        )
+
+    def update(*args):
+        if running:
+            life.step()
+        redraw()
+        return img, hud
+
+    def on_press(event):
+        nonlocal drag
+        if event.inaxes is ax and event.button == 1:
+            drag = (event.xdata, event.ydata, viewport["top"], viewport["left"])
+
+    def on_motion(event):
+        if drag is None or event.inaxes is not ax or event.xdata is None:
+            return
+        x0, y0, top0, left0 = drag
+        # Axes coordinates are viewport pixels, so the universe moves with the pointer
+        viewport["left"] = left0 - int(round(event.xdata - x0))
+        viewport["top"] = top0 - int(round(event.ydata - y0))
+        redraw()
+        fig.canvas.draw_idle()
+
+    def on_release(event):
+        nonlocal drag
+        drag = None
+
+    def on_scroll(event):
+        if event.inaxes is not ax:
+            return
+        factor = 0.5 if event.button == "up" else 2.0
+        new_height = int(min(max(viewport["height"] * factor, 16), 4096))
+        new_width = int(min(max(viewport["width"] * factor, 16), 4096))
+        # Keep the cell under the cursor in place
+        viewport["top"] += int(event.ydata * (1 - new_height / viewport["height"]))
+        viewport["left"] += int(event.xdata * (1 - new_width / viewport["width"]))
+        viewport["height"], viewport["width"] = new_height, new_width
+        redraw()
+        fig.canvas.draw_idle()
+
+    def on_key(event):
+        nonlocal running
+        if event.key == " ":
+            running = not running
+        elif event.key == "z":
+            box = life.bounding_box()
+            if box is not None:
+                viewport["top"] = box[0] + box[2] // 2 - viewport["height"] // 2
+                viewport["left"] = box[1] + box[3] // 2 - viewport["width"] // 2
+        redraw()
+        fig.canvas.draw_idle()
+
+    fig.canvas.mpl_connect("button_press_event", on_press)
+    fig.canvas.mpl_connect("motion_notify_event", on_motion)
+    fig.canvas.mpl_connect("button_release_event", on_release)
+    fig.canvas.mpl_connect("scroll_event", on_scroll)
+    fig.canvas.mpl_connect("key_press_event", on_key)
+
+    redraw()
+    ani = animation.FuncAnimation(fig, update, interval=30, blit=False, cache_frame_data=False)
+    plt.show()
+    return ani
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sparse unbounded Game of Life")
+    parser.add_argument("--pattern", help="RLE or plaintext pattern file")
+    parser.add_argument("--size", type=int, default=200, help="side of the random soup without --pattern")
+    parser.add_argument("--ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--rule", default="B3/S23")
+    parser.add_argument("--view", type=int, default=200, help="viewport side in cells")
+    parser.add_argument("--generations", type=int, default=None, help="run headless and print gen/s")
+    args = parser.parse_args()
+
+    life = SparseLife(args.rule)
+    if args.pattern:
+        life.load_pattern(args.pattern)
+    else:
+        rng = np.random.default_rng(args.seed)
+        life.load_grid(rng.random((args.size, args.size)) < args.ratio, -(args.size // 2), -(args.size // 2))
+
+    if args.generations is None:
+        view(life, args.view, args.view)
+        return
+    start = time.perf_counter()
+    life.step(args.generations)
+    elapsed = time.perf_counter() - start
+    rate = args.generations / elapsed if elapsed > 0 else float("inf")
+    print(f"{args.generations} generations ({life.rule}) in {elapsed:.3f}s: {rate:.1f} gen/s, "
+          f"population {life.population}, bounding box {life.bounding_box()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+"""Readers and writers for standard Life pattern files: RLE, plaintext and macrocell.
+
+Patterns travel as (rows, cols) arrays of live cells plus the rule named in
+the file, if any. The readers work on raw bytes with NumPy and consume a file
+``CHUNK_SIZE`` bytes at a time, so a multi-megabyte pattern never turns into a
+Python object per cell:
+
+``.rle``    ``read_rle`` / ``write_rle``. Run counts are decoded with array
+            arithmetic and live runs expanded with ``np.repeat``.
+``.cells``  ``read_plaintext`` / ``write_plaintext`` (also ``.txt``): ``O`` or
+            ``*`` is alive, lines starting with ``!`` are comments.
+``.mc``     ``read_macrocell`` / ``write_macrocell``: Golly's two-state quadtree
+            format. Every node of one tree level is expanded (or, when
+            writing, merged) in a single vectorized pass.
+
+``read_pattern`` and ``write_pattern`` pick the format from the file extension.
+"""
+
+import io
+import re
+
+import numpy as np
+
+CHUNK_SIZE = 1 << 22
+RLE_LINE_WIDTH = 70
+
+# --- RLE ---------------------------------------------------------------------
+
+
+class _RLEDecoder:
+    """Decode RLE body bytes chunk by chunk, carrying the position and any split run count."""
+
+    def __init__(self):
+        self.y = 0
+        self.x = 0
+        self.done = False
+        self._carry = b""
+
+    def feed(self, chunk: bytes) -> tuple[np.ndarray, np.ndarray]:
+        data = np.frombuffer(self._carry + chunk, dtype=np.uint8)
+        self._carry = b""
+        end = np.flatnonzero(data == ord("!"))
+        if end.size:
+            data = data[:end[0]]
+            self.done = True
+        is_digit = (data >= ord("0")) & (data <= ord("9"))
+        is_letter = ((data | 0x20) >= ord("a")) & ((data | 0x20) <= ord("z"))
+        # Anything else (whitespace, stray punctuation) is ignored, as Golly does
+        data = data[is_digit | is_letter | (data == ord("$")) | (data == ord("."))]
+        is_digit = (data >= ord("0")) & (data <= ord("9"))
+        if data.size and is_digit[-1]:
+            # A run count split across two chunks waits for its tag (one before '!' is dropped)
+            tail = data.size - np.argmin(is_digit[::-1]) if not is_digit.all() else 0
+            self._carry = b"" if self.done else data[tail:].tobytes()
+            data, is_digit = data[:tail], is_digit[:tail]
+
+        tag_pos = np.flatnonzero(~is_digit)
+        tags = data[tag_pos]
+        digit_pos = np.flatnonzero(is_digit)
+        owner = np.searchsorted(tag_pos, digit_pos)
+        place = np.power(10.0, tag_pos[owner] - digit_pos - 1)
+        counts = np.bincount(owner, weights=(data[digit_pos] - ord("0")) * place, minlength=tags.size)
+        run = np.where(np.bincount(owner, minlength=tags.size) > 0, np.rint(counts), 1).astype(np.int64)
+
+        newline = tags == ord("$")
+        live = ~newline & (tags != ord("b")) & (tags != ord("."))
+        advance = np.where(newline, 0, run)
+        x_after = np.cumsum(advance)
+        y_after = np.cumsum(np.where(newline, run, 0))
+        # x restarts at 0 after the latest '$' at or before each token
+        last_newline = np.maximum.accumulate(np.where(newline, np.arange(tags.size), -1))
+        x_base = np.where(last_newline >= 0, x_after[np.maximum(last_newline, 0)], -self.x)
+        x_start = x_after - advance - x_base
+        y_start = self.y + y_after - np.where(newline, run, 0)
+        if tags.size:
+            self.x = int(x_after[-1] - x_base[-1])
+            self.y += int(y_after[-1])
+
+        lengths = run[live]
+        rows = np.repeat(y_start[live], lengths)
+        offsets = np.arange(rows.size, dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return rows, np.repeat(x_start[live], lengths) + offsets
+
+
+def read_rle(handle) -> tuple[np.ndarray, np.ndarray, str | None]:
+    """Return (rows, cols, rule) for the live cells of an RLE pattern read from a binary file."""
+    rule = None
+    first = b""
+    for line in iter(handle.readline, b""):
+        stripped = line.strip()
+        if not stripped or stripped.startswith(b"#"):
+            continue
+        if stripped.startswith(b"x") and b"=" in stripped:
+            match = re.search(rb"rule\s*=\s*(\S+)", stripped)
+            if match:
+                rule = match.group(1).decode("ascii")
+            continue
+        first = line
+        break
+
+    decoder = _RLEDecoder()
+    rows, cols = [], []
+    chunk = first
+    while chunk and not decoder.done:
+        r, c = decoder.feed(chunk)
+        rows.append(r)
+        cols.append(c)
+        chunk = handle.read(CHUNK_SIZE)
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), rule
+    return np.concatenate(rows), np.concatenate(cols), rule
+
+
+def parse_rle(text: str) -> tuple[np.ndarray, np.ndarray, str | None]:
+    """Return (rows, cols, rule) for the live cells of an RLE pattern."""
+    return read_rle(io.BytesIO(text.encode("ascii", "ignore")))
+
+
+def _sorted_cells(rows: np.ndarray, cols: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Unique cells in row-major order, moved so the bounding box starts at (0, 0)."""
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    if rows.size == 0:
+        return rows, cols
+    rows = rows - rows.min()
+    cols = cols - cols.min()
+    width = int(cols.max()) + 1
+    keys = np.sort(rows * width + cols)
+    keys = keys[np.diff(keys, prepend=-1) != 0]
+    return np.divmod(keys, width)
+
+
+def _format_tokens(counts: np.ndarray, tags: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """ASCII bytes of ``<count><tag>`` tokens (count omitted when 1) and each token's end offset."""
+    digits = np.zeros(counts.size, dtype=np.int64)
+    power = 1
+    while True:
+        more = counts > power if power == 1 else counts >= power
+        if not more.any():
+            break
+        digits += more
+        power *= 10
+    ends = np.cumsum(digits + 1)
+    out = np.empty(int(ends[-1]) if ends.size else 0, dtype=np.uint8)
+    out[ends - 1] = tags
+    for place in range(int(digits.max()) if digits.size else 0):
+        has = digits > place
+        out[ends[has] - 2 - place] = ord("0") + counts[has] // 10 ** place % 10
+    return out, ends
+
+
+def write_rle(handle, rows: np.ndarray, cols: np.ndarray, rule: str | None = None):
+    """Write live cells as RLE to a text file, one token per run of cells."""
+    rows, cols = _sorted_cells(rows, cols)
+    height = int(rows.max()) + 1 if rows.size else 0
+    width = int(cols.max()) + 1 if cols.size else 0
+    handle.write(f"x = {width}, y = {height}" + (f", rule = {rule}" if rule else "") + "\n")
+
+    # Runs of horizontally adjacent cells: (row, first column, length)
+    starts = np.flatnonzero(np.diff(rows, prepend=-1) | (np.diff(cols, prepend=-2) != 1))
+    run_rows = rows[starts]
+    run_cols = cols[starts]
+    run_lens = np.diff(np.append(starts, rows.size))
+    same_row = np.diff(run_rows, prepend=0) == 0
+    previous_end = np.where(same_row, np.roll(run_cols + run_lens, 1), 0)
+    if previous_end.size:
+        previous_end[0] = 0
+    gaps = run_cols - previous_end
+    row_steps = np.diff(run_rows, prepend=0)
+
+    counts = np.stack([row_steps, gaps, run_lens], axis=1).ravel()
+    tags = np.tile(np.frombuffer(b"$bo", dtype=np.uint8), run_rows.size)
+    body, ends = _format_tokens(counts[counts > 0], tags[counts > 0])
+    body = np.append(body, np.uint8(ord("!")))
+    ends = np.append(ends, body.size)
+    # Greedy line breaks between tokens, one binary search per output line
+    breaks = []
+    start = 0
+    while body.size - start > RLE_LINE_WIDTH:
+        last = np.searchsorted(ends, start + RLE_LINE_WIDTH, side="right") - 1
+        start = int(ends[last]) if ends[last] > start else int(ends[last + 1])
+        breaks.append(start)
+    handle.write(np.insert(body, breaks, np.uint8(ord("\n"))).tobytes().decode("ascii") + "\n")
+
+
+# --- plaintext ---------------------------------------------------------------
+
+
+def read_plaintext(handle) -> tuple[np.ndarray, np.ndarray, None]:
+    """Return (rows, cols, None) for a ``.cells`` plaintext pattern read from a binary file."""
+    rows, cols = [], []
+    y = 0
+    carry = b""
+    while True:
+        chunk = handle.read(CHUNK_SIZE)
+        data = carry + chunk
+        if chunk:
+            # Only whole lines are decoded; the partial last line waits for the next chunk
+            cut = data.rfind(b"\n") + 1
+            data, carry = data[:cut], data[cut:]
+        elif data and not data.endswith(b"\n"):
+            data += b"\n"
+        if data:
+            arr = np.frombuffer(data, dtype=np.uint8)
+            ends = np.flatnonzero(arr == ord("\n"))
+            line_starts = np.concatenate(([0], ends[:-1] + 1))
+            comment = arr[line_starts] == ord("!")
+            live = np.flatnonzero((arr == ord("O")) | (arr == ord("*")))
+            line = np.searchsorted(ends, live)
+            keep = ~comment[line]
+            line = line[keep]
+            rows.append(y + line - np.cumsum(comment)[line])
+            cols.append(live[keep] - line_starts[line])
+            y += int(np.count_nonzero(~comment))
+        if not chunk:
+            break
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), None
+    return np.concatenate(rows).astype(np.int64), np.concatenate(cols).astype(np.int64), None
+
+
+def parse_plaintext(text: str) -> tuple[np.ndarray, np.ndarray, str | None]:
+    """Return (rows, cols, None) for a ``.cells`` plaintext pattern."""
+    return read_plaintext(io.BytesIO(text.encode("ascii", "ignore")))
+
+
+def write_plaintext(handle, rows: np.ndarray, cols: np.ndarray, rule: str | None = None, block_rows: int = 4096):
+    """Write live cells as a ``.cells`` file, ``block_rows`` rows of the bounding box at a time."""
+    rows, cols = _sorted_cells(rows, cols)
+    if rule:
+        handle.write(f"!Rule: {rule}\n")
+    if rows.size == 0:
+        return
+    height, width = int(rows[-1]) + 1, int(cols.max()) + 1
+    for top in range(0, height, block_rows):
+        lo, hi = np.searchsorted(rows, [top, top + block_rows])
+        block = np.full((min(block_rows, height - top), width + 1), ord("."), dtype=np.uint8)
+        block[:, -1] = ord("\n")
+        block[rows[lo:hi] - top, cols[lo:hi]] = ord("O")
+        handle.write(block.tobytes().decode("ascii"))
+
+
+# --- macrocell ---------------------------------------------------------------
+
+
+def read_macrocell(handle) -> tuple[np.ndarray, np.ndarray, str | None]:
+    """Return (rows, cols, rule) for a two-state Golly macrocell (``.mc``) file.
+
+    The root square is placed with its center on the origin, as Golly does.
+    """
+    rule = None
+    leaves = []
+    node_leaf = [-1]  # per node (1-based, 0 is the empty node): leaf number or -1
+    node_level = [0]
+    children = [(0, 0, 0, 0)]
+    for raw in handle:
+        line = raw.strip()
+        if not line or line.startswith(b"["):
+            continue
+        if line.startswith(b"#"):
+            if line.startswith(b"#R"):
+                rule = line[2:].strip().decode("ascii")
+            continue
+        if line[:1] in b".*$":
+            leaves.append(line)
+            node_leaf.append(len(leaves) - 1)
+            node_level.append(3)
+            children.append((0, 0, 0, 0))
+            continue
+        fields = line.split()
+        if len(fields) != 5 or int(fields[0]) < 4:
+            raise ValueError("only two-state macrocell files (8x8 leaves) are supported")
+        node_leaf.append(-1)
+        node_level.append(int(fields[0]))
+        children.append(tuple(int(field) for field in fields[1:]))
+    if len(node_leaf) == 1:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), rule
+
+    # Leaf cells in one pass: '*' alive, '.' skips a column, '$' ends a row
+    text = np.frombuffer(b"\n".join(leaves) + b"\n", dtype=np.uint8)
+    leaf_id = np.cumsum(text == ord("\n")) - (text == ord("\n"))
+    dollars = np.cumsum(text == ord("$"))
+    leaf_start = np.concatenate(([0], np.flatnonzero(text == ord("\n"))[:-1] + 1))
+    separator = (text == ord("$")) | (text == ord("\n"))
+    row_start = np.maximum.accumulate(np.where(separator, np.arange(text.size) + 1, 0))
+    alive = np.flatnonzero(text == ord("*"))
+    leaf_rows = dollars[alive] - dollars[leaf_start[leaf_id[alive]]] + (text[leaf_start[leaf_id[alive]]] == ord("$"))
+    leaf_cols = alive - row_start[alive]
+    leaf_of_cell = leaf_id[alive]
+    leaf_counts = np.bincount(leaf_of_cell, minlength=len(leaves))
+    leaf_first = np.cumsum(leaf_counts) - leaf_counts
+
+    # Expand the tree one level at a time, for all nodes of that level at once
+    children = np.array(children, dtype=np.int64)
+    node_leaf = np.array(node_leaf, dtype=np.int64)
+    root = len(node_level) - 1
+    level = node_level[root]
+    ids = np.array([root])
+    tops = np.zeros(1, dtype=np.int64)
+    lefts = np.zeros(1, dtype=np.int64)
+    while level > 3 and ids.size:
+        half = 1 << (level - 1)
+        kids = children[ids]
+        tops = (tops[:, None] + np.array([0, 0, half, half])).ravel()
+        lefts = (lefts[:, None] + np.array([0, half, 0, half])).ravel()
+        ids = kids.ravel()
+        present = ids != 0
+        ids, tops, lefts = ids[present], tops[present], lefts[present]
+        level -= 1
+
+    leaf = node_leaf[ids]
+    counts = leaf_counts[leaf]
+    cell = np.repeat(leaf_first[leaf] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    half_root = 1 << (node_level[root] - 1)
+    rows = np.repeat(tops, counts) + leaf_rows[cell] - half_root
+    cols = np.repeat(lefts, counts) + leaf_cols[cell] - half_root
+    return rows.astype(np.int64), cols.astype(np.int64), rule
+
+
+def _leaf_lines(masks: np.ndarray) -> bytes:
+    """Macrocell lines for 8x8 leaves given as uint64 masks (bit 8 * row + col)."""
+    bits = np.unpackbits(masks.astype("<u8").view(np.uint8).reshape(-1, 8, 1), axis=2, bitorder="little")
+    chars = np.where(bits.astype(bool), np.uint8(ord("*")), np.uint8(ord(".")))
+    chars = np.concatenate([chars, np.full(bits.shape[:2] + (1,), ord("$"), np.uint8)], axis=2)
+    # Drop trailing dead cells of each row and trailing empty rows of each leaf
+    row_len = np.where(bits.any(axis=2), 8 - np.argmax(bits[..., ::-1], axis=2), 0)
+    leaf_rows = np.where(bits.any(axis=(1, 2)), 8 - np.argmax(bits.any(axis=2)[:, ::-1], axis=1), 0)
+    keep = (np.arange(9) < row_len[..., None]) | (np.arange(9) == 8)
+    keep &= (np.arange(8) < leaf_rows[:, None])[..., None]
+    lines = np.concatenate([np.where(keep, chars, 0).reshape(len(masks), -1),
+                            np.full((len(masks), 1), ord("\n"), np.uint8)], axis=1)
+    return lines[lines != 0].tobytes()
+
+
+def write_macrocell(handle, rows: np.ndarray, cols: np.ndarray, rule: str | None = None):
+    """Write live cells as a two-state Golly macrocell file, sharing identical subtrees."""
+    rows, cols = _sorted_cells(rows, cols)
+    handle.write("[M2] (Game_of_Life.py)\n")
+    if rule:
+        handle.write(f"#R {rule}\n")
+    if rows.size == 0:
+        return
+
+    # Level 3: one uint64 bitmask per occupied 8x8 block, identical blocks written once
+    block_rows, block_cols = rows >> 3, cols >> 3
+    blocks, inverse = np.unique(block_rows * (int(block_cols.max()) + 1) + block_cols, return_inverse=True)
+    masks = np.zeros(blocks.size, dtype=np.uint64)
+    np.bitwise_or.at(masks, inverse, np.left_shift(np.uint64(1), ((rows & 7) * 8 + (cols & 7)).astype(np.uint64)))
+    leaf_masks, node_ids = np.unique(masks, return_inverse=True)
+    handle.write(_leaf_lines(leaf_masks).decode("ascii"))
+    written = leaf_masks.size
+    by, bx = np.divmod(blocks, int(block_cols.max()) + 1)
+    node_ids = node_ids.astype(np.int64) + 1
+
+    # Merge 2x2 groups of nodes into parents until one root covers everything
+    level = 3
+    while level == 3 or by.size > 1 or by[0] or bx[0]:
+        level += 1
+        parent_rows, parent_cols = by >> 1, bx >> 1
+        width = int(parent_cols.max()) + 1
+        parents, inverse = np.unique(parent_rows * width + parent_cols, return_inverse=True)
+        quads = np.zeros((parents.size, 4), dtype=np.int64)
+        quads[inverse, (by & 1) * 2 + (bx & 1)] = node_ids
+        unique_quads, parent_ids = np.unique(quads, axis=0, return_inverse=True)
+        handle.write("".join(f"{level} {nw} {ne} {sw} {se}\n" for nw, ne, sw, se in unique_quads.tolist()))
+        node_ids = parent_ids.ravel().astype(np.int64) + written + 1
+        written += unique_quads.shape[0]
+        by, bx = np.divmod(parents, width)
+
+
+# --- dispatch ----------------------------------------------------------------
+
+
+def read_pattern(path: str) -> tuple[np.ndarray, np.ndarray, str | None]:
+    """Load a pattern file, picking the parser from the extension."""
+    with open(path, "rb") as handle:
+        if path.lower().endswith((".cells", ".txt")):
+            return read_plaintext(handle)
+        if path.lower().endswith(".mc"):
+            return read_macrocell(handle)
+        return read_rle(handle)
+
+
+def write_pattern(path: str, rows: np.ndarray, cols: np.ndarray, rule: str | None = None):
+    """Save live cells as RLE, plaintext (``.cells``/``.txt``) or macrocell (``.mc``) by extension."""
+    with open(path, "w", encoding="ascii", newline="\n") as handle:
+        if path.lower().endswith((".cells", ".txt")):
+            write_plaintext(handle, rows, cols, rule)
+        elif path.lower().endswith(".mc"):
+            write_macrocell(handle, rows, cols, rule)
+        else:
+            write_rle(handle, rows, cols, rule)
+
+
+def to_grid(rows: np.ndarray, cols: np.ndarray, shape: tuple[int, int] | None = None) -> np.ndarray:
+    """Place pattern cells on a dense float grid (centered when a shape is given)."""
+    if rows.size == 0:
+        return np.zeros(shape or (1, 1), dtype=float)
+    rows = rows - rows.min()
+    cols = cols - cols.min()
+    height, width = int(rows.max()) + 1, int(cols.max()) + 1
+    if shape is None:
+        shape = (height, width)
+    grid = np.zeros(shape, dtype=float)
+    top = (shape[0] - height) // 2
+    left = (shape[1] - width) // 2
+    r = rows + top
+    c = cols + left
+    inside = (r >= 0) & (r < shape[0]) & (c >= 0) & (c < shape[1])
+    grid[r[inside], c[inside]] = 1.0
+    return grid
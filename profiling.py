@@ -0,0 +1,225 @@
+"""Per-stage frame timers for the viewers and headless runs.
+
+A ``Profiler`` times named stages of each frame (stepping, coloring, trace
+updates, matplotlib's draw) and keeps the last ``window`` samples per stage,
+from which it reports rolling p50/p99 and the actual frames per second against
+the target. ``Overlay`` shows those numbers on a figure, and ``export`` writes
+them periodically as JSON lines or CSV rows (picked by the file extension) so
+headless runs can be inspected later::
+
+    profiler = Profiler(enabled=True, target_fps=40, export="profile.csv")
+    with profiler.stage("step"):
+        ...
+    profiler.frame()
+
+While disabled, ``stage`` returns one shared no-op context manager and
+``frame`` returns immediately, so the timers can stay in the hot loops.
+"""
+
+import contextlib
+import csv
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+import numpy as np
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+class _Stage:
+    __slots__ = ("samples", "start")
+
+    def __init__(self, window: int):
+        self.samples: deque = deque(maxlen=window)
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self.start)
+
+
+class Profiler:
+    def __init__(self, enabled: bool = False, window: int = 240, target_fps: float | None = None,
+                 export: str | None = None, export_every: float = 1.0):
+        self.enabled = enabled
+        self.window = window
+        self.target_fps = target_fps
+        self.export_every = export_every
+        self._stages: dict[str, _Stage] = {}
+        # Stage timers are per thread, so a background simulation can time itself alongside the GUI
+        self._local = threading.local()
+        self._frames: deque = deque(maxlen=window)
+        self._last_frame: float | None = None
+        self._last_export = time.perf_counter()
+        self.frames = 0
+        self._export_file = None
+        self._csv = None
+        if export is not None:
+            self.open_export(export)
+
+    def set_enabled(self, enabled: bool):
+        self.enabled = enabled
+        self._last_frame = None
+
+    def stage(self, name: str):
+        """Context manager timing one stage of the current frame."""
+        if not self.enabled:
+            return _NO_STAGE
+        stages = getattr(self._local, "stages", None)
+        if stages is None:
+            stages = self._local.stages = {}
+        timer = stages.get(name)
+        if timer is None:
+            timer = stages[name] = _Stage(self.window)
+            # Threads share the sample deque of a stage name
+            timer.samples = self._stages.setdefault(name, timer).samples
+        return timer
+
+    def frame(self):
+        """Mark the end of a frame: counts it for FPS and exports if one is due."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self._frames.append(now - self._last_frame)
+        self._last_frame = now
+        self.frames += 1
+        if self._export_file is not None and now - self._last_export >= self.export_every:
+            self._last_export = now
+            self.write_export()
+
+    def summary(self) -> dict:
+        """Rolling p50/p99/mean in ms per stage, plus actual and target FPS."""
+        stages = {}
+        for name, timer in self._stages.items():
+            samples = np.fromiter(tuple(timer.samples), dtype=float)
+            if samples.size:
+                p50, p99 = np.percentile(samples, (50, 99)) * 1e3
+                stages[name] = {"p50": float(p50), "p99": float(p99), "mean": float(samples.mean() * 1e3),
+                                "count": int(samples.size)}
+        intervals = tuple(self._frames)
+        fps = len(intervals) / sum(intervals) if intervals and sum(intervals) > 0 else 0.0
+        return {"frames": self.frames, "fps": fps, "target_fps": self.target_fps, "stages": stages}
+
+    def text(self) -> str:
+        summary = self.summary()
+        target = f" / {summary['target_fps']:.0f}" if summary["target_fps"] else ""
+        lines = [f"FPS {summary['fps']:5.1f}{target}", f"{'stage':<9}{'p50':>7}{'p99':>7} ms"]
+        for name, stats in summary["stages"].items():
+            lines.append(f"{name:<9}{stats['p50']:7.2f}{stats['p99']:7.2f}")
+        return "\n".join(lines)
+
+    # --- export ----------------------------------------------------------------
+
+    def open_export(self, path: str):
+        self._export_file = open(path, "w", newline="", encoding="utf-8")
+        if path.lower().endswith(".csv"):
+            self._csv = csv.writer(self._export_file)
+            self._csv.writerow(["time", "frames", "fps", "stage", "p50_ms", "p99_ms", "mean_ms", "count"])
+
+    def write_export(self):
+        summary = self.summary()
+        now = round(time.time(), 3)
+        if self._csv is not None:
+            for name, stats in summary["stages"].items():
+                self._csv.writerow([now, summary["frames"], round(summary["fps"], 2), name,
+                                    round(stats["p50"], 4), round(stats["p99"], 4), round(stats["mean"], 4),
+                                    stats["count"]])
+        else:
+            self._export_file.write(json.dumps({"time": now, **summary}) + "\n")
+        self._export_file.flush()
+
+    def close(self):
+        """Write a final row and close the export file, if any."""
+        if self._export_file is not None:
+            self.write_export()
+            self._export_file.close()
+            self._export_file = None
+
+
+def instrument_draw(profiler: Profiler, fig, name: str = "draw"):
+    """Time ``fig.draw`` (the whole matplotlib render of the figure) as a stage."""
+    draw = fig.draw
+
+    def timed_draw(renderer):
+        with profiler.stage(name):
+            return draw(renderer)
+
+    fig.draw = timed_draw
+
+
+def startup_probe(fig, started: float) -> Callable[[], None]:
+    """Print the time from ``started`` to ``fig``'s first draw, then close the figure.
+
+    ``benchmarks/startup.py`` launches a viewer with ``--startup-probe`` and
+    waits for that line. Call this right after creating the figure and the
+    returned function after ``plt.show()``. GUI backends coalesce the
+    ``draw_idle`` requests made while the widgets are built into one draw once
+    the event loop runs. A non-interactive canvas such as Agg draws on every
+    request instead and ``show`` returns without drawing, so there the requests
+    are dropped until the returned function draws the one frame.
+    """
+    from matplotlib.backend_bases import FigureCanvasBase
+
+    drawn = False
+    canvas = fig.canvas
+    deferred = type(canvas).draw_idle is FigureCanvasBase.draw_idle
+    if deferred:
+        canvas.draw_idle = lambda *args, **kwargs: None
+
+    def on_draw(event):
+        nonlocal drawn
+        if drawn:
+            return
+        drawn = True
+        print(f"first frame: {(time.perf_counter() - started) * 1000:.1f} ms", flush=True)
+        # Close from a timer rather than inside the draw that is still running
+        timer = fig.canvas.new_timer(interval=1)
+        timer.single_shot = True
+        timer.add_callback(_close, fig)
+        timer.start()
+
+    def finish():
+        if deferred:
+            del canvas.draw_idle
+        if not drawn:
+            canvas.draw()
+
+    fig.canvas.mpl_connect("draw_event", on_draw)
+    return finish
+
+
+def _close(fig):
+    import matplotlib.pyplot as plt
+
+    plt.close(fig)
+
+
+class Overlay:
+    """Profiler numbers drawn in a corner of a figure, refreshed a few times per second."""
+
+    def __init__(self, profiler: Profiler, fig, x: float = 0.01, y: float = 0.99, refresh: float = 0.5):
+        self.profiler = profiler
+        self.refresh = refresh
+        self._updated = 0.0
+        self.artist = fig.text(x, y, "", ha="left", va="top", family="monospace", fontsize=8, color="#d2e7ff",
+                               bbox={"facecolor": "black", "alpha": 0.55, "edgecolor": "none"}, zorder=10)
+        self.artist.set_visible(profiler.enabled)
+
+    def toggle(self):
+        self.profiler.set_enabled(not self.profiler.enabled)
+        self.artist.set_visible(self.profiler.enabled)
+        self._updated = 0.0
+
+    def update(self):
+        if not self.profiler.enabled:
+            return
+        now = time.perf_counter()
+        if now - self._updated >= self.refresh:
+            self._updated = now
+            self.artist.set_text(self.profiler.text())
@@ -0,0 +1,226 @@
+"""Streaming frame recorder and memory-mapped reader for simulation runs.
+
+A recording holds named fields per frame (e.g. ``grid``/``fade`` for Life or
+``a``/``b``/``c`` for BZ). Each field is stored with one of three encodings:
+
+``bits``  binary grids, bit-packed 8 cells per byte,
+``u8``    values in [0, 1] quantized to 8 bits,
+``f32``   lossless float32,
+``states`` small integer states (0..255) as they are, e.g. Generations grids.
+
+Frames are grouped into chunks. The first frame of a chunk is stored whole and
+the rest as deltas against the previous frame (XOR for ``bits``/``f32``,
+wrapping subtraction for ``u8``/``states``), then the chunk is zlib-compressed. Layout::
+
+    MAGIC | u32 header length | JSON header | chunk ... | JSON index | u64 index offset | MAGIC
+
+``Recorder`` encodes and writes on a background thread behind a bounded queue,
+so the simulation thread only pays for a copy of the frame. ``RecordingReader``
+memory-maps the file and decompresses just the chunk holding a requested frame.
+"""
+
+import bisect
+import json
+import mmap
+import queue
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+MAGIC = b"GOLREC01"
+ENCODINGS = ("bits", "u8", "f32", "states")
+
+
+def _encode(values: np.ndarray, encoding: str) -> np.ndarray:
+    if encoding == "bits":
+        return np.packbits(values != 0)
+    if encoding == "u8":
+        return np.round(np.clip(values, 0.0, 1.0) * 255).astype(np.uint8).ravel()
+    if encoding == "states":
+        return np.asarray(values).astype(np.uint8).ravel()
+    return np.ascontiguousarray(values, dtype=np.float32).ravel().view(np.uint32)
+
+
+def _decode(raw: np.ndarray, encoding: str, shape: tuple[int, ...]) -> np.ndarray:
+    if encoding == "bits":
+        return np.unpackbits(raw, count=int(np.prod(shape))).reshape(shape).astype(float)
+    if encoding == "u8":
+        return (raw.astype(np.float32) / 255).reshape(shape)
+    if encoding == "states":
+        return raw.reshape(shape).astype(float)
+    return raw.view(np.float32).reshape(shape).copy()
+
+
+def _delta(current: np.ndarray, previous: np.ndarray, encoding: str) -> np.ndarray:
+    return current - previous if encoding in ("u8", "states") else current ^ previous
+
+
+def _undelta(delta: np.ndarray, previous: np.ndarray, encoding: str) -> np.ndarray:
+    return previous + delta if encoding in ("u8", "states") else previous ^ delta
+
+
+class Recorder:
+    """Write every ``every``-th generation to ``path`` from a background thread.
+
+    ``fields`` maps field names to encodings, e.g. ``{"grid": "bits", "fade": "u8"}``.
+    At most ``max_pending`` frames wait in memory; ``record`` blocks beyond that.
+    """
+
+    def __init__(self, path: str, fields: dict[str, str], every: int = 1,
+                 chunk_frames: int = 64, max_pending: int = 8, level: int = 6):
+        for name, encoding in fields.items():
+            if encoding not in ENCODINGS:
+                raise ValueError(f"Unknown encoding {encoding!r} for field {name!r}")
+        self.path = path
+        self.fields = dict(fields)
+        self.every = max(1, every)
+        self.chunk_frames = chunk_frames
+        self.level = level
+        self.frames_written = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._error: BaseException | None = None
+        self._file = open(path, "wb")
+        self._shapes: dict[str, list[int]] | None = None
+        self._thread = threading.Thread(target=self._run, name="frame-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, generation: int, **arrays: np.ndarray) -> bool:
+        """Queue a frame if ``generation`` is on the recording stride; returns True if queued."""
+        if generation % self.every:
+            return False
+        if self._error is not None:
+            raise RuntimeError("recorder thread failed") from self._error
+        self._queue.put((generation, {name: np.array(arrays[name]) for name in self.fields}))
+        return True
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise RuntimeError("recorder thread failed") from self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- writer thread -----------------------------------------------------
+
+    def _run(self):
+        chunks, generations = [], []
+        pending: list[bytes] = []
+        previous: dict[str, np.ndarray] = {}
+        chunk_start = 0
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                generation, arrays = item
+                if self._shapes is None:
+                    self._shapes = {name: list(arr.shape) for name, arr in arrays.items()}
+                    self._write_header()
+                keyframe = not pending
+                for name, encoding in self.fields.items():
+                    encoded = _encode(arrays[name], encoding)
+                    payload = encoded if keyframe else _delta(encoded, previous[name], encoding)
+                    previous[name] = encoded
+                    pending.append(payload.tobytes())
+                generations.append(generation)
+                self.frames_written += 1
+                if len(generations) - chunk_start == self.chunk_frames:
+                    chunks.append(self._flush(pending, chunk_start, len(generations)))
+                    chunk_start = len(generations)
+            if pending:
+                chunks.append(self._flush(pending, chunk_start, len(generations)))
+            if self._shapes is None:
+                self._shapes = {}
+                self._write_header()
+            index_offset = self._file.tell()
+            self._file.write(json.dumps({"chunks": chunks, "generations": generations}).encode())
+            self._file.write(struct.pack("<Q", index_offset) + MAGIC)
+        except BaseException as exc:  # surfaced to the simulation thread on the next call
+            self._error = exc
+        finally:
+            self._file.close()
+
+    def _write_header(self):
+        header = json.dumps({"fields": self.fields, "shapes": self._shapes, "every": self.every}).encode()
+        self._file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def _flush(self, pending: list[bytes], first: int, end: int) -> list[int]:
+        blob = zlib.compress(b"".join(pending), self.level)
+        pending.clear()
+        offset = self._file.tell()
+        self._file.write(blob)
+        return [offset, len(blob), first, end - first]
+
+
+class RecordingReader:
+    """Random access to the frames of a recording through a memory map."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:8] != MAGIC or self._map[-8:] != MAGIC:
+            raise ValueError(f"{path} is not a complete recording")
+        (header_len,) = struct.unpack("<I", self._map[8:12])
+        header = json.loads(self._map[12:12 + header_len])
+        self.fields: dict[str, str] = header["fields"]
+        # An empty recording never saw a frame, so its fields have no shape.
+        self.shapes = {name: tuple(header["shapes"].get(name, [0])) for name in self.fields}
+        self.every: int = header["every"]
+        (index_offset,) = struct.unpack("<Q", self._map[-16:-8])
+        index = json.loads(self._map[index_offset:len(self._map) - 16])
+        self._chunks = index["chunks"]
+        self._chunk_starts = [chunk[2] for chunk in self._chunks]
+        self.generations = np.array(index["generations"], dtype=np.int64)
+        self._sizes = {name: _encode(np.zeros(self.shapes[name]), enc).nbytes for name, enc in self.fields.items()}
+        self._dtypes = {name: np.uint8 if enc != "f32" else np.uint32 for name, enc in self.fields.items()}
+        self._cached: tuple[int, bytes] | None = None
+
+    def __len__(self) -> int:
+        return len(self.generations)
+
+    def _chunk_bytes(self, chunk_id: int) -> bytes:
+        if self._cached is None or self._cached[0] != chunk_id:
+            offset, length, _, _ = self._chunks[chunk_id]
+            self._cached = (chunk_id, zlib.decompress(self._map[offset:offset + length]))
+        return self._cached[1]
+
+    def frame(self, index: int) -> dict[str, np.ndarray]:
+        """Decode frame ``index`` (not generation number) into dense arrays."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        chunk_id = bisect.bisect_right(self._chunk_starts, index) - 1
+        data = self._chunk_bytes(chunk_id)
+        frame_bytes = sum(self._sizes.values())
+        state: dict[str, np.ndarray] = {}
+        # Replay deltas from the chunk's keyframe up to the requested frame.
+        for k in range(index - self._chunks[chunk_id][2] + 1):
+            offset = k * frame_bytes
+            for name, encoding in self.fields.items():
+                raw = np.frombuffer(data, dtype=self._dtypes[name], offset=offset,
+                                    count=self._sizes[name] // np.dtype(self._dtypes[name]).itemsize)
+                state[name] = raw if k == 0 else _undelta(raw, state[name], encoding)
+                offset += self._sizes[name]
+        return {name: _decode(state[name], self.fields[name], self.shapes[name]) for name in self.fields}
+
+    def __getitem__(self, index: int) -> dict[str, np.ndarray]:
+        return self.frame(index)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,159 @@
+"""Background simulation thread for the interactive viewers.
+
+``SimWorker`` calls an ``advance`` function as fast as possible (or at a target
+rate) on its own thread and publishes a snapshot of the model after every
+generation. Snapshots go through three reusable buffers: the worker fills the
+back buffer, swaps it with the ready slot, and the GUI swaps the ready slot
+into the front buffer it draws from. A frame the GUI has not picked up by the
+time the next one is ready is dropped, so the simulation never waits for
+matplotlib and the GUI always draws the newest finished generation.
+
+The model state belongs to the worker while it runs. The GUI changes it only by
+``submit``-ting commands, which run on the worker thread between generations.
+"""
+
+import queue
+import threading
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+
+class SimWorker:
+    """Run ``advance()`` on a background thread and publish ``snapshot()`` after each call.
+
+    ``snapshot`` returns a dict of arrays and plain values; arrays are copied into
+    the worker's buffers, other values are stored as they are. ``target_rate``
+    caps generations per second (None runs flat out).
+    """
+
+    def __init__(
+        self,
+        advance: Callable[[], None],
+        snapshot: Callable[[], dict],
+        target_rate: float | None = None,
+        running: bool = True,
+    ):
+        self._advance = advance
+        self._snapshot = snapshot
+        self.target_rate = target_rate
+        self.running = running
+        self.generations = 0
+        self.published = 0
+        self.dropped = 0
+        self.rate = 0.0
+        self._commands: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._back: dict = {}
+        self._ready: dict = {}
+        self._front: dict = {}
+        self._fresh = False
+        self.stopping = False
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="sim-worker", daemon=True)
+        self._thread.start()
+
+    # --- GUI side ------------------------------------------------------------
+
+    def submit(self, command: Callable[[], None]):
+        """Run ``command`` on the worker thread before its next generation."""
+        self._check()
+        self._commands.put(command)
+
+    def set_running(self, running: bool):
+        def apply():
+            self.running = running
+
+        self.submit(apply)
+
+    def latest(self) -> dict | None:
+        """The newest published frame, or None if nothing new finished since the last call.
+
+        The returned dict stays valid until the next call.
+        """
+        self._check()
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._front, self._ready = self._ready, self._front
+            self._fresh = False
+        return self._front
+
+    def stop(self):
+        """Stop the thread after the current generation; the caller owns the state again.
+
+        Long-running commands should poll ``stopping`` and return early.
+        """
+        self.stopping = True
+        self._commands.put(lambda: None)
+        self._thread.join()
+        self._check()
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError("simulation worker failed") from self._error
+
+    # --- worker thread -------------------------------------------------------
+
+    def _run(self):
+        next_time = time.perf_counter()
+        rate_start, rate_count = next_time, 0
+        try:
+            self._publish()
+            while not self.stopping:
+                if not self.running:
+                    # Idle until a command arrives, then show its effect.
+                    self._commands.get()()
+                    self._drain()
+                    self._publish()
+                    next_time = rate_start = time.perf_counter()
+                    rate_count, self.rate = self.generations, 0.0
+                    continue
+                if self.target_rate:
+                    wait = next_time - time.perf_counter()
+                    if wait > 0:
+                        try:
+                            self._commands.get(timeout=wait)()
+                        except queue.Empty:
+                            pass
+                        continue
+                    next_time = max(next_time + 1.0 / self.target_rate, time.perf_counter() - 0.1)
+                self._drain()
+                if not self.running or self.stopping:
+                    continue
+                self._advance()
+                self.generations += 1
+                self._publish()
+                now = time.perf_counter()
+                if now - rate_start >= 0.5:
+                    self.rate = (self.generations - rate_count) / (now - rate_start)
+                    rate_start, rate_count = now, self.generations
+        except BaseException as exc:  # surfaced to the GUI on its next call
+            self._error = exc
+
+    def _drain(self):
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            command()
+
+    def _publish(self):
+        back = self._back
+        for name, value in self._snapshot().items():
+            if isinstance(value, np.ndarray):
+                buffer = back.get(name)
+                if isinstance(buffer, np.ndarray) and buffer.shape == value.shape and buffer.dtype == value.dtype:
+                    np.copyto(buffer, value)
+                else:
+                    back[name] = value.copy()
+            else:
+                back[name] = value
+        with self._lock:
+            if self._fresh:
+                self.dropped += 1
+            self._back, self._ready = self._ready, back
+            self._fresh = True
+            self.published += 1
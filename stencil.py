@@ -0,0 +1,167 @@
+"""Shared neighborhood helpers built from padded arrays and shifted slices.
+
+Every function works on the last two axes so the same code handles single
+boards and stacked batches. ``boundary_mode`` follows the viewers: "wrap" is
+toroidal, "open" and "fill" treat cells beyond the edge as zero. For a stacked
+(B, H, W) batch it may also be a sequence with one mode per board.
+
+Radius-r neighborhoods (``neighborhood_sum``) cost the same per cell for any
+radius: Moore squares are box sums from running sums along each axis, and von
+Neumann diamonds are the same box sums taken in coordinates rotated by 45°.
+"""
+
+from collections.abc import Sequence
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def optional_convolve2d():
+    """``scipy.signal.convolve2d``, or None when SciPy is not installed.
+
+    SciPy is optional. It is slow to import, so callers fetch it on first use
+    rather than at startup, and fall back to the NumPy stencils here without it.
+    """
+    try:
+        from scipy.signal import convolve2d
+    except ImportError:
+        return None
+    return convolve2d
+
+
+def fill_halo(padded: np.ndarray, boundary_mode: str | Sequence[str], width: int = 1) -> np.ndarray:
+    """Refresh the ``width``-cell halo of an already padded array in place."""
+    w = width
+    if isinstance(boundary_mode, str):
+        wrap = boundary_mode == "wrap"
+    else:
+        wrap = np.array([mode == "wrap" for mode in boundary_mode])
+    if np.any(wrap):
+        padded[..., :w, w:-w] = padded[..., -2 * w:-w, w:-w]
+        padded[..., -w:, w:-w] = padded[..., w:2 * w, w:-w]
+        padded[..., :, :w] = padded[..., :, -2 * w:-w]
+        padded[..., :, -w:] = padded[..., :, w:2 * w]
+    if not np.all(wrap):
+        # Per-board modes index the leading batch axis; a plain mode covers the whole array.
+        lead = (Ellipsis,) if isinstance(boundary_mode, str) else (~wrap, Ellipsis)
+        padded[lead + (slice(None, w), slice(None))] = 0
+        padded[lead + (slice(-w, None), slice(None))] = 0
+        padded[lead + (slice(None), slice(None, w))] = 0
+        padded[lead + (slice(None), slice(-w, None))] = 0
+    return padded
+
+
+def pad(
+    field: np.ndarray, boundary_mode: str | Sequence[str], width: int = 1, out: np.ndarray | None = None
+) -> np.ndarray:
+    """Copy ``field`` into a padded buffer and fill its halo for the boundary mode."""
+    w = width
+    shape = field.shape[:-2] + (field.shape[-2] + 2 * w, field.shape[-1] + 2 * w)
+    if out is None:
+        out = np.empty(shape, dtype=field.dtype)
+    out[..., w:-w, w:-w] = field
+    return fill_halo(out, boundary_mode, w)
+
+
+def moore_sum(padded: np.ndarray, include_center: bool = False, out: np.ndarray | None = None) -> np.ndarray:
+    """3x3 neighborhood sum over the interior of a 1-cell padded array."""
+    rows = padded[..., :-2] + padded[..., 1:-1]
+    rows += padded[..., 2:]
+    if out is None:
+        out = rows[..., :-2, :] + rows[..., 1:-1, :]
+    else:
+        np.add(rows[..., :-2, :], rows[..., 1:-1, :], out=out)
+    out += rows[..., 2:, :]
+    if not include_center:
+        out -= padded[..., 1:-1, 1:-1]
+    return out
+
+
+NEIGHBORHOODS = ("moore", "von_neumann")
+
+
+def neighborhood_size(radius: int = 1, neighborhood: str = "moore", include_center: bool = False) -> int:
+    """Number of cells counted by ``neighborhood_sum``."""
+    if neighborhood == "moore":
+        size = (2 * radius + 1) ** 2
+    elif neighborhood == "von_neumann":
+        size = 2 * radius * (radius + 1) + 1
+    else:
+        raise ValueError(f"unknown neighborhood {neighborhood!r}")
+    return size if include_center else size - 1
+
+
+def _sum_dtype(array: np.ndarray) -> np.dtype:
+    # Running sums need headroom: floats accumulate in float64, integers in int64, or in int32
+    # when even a board full of the largest 8-bit value cannot overflow it
+    if array.dtype.kind not in "biu":
+        return np.dtype(np.float64)
+    if array.dtype.itemsize == 1 and array.shape[-1] * array.shape[-2] * 255 < 2 ** 31:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
+
+def box_sum(padded: np.ndarray, radius: int) -> np.ndarray:
+    """(2r+1)x(2r+1) sums over the interior of an r-cell padded array, via running sums."""
+    k = 2 * radius + 1
+    acc = np.cumsum(padded, axis=-1, dtype=_sum_dtype(padded))
+    rows = acc[..., k - 1:]
+    rows[..., 1:] -= acc[..., :-k]
+    acc = np.cumsum(rows, axis=-2, dtype=rows.dtype)
+    out = acc[..., k - 1:, :]
+    out[..., 1:, :] -= acc[..., :-k, :]
+    return out
+
+
+@lru_cache(maxsize=32)
+def _rotation(height: int, width: int, radius: int) -> tuple[np.ndarray, np.ndarray, int]:
+    """Flat index maps between a padded (height, width) array and its 45°-rotated copy."""
+    y, x = np.indices((height, width))
+    side = height + width - 1 + 2 * radius
+    scatter = (y + x + radius) * side + (y - x + width - 1 + radius)
+    # Interior cells of the padded array, located in the rotated box sums (which drop the r-cell rim)
+    iy, ix = np.indices((height - 2 * radius, width - 2 * radius)) + radius
+    gather = (iy + ix) * (side - 2 * radius) + (iy - ix + width - 1)
+    return scatter.ravel(), gather.ravel(), side
+
+
+def diamond_sum(padded: np.ndarray, radius: int) -> np.ndarray:
+    """Sums over |dy| + |dx| <= r on the interior of an r-cell padded array.
+
+    In rotated coordinates u = y + x, v = y - x the diamond is the square
+    |du|, |dv| <= r, so the padded array is scattered into a rotated grid (cells
+    with no counterpart stay 0) and ``box_sum`` does the rest.
+    """
+    lead = padded.shape[:-2]
+    height, width = padded.shape[-2:]
+    scatter, gather, side = _rotation(height, width, radius)
+    rotated = np.zeros(lead + (side * side,), dtype=padded.dtype)
+    rotated[..., scatter] = padded.reshape(lead + (-1,))
+    sums = box_sum(rotated.reshape(lead + (side, side)), radius)
+    inner = sums.reshape(lead + (-1,)).take(gather, axis=-1)
+    return inner.reshape(lead + (height - 2 * radius, width - 2 * radius))
+
+
+def neighborhood_sum(padded: np.ndarray, radius: int = 1, neighborhood: str = "moore",
+                     include_center: bool = False, out: np.ndarray | None = None) -> np.ndarray:
+    """Radius-r Moore or von Neumann sum over the interior of an r-cell padded array.
+
+    Radius 1 Moore goes through ``moore_sum`` and keeps the input dtype; larger
+    neighborhoods return a wide integer type for integer input and float64
+    otherwise (or ``out``'s dtype).
+    """
+    if radius == 1 and neighborhood == "moore":
+        return moore_sum(padded, include_center, out)
+    if neighborhood == "moore":
+        total = box_sum(padded, radius)
+    elif neighborhood == "von_neumann":
+        total = diamond_sum(padded, radius)
+    else:
+        raise ValueError(f"unknown neighborhood {neighborhood!r}")
+    if not include_center:
+        total -= padded[..., radius:-radius, radius:-radius]
+    if out is None:
+        return total
+    np.copyto(out, total, casting="unsafe")
+    return out